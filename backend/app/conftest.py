@@ -0,0 +1,54 @@
+"""
+Shared test fixtures: an in-memory database with every model's table and
+InventoryBatchSchema / inventory row factories.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # registers every table on Base.metadata
+from app.database import Base
+from app.schemas.inventory_schema import InventoryBatchSchema
+
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory sqlite database (all tables)."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def inventory_batch(
+    batch_id,
+    material="Cotton",
+    color="Red",
+    rolls=1,
+    meters_per_roll=50,
+    loose=0,
+    created_at=datetime(2024, 1, 1)
+) -> InventoryBatchSchema:
+    return InventoryBatchSchema(
+        batch_id=batch_id,
+        material_id=f"m-{material}",
+        material_name=material,
+        color=color,
+        rolls_available=rolls,
+        meters_per_roll=meters_per_roll,
+        loose_meters_available=loose,
+        created_at=created_at
+    )
+
+
+def inventory_row(batch_id, material="Cotton", color="Red", **kwargs):
+    """Stand-in for an InventoryBatch row (material relationship loaded)."""
+    batch = inventory_batch(batch_id, material, color, **kwargs)
+    fields = batch.model_dump(exclude={"material_name"})
+    return SimpleNamespace(material=SimpleNamespace(material_name=material), **fields)
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+
+from app.models.color_alias import ColorAlias
+from app.services.color_normalizer import color_key
+
+
+def get_all_color_aliases(db: Session) -> list:
+    """
+    Return all admin-defined color aliases.
+    """
+    return db.query(ColorAlias).order_by(ColorAlias.alias).all()
+
+
+def set_color_alias(db: Session, alias: str, color: str) -> ColorAlias:
+    """
+    Set or update the canonical color for an alias.
+    """
+    key = color_key(alias)
+    if not key or not color.strip():
+        raise ValueError("Alias and color are required")
+
+    entry = db.query(ColorAlias).filter(ColorAlias.alias == key).first()
+
+    if entry:
+        entry.color = color.strip()
+    else:
+        entry = ColorAlias(alias=key, color=color.strip())
+        db.add(entry)
+
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def delete_color_alias(db: Session, alias: str) -> bool:
+    """
+    Remove an alias. Returns False if it did not exist.
+    """
+    entry = db.query(ColorAlias).filter(ColorAlias.alias == color_key(alias)).first()
+    if not entry:
+        return False
+
+    db.delete(entry)
+    db.commit()
+    return True
@@ -1,7 +1,29 @@
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+import math
+import time
+import uuid
+from sqlalchemy import func, or_, tuple_, update, insert, bindparam
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, joinedload
 from app.models.inventory import InventoryBatch
 from app.models.material import Material
+from app.models.inventory_movement import MovementType
+from app.crud.inventory_journal import movement, deduction_movements, record_movements
+
+
+# Compare-and-swap attempts per adjustment before giving up
+ADJUST_MAX_RETRIES = 5
+
+# Pause before retrying a batch an approval has locked (× attempt number)
+ADJUST_LOCK_BACKOFF_SECONDS = 0.05
+
+# Postgres lock_not_available (FOR UPDATE NOWAIT on a locked row)
+LOCK_NOT_AVAILABLE = "55P03"
+
+ADJUSTMENT_TYPES = ["add", "subtract", "set"]
+
+
+class InventoryConflictError(ValueError):
+    """The batch kept changing underneath an adjustment."""
 
 
 def get_inventory_batches(
@@ -31,14 +53,111 @@ def get_inventory_batches(
 
 
 
+def get_batches_for_materials(
+    db: Session,
+    material_names
+):
+    """
+    Returns all batches (any color, material eagerly loaded) for the given
+    material names — the candidate shortlist for a handful of order items,
+    instead of loading the whole inventory.
+    """
+    names = {name.lower() for name in material_names if name}
+    if not names:
+        return []
+
+    return (
+        db.query(InventoryBatch)
+        .join(Material)
+        .options(joinedload(InventoryBatch.material))
+        .filter(func.lower(Material.material_name).in_(names))
+        .all()
+    )
+
+
+def get_in_stock_batches_for_items(
+    db: Session,
+    pairs,
+    include_alternatives: bool = True
+):
+    """
+    In-stock batches (material eagerly loaded) for the (material, color)
+    pairs of one order, in a single joined query backed by the lower()
+    indexes on material_name / color.
+
+    include_alternatives=True widens the match to any batch sharing the
+    material OR the color — exactly the candidates find_alternatives and
+    get_available_colors look at. False returns the exact pairs only.
+    """
+    pairs = {
+        ((material or "").lower(), (color or "").lower())
+        for material, color in pairs
+        if material
+    }
+    if not pairs:
+        return []
+
+    material_key = func.lower(Material.material_name)
+    color_key = func.lower(InventoryBatch.color)
+
+    if include_alternatives:
+        match = or_(
+            material_key.in_({material for material, _ in pairs}),
+            color_key.in_({color for _, color in pairs if color})
+        )
+    else:
+        match = tuple_(material_key, color_key).in_(pairs)
+
+    return (
+        db.query(InventoryBatch)
+        .join(Material)
+        .options(joinedload(InventoryBatch.material))
+        .filter(match)
+        .filter(
+            (InventoryBatch.rolls_available > 0) |
+            (InventoryBatch.loose_meters_available > 0)
+        )
+        .all()
+    )
+
+
+def insert_batches_bulk(
+    db: Session,
+    rows,
+    reason: str = "bulk import"
+):
+    """
+    Inserts new batches (dicts of InventoryBatch columns, batch_id set by
+    the caller) in one multi-row INSERT and journals each as a receipt.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    db.execute(insert(InventoryBatch.__table__), rows)
+    record_movements(db, [
+        movement(
+            row["batch_id"], MovementType.RECEIPT,
+            rolls_delta=row["rolls_available"],
+            loose_meters_delta=row["loose_meters_available"],
+            reason=reason
+        )
+        for row in rows
+    ])
+
+    # db.commit() left to caller for atomicity
+    return len(rows)
+
+
 def deduct_inventory_from_batch(
     db: Session,
     batch_id,
     rolls_to_deduct: int = 0,
-    loose_meters_to_deduct: float = 0
+    loose_meters_to_deduct: float = 0,
+    order_id=None
 ):
     """
-    Deducts inventory from a specific batch.
+    Deducts inventory from a specific batch (journaled as an order deduction).
     Assumes AI layer has already validated availability.
     """
 
@@ -46,6 +165,7 @@ def deduct_inventory_from_batch(
         db.query(InventoryBatch)
         .filter(InventoryBatch.batch_id == batch_id)
         .with_for_update()  # 🔒 LOCK ROW
+        .populate_existing()
         .first()
     )
 
@@ -62,6 +182,13 @@ def deduct_inventory_from_batch(
     batch.rolls_available -= rolls_to_deduct
     batch.loose_meters_available -= loose_meters_to_deduct
 
+    record_movements(db, [movement(
+        batch.batch_id, MovementType.ORDER_DEDUCTION,
+        rolls_delta=-rolls_to_deduct,
+        loose_meters_delta=-loose_meters_to_deduct,
+        order_id=order_id
+    )])
+
     # db.commit() REMOVED for atomicity
     db.flush()
     db.refresh(batch)
@@ -72,52 +199,296 @@ def deduct_inventory_from_batch(
 def deduct_meters_from_batch(
     db: Session,
     batch_id: str,
-    meters_to_deduct: float
+    meters_to_deduct: float,
+    order_id=None
 ):
     """
     Smart deduction: Takes loose meters first, then opens rolls if needed.
+    Journaled as roll openings + an order deduction.
     """
     batch = (
         db.query(InventoryBatch)
         .filter(InventoryBatch.batch_id == batch_id)
         .with_for_update()
+        .populate_existing()
         .first()
     )
 
     if not batch:
         raise ValueError(f"Batch {batch_id} not found")
 
-    meters_remaining = float(meters_to_deduct)
-    
-    # 1. Take from loose meters
-    if batch.loose_meters_available >= meters_remaining:
-        batch.loose_meters_available = float(batch.loose_meters_available) - meters_remaining
-        meters_remaining = 0
-    else:
-        meters_remaining -= float(batch.loose_meters_available)
-        batch.loose_meters_available = 0.0
-
-    # 2. If still need meters, open rolls
-    if meters_remaining > 0:
-        roll_length = float(batch.meters_per_roll)
-        if roll_length <= 0:
-             raise ValueError(f"Batch {batch_id} has invalid meters_per_roll: {roll_length}")
-
-        import math
-        rolls_needed = math.ceil(meters_remaining / roll_length)
-
-        if batch.rolls_available < rolls_needed:
-             raise ValueError(f"Insufficient stock in Batch {batch_id}. Needed {rolls_needed} rolls, have {batch.rolls_available}")
-
-        batch.rolls_available -= rolls_needed
-        
-        # Add opened rolls to loose meters (minus what we used)
-        # Total meters from opened rolls = rolls_needed * roll_length
-        # We used 'meters_remaining'
-        # New loose meters = (rolls_needed * roll_length) - meters_remaining
-        new_loose = (rolls_needed * roll_length) - meters_remaining
-        batch.loose_meters_available = float(batch.loose_meters_available) + new_loose
+    rolls, loose = _apply_meter_deduction(
+        batch_id,
+        batch.rolls_available,
+        batch.meters_per_roll,
+        batch.loose_meters_available,
+        meters_to_deduct
+    )
+    record_movements(db, deduction_movements(
+        batch.batch_id, batch.rolls_available, rolls, batch.meters_per_roll, meters_to_deduct, order_id
+    ))
+
+    batch.rolls_available = rolls
+    batch.loose_meters_available = loose
 
     db.flush()
     db.refresh(batch)
     return batch
+
+
+def _apply_meter_deduction(batch_id, rolls_available, meters_per_roll, loose_available, meters_to_deduct):
+    """
+    Loose meters first, then opens whole rolls; the unused part of the
+    opened rolls becomes loose. Returns (rolls_available, loose_meters_available).
+    """
+    meters_remaining = float(meters_to_deduct)
+    loose = float(loose_available)
+
+    # 1. Take from loose meters
+    if loose >= meters_remaining:
+        return rolls_available, loose - meters_remaining
+
+    meters_remaining -= loose
+
+    # 2. Open rolls for the rest
+    roll_length = float(meters_per_roll)
+    if roll_length <= 0:
+        raise ValueError(f"Batch {batch_id} has invalid meters_per_roll: {roll_length}")
+
+    rolls_needed = math.ceil(meters_remaining / roll_length)
+
+    if rolls_available < rolls_needed:
+        raise ValueError(f"Insufficient stock in Batch {batch_id}. Needed {rolls_needed} rolls, have {rolls_available}")
+
+    # Opened rolls minus what we used stay as loose meters
+    return rolls_available - rolls_needed, (rolls_needed * roll_length) - meters_remaining
+
+
+def deduct_allocations_bulk(
+    db: Session,
+    allocations,
+    order_id=None
+):
+    """
+    Deducts a whole order's batch allocations in one go.
+
+    allocations: fulfilled_batches entries —
+        {"batch_id", "allocated_meters"}          (smart deduction)
+        {"batch_id", "rolls", "loose_meters"}     (old structure)
+
+    All involved rows are locked by ONE `SELECT ... FOR UPDATE` in batch_id
+    order (concurrent approvals always lock in the same order → no
+    deadlocks), new values are computed in memory and written back in one
+    executemany UPDATE; the matching journal rows go in one batched insert.
+    Raises ValueError (nothing written) if any batch is missing or short.
+    """
+    from app.services.inventory_snapshot import note_inventory_change
+
+    # Merge several allocations against the same batch
+    meters_by_batch = {}
+    units_by_batch = {}
+    for allocation in allocations:
+        batch_id = uuid.UUID(str(allocation["batch_id"]))
+        if "allocated_meters" in allocation:
+            meters_by_batch[batch_id] = meters_by_batch.get(batch_id, 0) + float(allocation["allocated_meters"])
+        else:
+            rolls, loose = units_by_batch.get(batch_id, (0, 0))
+            units_by_batch[batch_id] = (
+                rolls + int(allocation.get("rolls", 0)),
+                loose + float(allocation.get("loose_meters", 0))
+            )
+
+    batch_ids = sorted(set(meters_by_batch) | set(units_by_batch))
+    if not batch_ids:
+        return []
+
+    rows = (
+        db.query(
+            InventoryBatch.batch_id,
+            InventoryBatch.rolls_available,
+            InventoryBatch.meters_per_roll,
+            InventoryBatch.loose_meters_available
+        )
+        .filter(InventoryBatch.batch_id.in_(batch_ids))
+        .order_by(InventoryBatch.batch_id)
+        .with_for_update()  # 🔒 LOCK ALL ROWS, SORTED
+        .all()
+    )
+
+    found = {row.batch_id: row for row in rows}
+    missing = [str(batch_id) for batch_id in batch_ids if batch_id not in found]
+    if missing:
+        raise ValueError(f"Inventory batch not found: {', '.join(missing)}")
+
+    updates = []
+    movements = []
+    for batch_id in batch_ids:
+        row = found[batch_id]
+        rolls = row.rolls_available
+        loose = float(row.loose_meters_available)
+
+        if batch_id in units_by_batch:
+            rolls_to_deduct, loose_to_deduct = units_by_batch[batch_id]
+            if rolls < rolls_to_deduct:
+                raise ValueError(f"Batch {batch_id}: Only {rolls} rolls left (Requested: {rolls_to_deduct})")
+            if loose < loose_to_deduct:
+                raise ValueError(f"Batch {batch_id}: Only {loose}m left (Requested: {loose_to_deduct}m)")
+            rolls -= rolls_to_deduct
+            loose -= loose_to_deduct
+            movements.append(movement(
+                batch_id, MovementType.ORDER_DEDUCTION,
+                rolls_delta=-rolls_to_deduct, loose_meters_delta=-loose_to_deduct, order_id=order_id
+            ))
+
+        if batch_id in meters_by_batch:
+            rolls_before = rolls
+            rolls, loose = _apply_meter_deduction(
+                batch_id, rolls, row.meters_per_roll, loose, meters_by_batch[batch_id]
+            )
+            movements += deduction_movements(
+                batch_id, rolls_before, rolls, row.meters_per_roll, meters_by_batch[batch_id], order_id
+            )
+
+        updates.append({"b_batch_id": batch_id, "b_rolls": rolls, "b_loose": loose})
+
+    table = InventoryBatch.__table__
+    db.execute(
+        update(table)
+        .where(table.c.batch_id == bindparam("b_batch_id"))
+        .values(
+            rolls_available=bindparam("b_rolls"),
+            loose_meters_available=bindparam("b_loose"),
+            version=table.c.version + 1
+        ),
+        updates
+    )
+    record_movements(db, movements)
+
+    # Core UPDATE bypasses the ORM: drop stale loaded rows, tell the snapshot
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, InventoryBatch) and obj.batch_id in found:
+            db.expire(obj)
+    note_inventory_change(db, batch_ids)
+
+    # db.commit() left to caller for atomicity
+    return updates
+
+
+def _adjusted(current, value, adjustment_type):
+    if value is None:
+        return current
+    if adjustment_type == "add":
+        return current + value
+    if adjustment_type == "subtract":
+        return current - value
+    return value
+
+
+def _read_batch_for_adjustment(db: Session, batch_id):
+    """
+    Counters and version of a batch. On Postgres the row is locked with
+    NOWAIT inside a savepoint: if an approval holds it, lock_not_available
+    is raised at once and only the savepoint is rolled back.
+    """
+    query = (
+        db.query(
+            InventoryBatch.rolls_available,
+            InventoryBatch.loose_meters_available,
+            InventoryBatch.version
+        )
+        .filter(InventoryBatch.batch_id == batch_id)
+    )
+
+    if db.get_bind().dialect.name != "postgresql":
+        return query.first()
+
+    with db.begin_nested():
+        return query.with_for_update(nowait=True).first()
+
+
+def adjust_batch_stock(
+    db: Session,
+    batch_id,
+    adjustment_type: str,
+    rolls: int | None = None,
+    meters: float | None = None,
+    reason: str | None = None
+):
+    """
+    Stock-take correction of a batch's rolls and/or loose meters
+    ('add', 'subtract' or 'set'), journaled as an adjustment.
+
+    Reads the batch, then `UPDATE ... WHERE version = <read>`. If an
+    approval (or another adjustment) got there first nothing matches and it
+    re-reads and retries. On Postgres the read locks the row with NOWAIT,
+    so a batch an approval is deducting counts as a miss too instead of
+    queueing the correction behind the approval's lock. Raises
+    InventoryConflictError after ADJUST_MAX_RETRIES misses, ValueError for
+    a missing batch or negative result.
+    """
+    from app.services.inventory_snapshot import note_inventory_change
+
+    if adjustment_type not in ADJUSTMENT_TYPES:
+        raise ValueError(f"Unknown adjustment_type '{adjustment_type}'. Use add, subtract or set.")
+    if rolls is None and meters is None:
+        raise ValueError("Nothing to adjust: give rolls and/or meters.")
+
+    batch_id = uuid.UUID(str(batch_id))
+    table = InventoryBatch.__table__
+
+    for attempt in range(ADJUST_MAX_RETRIES):
+        try:
+            row = _read_batch_for_adjustment(db, batch_id)
+        except OperationalError as e:
+            if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE:
+                raise
+            time.sleep(ADJUST_LOCK_BACKOFF_SECONDS * (attempt + 1))
+            continue
+
+        if not row:
+            raise ValueError(f"Inventory batch {batch_id} not found")
+
+        old_loose = float(row.loose_meters_available)
+        new_rolls = _adjusted(row.rolls_available, rolls, adjustment_type)
+        new_loose = _adjusted(old_loose, meters, adjustment_type)
+        if new_rolls < 0 or new_loose < 0:
+            raise ValueError(
+                f"Batch {batch_id}: adjustment would leave {new_rolls} rolls / {new_loose}m"
+            )
+
+        swapped = db.execute(
+            update(table)
+            .where(table.c.batch_id == batch_id)
+            .where(table.c.version == row.version)  # 🔁 COMPARE-AND-SWAP
+            .values(
+                rolls_available=new_rolls,
+                loose_meters_available=new_loose,
+                version=row.version + 1
+            )
+        )
+
+        if swapped.rowcount == 1:
+            record_movements(db, [movement(
+                batch_id, MovementType.ADJUSTMENT,
+                rolls_delta=new_rolls - row.rolls_available,
+                loose_meters_delta=new_loose - old_loose,
+                reason=reason or f"stock {adjustment_type}"
+            )])
+
+            for obj in list(db.identity_map.values()):
+                if isinstance(obj, InventoryBatch) and obj.batch_id == batch_id:
+                    db.expire(obj)
+            note_inventory_change(db, [batch_id])
+
+            # db.commit() left to caller for atomicity
+            return {
+                "batch_id": str(batch_id),
+                "rolls_available": new_rolls,
+                "loose_meters_available": new_loose,
+                "version": row.version + 1,
+                "attempts": attempt + 1,
+            }
+
+    raise InventoryConflictError(
+        f"Batch {batch_id} changed {ADJUST_MAX_RETRIES} times during the adjustment, try again"
+    )
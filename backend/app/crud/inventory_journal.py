@@ -0,0 +1,246 @@
+import math
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session
+from app.models.inventory import InventoryBatch
+from app.models.inventory_movement import InventoryMovement, InventoryStockSnapshot, MovementType
+
+
+# Snapshots stop this far behind now() so transactions still in flight
+# (created_at = their start time) are never skipped
+SNAPSHOT_LAG = timedelta(minutes=5)
+
+
+def _as_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+# ─────────────────────────────────────────────
+# WRITE
+# ─────────────────────────────────────────────
+
+def movement(
+    batch_id,
+    movement_type: MovementType,
+    rolls_delta: int = 0,
+    loose_meters_delta: float = 0,
+    order_id=None,
+    reason: str | None = None
+) -> dict:
+    return {
+        "batch_id": _as_uuid(batch_id),
+        "movement_type": movement_type.value,
+        "rolls_delta": int(rolls_delta),
+        "loose_meters_delta": float(loose_meters_delta),
+        "order_id": _as_uuid(order_id) if order_id else None,
+        "reason": reason,
+    }
+
+
+def deduction_movements(
+    batch_id,
+    rolls_before: int,
+    rolls_after: int,
+    meters_per_roll: float,
+    meters: float,
+    order_id=None
+) -> list:
+    """
+    A meter deduction as journal rows: the rolls it had to open (rolls →
+    loose meters), then the meters taken from loose stock.
+    """
+    movements = []
+    rolls_opened = rolls_before - rolls_after
+
+    if rolls_opened:
+        movements.append(movement(
+            batch_id, MovementType.ROLL_OPENING,
+            rolls_delta=-rolls_opened,
+            loose_meters_delta=rolls_opened * float(meters_per_roll),
+            order_id=order_id
+        ))
+
+    movements.append(movement(
+        batch_id, MovementType.ORDER_DEDUCTION,
+        loose_meters_delta=-float(meters),
+        order_id=order_id
+    ))
+    return movements
+
+
+def record_movements(
+    db: Session,
+    movements
+):
+    """
+    Appends journal rows in one batched insert and applies them to the
+    stock_summary totals. Call in the same transaction as the counter
+    change they describe.
+    """
+    from app.crud.stock_summary import apply_stock_deltas
+
+    movements = list(movements)
+    if movements:
+        db.bulk_insert_mappings(InventoryMovement, movements)
+
+        # Opening balances describe stock the counters (and summary) already hold
+        apply_stock_deltas(db, [
+            m for m in movements if m["movement_type"] != MovementType.OPENING_BALANCE.value
+        ])
+    # db.commit() left to caller for atomicity
+    return len(movements)
+
+
+def backfill_opening_balances(db: Session):
+    """
+    Journals the stock the movements don't account for. Every batch whose
+    counters differ from its journal total — created before the journal,
+    by a direct insert, or deducted before its first backfill — gets one
+    opening_balance movement of (counters − journal).
+    """
+    return record_movements(db, [
+        movement(
+            drift["batch_id"], MovementType.OPENING_BALANCE,
+            rolls_delta=drift["counters"]["rolls"] - drift["journal"]["rolls"],
+            loose_meters_delta=round(drift["counters"]["loose_meters"] - drift["journal"]["loose_meters"], 4),
+            reason="journal backfill"
+        )
+        for drift in find_projection_drift(db)
+    ])
+
+
+def take_stock_snapshots(db: Session, as_of: datetime | None = None):
+    """
+    Writes a snapshot for every batch that moved since its last snapshot
+    (or never had one). Returns the number of snapshots written.
+    """
+    as_of = as_of or (datetime.now(timezone.utc) - SNAPSHOT_LAG)
+
+    stock = get_stock_as_of(db, as_of)
+
+    rows = [
+        {
+            "batch_id": _as_uuid(batch_id),
+            "as_of": as_of,
+            "rolls": values["rolls"],
+            "loose_meters": values["loose_meters"],
+        }
+        for batch_id, values in stock.items()
+        if values["movements_applied"] or not values["from_snapshot"]
+    ]
+
+    if rows:
+        db.bulk_insert_mappings(InventoryStockSnapshot, rows)
+    return len(rows)
+
+
+# ─────────────────────────────────────────────
+# READ
+# ─────────────────────────────────────────────
+
+def get_batch_movements(
+    db: Session,
+    batch_id,
+    limit: int = 100
+):
+    return (
+        db.query(InventoryMovement)
+        .filter(InventoryMovement.batch_id == _as_uuid(batch_id))
+        .order_by(InventoryMovement.movement_id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def get_stock_as_of(
+    db: Session,
+    as_of: datetime | None,
+    batch_ids=None
+):
+    """
+    Stock per batch at `as_of` (None = current journal total): latest
+    snapshot at or before as_of plus the movements between it and as_of —
+    O(movements since snapshot).
+
+    Returns {batch_id (str): {rolls, loose_meters, movements_applied, from_snapshot}}.
+    """
+    ids = [_as_uuid(batch_id) for batch_id in batch_ids] if batch_ids is not None else None
+
+    # Latest snapshot per batch (as_of <= requested time)
+    latest = db.query(
+        InventoryStockSnapshot.batch_id.label("batch_id"),
+        func.max(InventoryStockSnapshot.as_of).label("as_of")
+    )
+    if as_of is not None:
+        latest = latest.filter(InventoryStockSnapshot.as_of <= as_of)
+    if ids is not None:
+        latest = latest.filter(InventoryStockSnapshot.batch_id.in_(ids))
+    latest = latest.group_by(InventoryStockSnapshot.batch_id).subquery()
+
+    snapshots = (
+        db.query(InventoryStockSnapshot)
+        .join(latest, and_(
+            InventoryStockSnapshot.batch_id == latest.c.batch_id,
+            InventoryStockSnapshot.as_of == latest.c.as_of
+        ))
+        .all()
+    )
+
+    stock = {
+        str(snapshot.batch_id): {
+            "rolls": snapshot.rolls,
+            "loose_meters": float(snapshot.loose_meters),
+            "movements_applied": 0,
+            "from_snapshot": True,
+        }
+        for snapshot in snapshots
+    }
+
+    # Movements after each batch's snapshot (all of them if it has none)
+    deltas = (
+        db.query(
+            InventoryMovement.batch_id,
+            func.sum(InventoryMovement.rolls_delta),
+            func.sum(InventoryMovement.loose_meters_delta),
+            func.count(InventoryMovement.movement_id)
+        )
+        .outerjoin(latest, InventoryMovement.batch_id == latest.c.batch_id)
+        .filter(or_(latest.c.as_of.is_(None), InventoryMovement.created_at > latest.c.as_of))
+    )
+    if as_of is not None:
+        deltas = deltas.filter(InventoryMovement.created_at <= as_of)
+    if ids is not None:
+        deltas = deltas.filter(InventoryMovement.batch_id.in_(ids))
+
+    for batch_id, rolls, loose, count in deltas.group_by(InventoryMovement.batch_id).all():
+        values = stock.setdefault(str(batch_id), {
+            "rolls": 0, "loose_meters": 0.0, "movements_applied": 0, "from_snapshot": False
+        })
+        values["rolls"] += int(rolls or 0)
+        values["loose_meters"] = round(values["loose_meters"] + float(loose or 0), 4)
+        values["movements_applied"] += count
+
+    return stock
+
+
+def find_projection_drift(db: Session):
+    """
+    Batches whose counters disagree with their journal (writes that
+    bypassed it). Empty list = counters are an exact projection.
+    """
+    journal = get_stock_as_of(db, None)
+
+    drift = []
+    for batch in db.query(InventoryBatch).all():
+        expected = journal.get(str(batch.batch_id), {"rolls": 0, "loose_meters": 0.0})
+        loose = float(batch.loose_meters_available)
+
+        if batch.rolls_available != expected["rolls"] or not math.isclose(loose, expected["loose_meters"], abs_tol=1e-3):
+            drift.append({
+                "batch_id": str(batch.batch_id),
+                "counters": {"rolls": batch.rolls_available, "loose_meters": loose},
+                "journal": {"rolls": expected["rolls"], "loose_meters": expected["loose_meters"]},
+            })
+
+    return drift
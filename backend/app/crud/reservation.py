@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.inventory_reservation import InventoryReservation
+
+
+def _as_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def replace_order_reservations(
+    db: Session,
+    order_id,
+    holds,
+    expires_at: datetime
+):
+    """
+    Replaces every hold of an order with `holds`
+    (iterable of (session_item_id, batch_id, meters)), all expiring at expires_at.
+    """
+    release_order_reservations(db, order_id)
+
+    rows = [
+        {
+            "order_id": _as_uuid(order_id),
+            "session_item_id": _as_uuid(session_item_id),
+            "batch_id": _as_uuid(batch_id),
+            "meters": float(meters),
+            "expires_at": expires_at,
+        }
+        for session_item_id, batch_id, meters in holds
+        if meters and meters > 0
+    ]
+
+    if rows:
+        db.bulk_insert_mappings(InventoryReservation, rows)
+
+    # db.commit() left to caller for atomicity
+    db.flush()
+    return len(rows)
+
+
+def release_order_reservations(
+    db: Session,
+    order_id
+):
+    """
+    Drops all holds for an order (terminal state / re-sync).
+    """
+    return (
+        db.query(InventoryReservation)
+        .filter(InventoryReservation.order_id == _as_uuid(order_id))
+        .delete(synchronize_session=False)
+    )
+
+
+def get_reserved_meters(
+    db: Session,
+    exclude_order_id=None
+):
+    """
+    Active (unexpired) held meters per batch: {batch_id (str): meters}.
+    One GROUP BY over the expires_at index — only in-flight orders have rows.
+    An order's own holds can be excluded so re-checks don't count against it.
+    """
+    query = (
+        db.query(InventoryReservation.batch_id, func.sum(InventoryReservation.meters))
+        .filter(InventoryReservation.expires_at > datetime.now(timezone.utc))
+    )
+
+    if exclude_order_id is not None:
+        query = query.filter(InventoryReservation.order_id != _as_uuid(exclude_order_id))
+
+    return {
+        str(batch_id): float(meters or 0)
+        for batch_id, meters in query.group_by(InventoryReservation.batch_id).all()
+    }
+
+
+def purge_expired_reservations(db: Session):
+    """
+    Deletes expired holds (they are already ignored by availability checks).
+    """
+    return (
+        db.query(InventoryReservation)
+        .filter(InventoryReservation.expires_at <= datetime.now(timezone.utc))
+        .delete(synchronize_session=False)
+    )
@@ -0,0 +1,139 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.inventory import InventoryBatch
+from app.models.material import Material
+from app.models.stock_summary import StockSummary
+
+
+def _upsert(db: Session):
+    """INSERT ... ON CONFLICT for the current dialect (Postgres, SQLite in tests)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(StockSummary.__table__)
+
+
+def apply_stock_deltas(
+    db: Session,
+    movements
+):
+    """
+    Adds journal movements (dicts with batch_id, rolls_delta,
+    loose_meters_delta) to the (material, color) totals of their batches —
+    one lookup of the touched batches, one upsert per touched pair, in
+    (material_id, color) order.
+    """
+    movements = list(movements)
+    if not movements:
+        return 0
+
+    batch_ids = {m["batch_id"] for m in movements}
+    batches = {
+        row.batch_id: row
+        for row in db.query(
+            InventoryBatch.batch_id,
+            InventoryBatch.material_id,
+            InventoryBatch.color,
+            InventoryBatch.meters_per_roll
+        ).filter(InventoryBatch.batch_id.in_(batch_ids)).all()
+    }
+
+    deltas = {}
+    for m in movements:
+        batch = batches.get(m["batch_id"])
+        if batch is None:
+            continue
+        rolls, loose, meters = deltas.get((batch.material_id, batch.color), (0, 0.0, 0.0))
+        deltas[(batch.material_id, batch.color)] = (
+            rolls + m["rolls_delta"],
+            loose + m["loose_meters_delta"],
+            meters + m["rolls_delta"] * float(batch.meters_per_roll) + m["loose_meters_delta"],
+        )
+
+    # Upsert in (material_id, color) order: concurrent approvals lock the
+    # summary rows in the same order, like the batch rows (no deadlocks)
+    table = StockSummary.__table__
+    ordered = sorted(deltas.items(), key=lambda entry: (str(entry[0][0]), entry[0][1] or ""))
+    for (material_id, color), (rolls, loose, meters) in ordered:
+        insert = _upsert(db).values(
+            material_id=material_id,
+            color=color,
+            total_rolls=rolls,
+            loose_meters=loose,
+            total_meters=meters,
+        )
+        db.execute(insert.on_conflict_do_update(
+            index_elements=[table.c.material_id, table.c.color],
+            set_={
+                "total_rolls": table.c.total_rolls + insert.excluded.total_rolls,
+                "loose_meters": table.c.loose_meters + insert.excluded.loose_meters,
+                "total_meters": table.c.total_meters + insert.excluded.total_meters,
+                "updated_at": func.now(),
+            }
+        ))
+
+    # db.commit() left to caller for atomicity
+    return len(deltas)
+
+
+def rebuild_stock_summary(db: Session):
+    """
+    Recomputes every row from inventory_batches (one-off backfill / repair).
+    Run while no stock is moving.
+    """
+    rows = (
+        db.query(
+            InventoryBatch.material_id,
+            InventoryBatch.color,
+            func.sum(InventoryBatch.rolls_available),
+            func.sum(InventoryBatch.loose_meters_available),
+            func.sum(
+                (InventoryBatch.rolls_available * InventoryBatch.meters_per_roll) +
+                InventoryBatch.loose_meters_available
+            )
+        )
+        .group_by(InventoryBatch.material_id, InventoryBatch.color)
+        .all()
+    )
+
+    db.query(StockSummary).delete(synchronize_session=False)
+    db.bulk_insert_mappings(StockSummary, [
+        {
+            "material_id": material_id,
+            "color": color,
+            "total_rolls": int(rolls or 0),
+            "loose_meters": float(loose or 0),
+            "total_meters": float(meters or 0),
+        }
+        for material_id, color, rolls, loose, meters in rows
+    ])
+    return len(rows)
+
+
+def get_stock_meters_by_material(db: Session):
+    """
+    {material_id (str): total meters} — summed over the few color rows.
+    """
+    rows = (
+        db.query(StockSummary.material_id, func.sum(StockSummary.total_meters))
+        .group_by(StockSummary.material_id)
+        .all()
+    )
+    return {str(material_id): float(meters or 0) for material_id, meters in rows}
+
+
+def low_stock_query(
+    db: Session,
+    threshold: int
+):
+    """
+    (material_name, color, total_rolls) for every material / color under
+    `threshold` rolls. Materials with no stock rows show as (name, None, 0).
+    """
+    total_rolls = func.coalesce(StockSummary.total_rolls, 0)
+    return (
+        db.query(Material.material_name, StockSummary.color, total_rolls.label("total_rolls"))
+        .outerjoin(StockSummary, Material.material_id == StockSummary.material_id)
+        .filter(total_rolls < threshold)
+    )
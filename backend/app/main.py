@@ -12,15 +12,19 @@ load_dotenv()  # Load BEFORE importing other app modules
 # Database & models
 from app.database import Base, engine, SessionLocal
 import app.models  # IMPORTANT: loads all models
+import app.services.inventory_snapshot  # registers inventory change listeners
 
 # Scheduler
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.scheduler.reminders import check_overdue_customers
 from app.scheduler.alerts import check_low_stock_daily
+from app.scheduler.reservations import purge_expired_reservations_job
+from app.scheduler.inventory_journal import snapshot_inventory_daily
 
 # Core routing
 from app.router.message_router import route_message
 from app.integrations.whatsapp import send_whatsapp_message, upload_media, send_document_message
+from app.services.media_service import prefetch_whatsapp_media, release_prefetched_media
 from app.utils.pdf import generate_invoice_pdf
 from app.models.message import Message
 
@@ -118,49 +122,64 @@ async def receive_message(request: Request):
             phone = msg["from"]
             message_id = msg["id"]
 
-            db = SessionLocal()
+            # Detect message type
+            msg_type = msg.get("type", "text")
+            media_info = None
+
+            if msg_type == "text":
+                text = msg["text"]["body"]
+            elif msg_type == "image":
+                text = msg.get("image", {}).get("caption", "")
+                media_info = {"type": "image", "id": msg["image"]["id"], "mime_type": msg["image"]["mime_type"]}
+            elif msg_type == "audio":
+                text = "[Voice Note]"
+                media_info = {"type": "audio", "id": msg["audio"]["id"], "mime_type": msg["audio"]["mime_type"]}
+            else:
+                text = None
 
             try:
-                # Idempotency: skip duplicate messages
-                existing = db.query(Message).filter_by(message_id=message_id).first()
-                if existing:
-                    return {"status": "duplicate"}
-
-                # Store incoming message
-                # Detect message type
-                msg_type = msg.get("type", "text")
-                media_info = None
-
-                if msg_type == "text":
-                    text = msg["text"]["body"]
-                elif msg_type == "image":
-                    text = msg.get("image", {}).get("caption", "")
-                    media_info = {"type": "image", "id": msg["image"]["id"], "mime_type": msg["image"]["mime_type"]}
-                elif msg_type == "audio":
-                    text = "[Voice Note]"
-                    media_info = {"type": "audio", "id": msg["audio"]["id"], "mime_type": msg["audio"]["mime_type"]}
-                else:
-                    # Unsupported type
-                    send_whatsapp_message(phone, "🙏 Abhi hum sirf text, image aur voice messages support karte hain.")
-                    return {"status": "unsupported_type"}
-
-                new_message = Message(
-                    message_id=message_id,
-                    phone_number=phone,
-                    direction="incoming",
-                    content=text,
-                    message_type=msg_type
-                )
-                db.add(new_message)
-                db.commit()
-            finally:
-                db.close()
-
-            logger.info(f"Message received: {phone} → {text[:50]}... [{msg_type}]")
+                db = SessionLocal()
+
+                try:
+                    # Idempotency: skip duplicate messages
+                    existing = db.query(Message).filter_by(message_id=message_id).first()
+                    if existing:
+                        return {"status": "duplicate"}
+
+                    # Start the media download now (not for WhatsApp retries
+                    # of a stored message) — it runs in parallel with the
+                    # message insert and session lookup below
+                    if media_info:
+                        media_info["prefetch"] = prefetch_whatsapp_media(media_info["id"])
+
+                    if text is None:
+                        # Unsupported type
+                        send_whatsapp_message(phone, "🙏 Abhi hum sirf text, image aur voice messages support karte hain.")
+                        return {"status": "unsupported_type"}
+
+                    # Store incoming message
+                    new_message = Message(
+                        message_id=message_id,
+                        phone_number=phone,
+                        direction="incoming",
+                        content=text,
+                        message_type=msg_type
+                    )
+                    db.add(new_message)
+                    db.commit()
+                finally:
+                    db.close()
+
+                logger.info(f"Message received: {phone} → {text[:50]}... [{msg_type}]")
+
+                response_text = route_message(phone, text, media_info, message_id=message_id)
+                if response_text:
+                    send_whatsapp_message(phone, response_text)
 
-            response_text = route_message(phone, text, media_info)
-            if response_text:
-                send_whatsapp_message(phone, response_text)
+            finally:
+                # Batched images hand their prefetch over to the batcher
+                if media_info and media_info.get("prefetch"):
+                    release_prefetched_media(media_info["prefetch"])
 
     except Exception as e:
         logger.error(f"Webhook error: {e}", exc_info=True)
@@ -357,4 +376,6 @@ def start_scheduler():
     sched = BackgroundScheduler()
     sched.add_job(check_overdue_customers, 'interval', hours=24)
     sched.add_job(check_low_stock_daily, 'cron', hour=9, minute=0)
+    sched.add_job(purge_expired_reservations_job, 'interval', hours=1)
+    sched.add_job(snapshot_inventory_daily, 'cron', hour=0, minute=15)
     sched.start()
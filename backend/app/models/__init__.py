@@ -1,5 +1,8 @@
 from .material import Material
 from .inventory import InventoryBatch
+from .inventory_reservation import InventoryReservation
+from .inventory_movement import InventoryMovement, InventoryStockSnapshot
+from .stock_summary import StockSummary
 from .customer import Customer
 from .order import Order
 from .order_item import OrderItem
@@ -9,5 +12,6 @@ from .invoice import Invoice
 from .order_session import OrderSessionDB
 from .order_session_item import OrderSessionItemDB
 from .gst_config import GSTConfig
+from .color_alias import ColorAlias
 from .message import Message
 from .owner import Owner
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ColorAlias(Base):
+    """
+    Admin-defined color name → canonical color (e.g. "rani" → "Magenta"),
+    on top of the built-in dictionary in services/color_normalizer.
+    """
+
+    __tablename__ = "color_aliases"
+
+    alias = Column(String, primary_key=True)  # stored normalized (lowercase, single spaces)
+    color = Column(String, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -33,3 +33,13 @@ class InventoryBatch(Base):
         server_default=func.now(),
         onupdate=func.now()
     )
+
+    # Bumped by every write; adjustments compare-and-swap on it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Case-insensitive lookups (crud.inventory matches on lower(color))
+    __table_args__ = (
+        Index("ix_inventory_batches_color_lower", func.lower(color)),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
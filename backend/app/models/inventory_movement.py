@@ -0,0 +1,72 @@
+from enum import Enum
+from sqlalchemy import Column, String, Integer, BigInteger, Numeric, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class MovementType(str, Enum):
+
+    OPENING_BALANCE = "opening_balance"   # stock that predates the journal
+    RECEIPT = "receipt"
+    ROLL_OPENING = "roll_opening"         # rolls → loose meters
+    ORDER_DEDUCTION = "order_deduction"
+    ADJUSTMENT = "adjustment"
+
+
+class InventoryMovement(Base):
+    """
+    Append-only stock journal. Never updated or deleted; the counters on
+    InventoryBatch are a cached projection of the sum of these rows.
+    """
+
+    __tablename__ = "inventory_movements"
+
+    # Sequential id = journal order
+    movement_id = Column(BigInteger().with_variant(Integer(), "sqlite"), primary_key=True, autoincrement=True)
+
+    batch_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("inventory_batches.batch_id"),
+        nullable=False
+    )
+
+    movement_type = Column(String, nullable=False)
+    rolls_delta = Column(Integer, nullable=False, default=0)
+    loose_meters_delta = Column(Numeric, nullable=False, default=0)
+
+    order_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    reason = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_inventory_movements_batch_created", "batch_id", "created_at"),
+    )
+
+
+class InventoryStockSnapshot(Base):
+    """
+    Per-batch stock at a point in time: the sum of all movements with
+    created_at <= as_of. Point-in-time queries start from the latest
+    snapshot and only add the movements after it.
+    """
+
+    __tablename__ = "inventory_stock_snapshots"
+
+    snapshot_id = Column(BigInteger().with_variant(Integer(), "sqlite"), primary_key=True, autoincrement=True)
+
+    batch_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("inventory_batches.batch_id"),
+        nullable=False
+    )
+
+    as_of = Column(DateTime(timezone=True), nullable=False)
+
+    rolls = Column(Integer, nullable=False)
+    loose_meters = Column(Numeric, nullable=False)
+
+    __table_args__ = (
+        Index("ix_inventory_stock_snapshots_batch_as_of", "batch_id", "as_of"),
+    )
@@ -0,0 +1,40 @@
+import uuid
+from sqlalchemy import Column, Float, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class InventoryReservation(Base):
+    """
+    Soft hold on part of a batch for an order still in negotiation.
+    One row per (session item, batch) allocation; expires unless refreshed.
+    Deleted when the item is cancelled / replaced or the order closes.
+    """
+
+    __tablename__ = "inventory_reservations"
+
+    reservation_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    batch_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("inventory_batches.batch_id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    order_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    session_item_id = Column(UUID(as_uuid=True), nullable=False)
+
+    meters = Column(Float, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Active-holds aggregate: range scan on expires_at, index-only on Postgres
+    __table_args__ = (
+        Index(
+            "ix_inventory_reservations_active",
+            "expires_at", "batch_id",
+            postgresql_include=["order_id", "meters"]
+        ),
+    )
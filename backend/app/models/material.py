@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Numeric
+from sqlalchemy import Column, String, Numeric, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 
@@ -12,3 +12,7 @@ class Material(Base):
     category = Column(String, nullable=True)
     price_per_meter = Column(Numeric, nullable=False, default=150.0)
 
+    # Case-insensitive lookups (crud.inventory matches on lower(material_name))
+    __table_args__ = (
+        Index("ix_materials_material_name_lower", func.lower(material_name)),
+    )
@@ -14,4 +14,6 @@ class Message(Base):
     direction = Column(String, nullable=False)  # incoming / outgoing
     content = Column(String, nullable=False)
     message_type = Column(String, default="text")  # text, image, audio
+    intent = Column(String, nullable=True)  # LLM-labelled intent (training data for local classifier)
+    transcript = Column(String, nullable=True)  # Voice note transcript (audio messages only)
     timestamp = Column(DateTime, default=datetime.utcnow)
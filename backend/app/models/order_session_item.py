@@ -31,7 +31,7 @@ class OrderSessionItemDB(Base):
     color = Column(String, nullable=True)
     input_quantity = Column(Float, nullable=False)
     input_unit = Column(String, nullable=False, default="meter")
-    normalized_meters = Column(Float, nullable=False)
+    normalized_meters = Column(Float, nullable=True)  # None: roll length still unknown
 
     # --- Item state ---
     status = Column(String, nullable=False, default="negotiating")
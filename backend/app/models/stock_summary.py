@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class StockSummary(Base):
+    """
+    Stock totals per (material, color), kept in step with inventory_batches
+    in the same transaction as every journaled batch mutation. Dashboards
+    and alerts read these rows instead of re-aggregating all batches.
+    """
+
+    __tablename__ = "stock_summary"
+
+    material_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("materials.material_id"),
+        primary_key=True
+    )
+    color = Column(String, primary_key=True)
+
+    total_rolls = Column(Integer, nullable=False, default=0)
+    loose_meters = Column(Numeric, nullable=False, default=0)
+    total_meters = Column(Numeric, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    # Low-stock filters (analytics, daily alert)
+    __table_args__ = (
+        Index("ix_stock_summary_total_rolls", "total_rolls"),
+    )
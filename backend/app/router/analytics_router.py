@@ -5,7 +5,7 @@ from datetime import date, datetime, timedelta
 from app.database import SessionLocal
 from app.models.order import Order
 from app.models.material import Material
-from app.models.inventory import InventoryBatch
+from app.crud.stock_summary import low_stock_query
 from app.models.credit_ledger import CreditLedger
 from typing import List, Dict, Any
 
@@ -48,19 +48,8 @@ def get_analytics_summary(db: Session = Depends(get_db)):
 
     # 4. Low Stock Count (Materials + Color variant with < 10 rolls total)
     # Matching logic with Business Memory page
-    low_stock_count_subquery = db.query(
-            Material.material_id,
-            InventoryBatch.color,
-            func.coalesce(func.sum(InventoryBatch.rolls_available), 0).label("total_rolls")
-        )\
-        .outerjoin(InventoryBatch, Material.material_id == InventoryBatch.material_id)\
-        .group_by(Material.material_id, InventoryBatch.color)\
-        .subquery()
-
-    low_stock_count = db.query(func.count())\
-        .select_from(low_stock_count_subquery)\
-        .filter(low_stock_count_subquery.c.total_rolls < 10)\
-        .scalar() or 0
+    # Read from the stock_summary table (no GROUP BY over batches)
+    low_stock_count = low_stock_query(db, 10).count()
 
     return {
         "todayRevenue": float(today_revenue),
@@ -224,15 +213,8 @@ def get_business_memory(view_type: str = 'month', selected_date: str = None, db:
     
     # Low stock items (< 10 rolls) per Color
     # Use LEFT JOIN to catch materials with NO batches (0 stock)
-    low_stock_items = db.query(
-            Material.material_name,
-            InventoryBatch.color,
-            func.coalesce(func.sum(InventoryBatch.rolls_available), 0).label("total_rolls")
-        )\
-        .outerjoin(InventoryBatch, Material.material_id == InventoryBatch.material_id)\
-        .group_by(Material.material_name, InventoryBatch.color)\
-        .having(func.coalesce(func.sum(InventoryBatch.rolls_available), 0) < 10)\
-        .limit(10).all()
+    # Pre-aggregated in stock_summary; materials with no stock rows included
+    low_stock_items = low_stock_query(db, 10).limit(10).all()
 
     inventory_alerts = []
     for name, color, rolls in low_stock_items:
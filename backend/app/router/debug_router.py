@@ -53,3 +53,23 @@ def simulate_overdue_customer(phone: str, db: Session = Depends(get_db)):
     db.commit()
     
     return {"status": f"Customer {phone} is now OVERDUE (Bal: 5000, Last Pay: 10 days ago). Send a message to test."}
+
+@router.get("/media-cache")
+def media_cache_stats():
+    """
+    Hit/miss counters for the media extraction and transcript content-hash caches.
+    """
+    from app.services.media_cache import extraction_cache, transcript_cache
+    return {
+        "extraction": extraction_cache.stats(),
+        "transcripts": transcript_cache.stats(),
+    }
+
+
+@router.get("/inventory-snapshot")
+def inventory_snapshot_stats():
+    """
+    Version, staleness and refresh counters for the in-process inventory snapshot.
+    """
+    from app.services.inventory_snapshot import inventory_snapshot
+    return inventory_snapshot.stats()
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models.inventory import InventoryBatch
 from app.models.material import Material
-from app.schemas.inventory_schema import InventoryBatchCreate, InventoryBatchSchema
-from typing import List
-from datetime import datetime
+from app.schemas.inventory_schema import InventoryBatchCreate, InventoryBatchAdjust, InventoryBatchSchema
+from app.crud.inventory import adjust_batch_stock, InventoryConflictError
+from app.models.inventory_movement import MovementType
+from app.crud.inventory_journal import (
+    movement, record_movements, get_batch_movements, get_stock_as_of, find_projection_drift
+)
+from app.services.inventory_import import FORMATS, detect_format, import_inventory
+from app.services.color_normalizer import canonicalize_color
+from typing import List, Optional
+from datetime import datetime, timezone
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
@@ -67,7 +74,7 @@ def add_inventory(batch: InventoryBatchCreate, db: Session = Depends(get_db)):
     
     new_batch = InventoryBatch(
         material_id=material.material_id,
-        color=batch.color or "Unknown",
+        color=canonicalize_color(db, batch.color, fuzzy=False) or "Unknown",
         rolls_available=batch.rolls,
         meters_per_roll=batch.meters_per_roll,
         loose_meters_available=0, # Initial batch assumed full rolls
@@ -76,7 +83,121 @@ def add_inventory(batch: InventoryBatchCreate, db: Session = Depends(get_db)):
     
     
     db.add(new_batch)
+    db.flush()
+
+    record_movements(db, [movement(
+        new_batch.batch_id, MovementType.RECEIPT,
+        rolls_delta=new_batch.rolls_available,
+        loose_meters_delta=new_batch.loose_meters_available
+    )])
+
     db.commit()
     db.refresh(new_batch)
     
     return {"status": "added", "batch_id": new_batch.batch_id}
+
+
+@router.post("/adjust")
+def adjust_inventory(adjustment: InventoryBatchAdjust, db: Session = Depends(get_db)):
+    """
+    Stock-take correction: add / subtract / set rolls and loose meters.
+    Version compare-and-swap; a batch locked by an approval is retried
+    rather than waited on, and 409 is returned if it stays busy.
+    """
+    try:
+        result = adjust_batch_stock(
+            db,
+            adjustment.batch_id,
+            adjustment.adjustment_type.lower(),
+            rolls=adjustment.rolls,
+            meters=adjustment.meters,
+            reason=adjustment.reason
+        )
+    except InventoryConflictError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db.commit()
+    return {"status": "adjusted", **result}
+
+
+@router.post("/import")
+def import_inventory_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-add batches from a CSV or NDJSON upload (one transaction).
+    Bad rows are skipped and listed in the report.
+    """
+    fmt = (format or detect_format(file.filename, file.content_type) or "").lower()
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format. Use 'csv' or 'ndjson'.")
+
+    try:
+        report = import_inventory(db, file.file, fmt)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded.")
+
+    db.commit()
+    return {"status": "imported", "format": fmt, **report}
+
+
+@router.get("/movements/{batch_id}")
+def list_batch_movements(batch_id: str, limit: int = 100, db: Session = Depends(get_db)):
+    """
+    Journal of a batch, newest first.
+    """
+    try:
+        movements = get_batch_movements(db, batch_id, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid batch ID format. Expected UUID.")
+
+    return [
+        {
+            "movement_id": m.movement_id,
+            "movement_type": m.movement_type,
+            "rolls_delta": m.rolls_delta,
+            "loose_meters_delta": float(m.loose_meters_delta),
+            "order_id": str(m.order_id) if m.order_id else None,
+            "reason": m.reason,
+            "created_at": m.created_at
+        }
+        for m in movements
+    ]
+
+
+@router.get("/stock-as-of")
+def stock_as_of(at: datetime, batch_id: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Point-in-time stock per batch, from the latest snapshot + later movements.
+    """
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+
+    try:
+        stock = get_stock_as_of(db, at, [batch_id] if batch_id else None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid batch ID format. Expected UUID.")
+
+    return {
+        "as_of": at,
+        "batches": {
+            batch_id: {"rolls": values["rolls"], "loose_meters": values["loose_meters"]}
+            for batch_id, values in stock.items()
+        }
+    }
+
+
+@router.get("/journal/drift")
+def journal_drift(db: Session = Depends(get_db)):
+    """
+    Batches whose counters no longer match their movement journal.
+    """
+    drift = find_projection_drift(db)
+    return {"consistent": not drift, "drift": drift}
@@ -6,6 +6,8 @@ based on the current DB-backed workflow state.
 This module is a *dispatcher only* — no business logic lives here.
 """
 
+import time
+
 from app.database import SessionLocal
 
 from app.services.order_processing_service import process_customer_order
@@ -24,11 +26,25 @@ from app.workflows.order_states import OrderState
 from app.schemas.inventory_schema import InventoryBatchSchema
 
 
+NO_MEDIA_ITEMS_REPLY = (
+    "🤔 Is image/voice se koi order items nahi dikhe.\n\n"
+    "Kripya order aise bhejein:\n"
+    "📝 Text: *50m red cotton aur 20m blue polyester*\n"
+    "📷 Clear photo with item list\n"
+    "🎤 Voice note mein material, color, quantity batayein"
+)
+
+
 # ---------------------------------------------------------
 # MAIN ROUTER ENTRY
 # ---------------------------------------------------------
 
-def route_message(phone: str, message: str, media_info: dict | None = None) -> str:
+def route_message(
+    phone: str,
+    message: str,
+    media_info: dict | None = None,
+    message_id: str | None = None
+) -> str:
 
     # ---------------------------------------------------------
     # 👑 OWNER BOT INTERCEPTION
@@ -54,14 +70,18 @@ def route_message(phone: str, message: str, media_info: dict | None = None) -> s
             # If user sends a NEW image/voice while in confirmation,
             # treat as replacement — cancel old and re-extract
             if media_info:
+                from app.services.media_working_set import drop_working_set
+
                 update_workflow_state(db, session.order_id, OrderState.ORDER_COMPLETED)
                 db.commit()
+                drop_working_set(session.order_id)
                 session = None  # Fall through to new order flow below
             else:
                 result = handle_media_confirmation(
                     db=db,
                     customer_phone=phone,
-                    message=message
+                    message=message,
+                    session=session
                 )
                 return result
 
@@ -105,12 +125,12 @@ def route_message(phone: str, message: str, media_info: dict | None = None) -> s
         # 📸 MEDIA ORDER (Image / Voice Note)
         # -----------------------------------------------
         if media_info:
-            return _handle_media_order(db, phone, message, media_info)
+            return _handle_media_order(db, phone, message, media_info, message_id)
 
         # -----------------------------------------------
         # 💬 TEXT ORDER (with intent classification)
         # -----------------------------------------------
-        return _handle_text_order(db, phone, message)
+        return _handle_text_order(db, phone, message, message_id)
 
     finally:
         db.close()
@@ -120,27 +140,132 @@ def route_message(phone: str, message: str, media_info: dict | None = None) -> s
 # 📸 MEDIA ORDER HANDLER
 # ---------------------------------------------------------
 
-def _handle_media_order(db, phone: str, message: str, media_info: dict) -> str:
+def _handle_media_order(
+    db,
+    phone: str,
+    message: str,
+    media_info: dict,
+    message_id: str | None = None
+) -> str:
     """
     Handles image/voice note messages.
-    Extracts items → shows echo-back → waits for confirmation.
+    Images are collected per phone for a short window (albums of a
+    handwritten list) and answered later from the batch flush; voice
+    notes are processed right away.
+    """
+    from app.services.media_batcher import media_batcher, get_batch_window
+
+    if media_info["type"] == "image" and get_batch_window() > 0:
+        queued = media_batcher.add(phone, media_info, message, on_flush=_process_image_batch)
+        print(f"Image queued for {phone} ({queued} in batch)")
+        return ""  # Confirmation is sent when the batch flushes
+
+    return _process_media_order(db, phone, [media_info], message, message_id)
+
+
+def _process_image_batch(phone: str, media_infos: list, captions: list) -> None:
     """
+    Batch flush callback (runs on the batcher's timer thread).
+    One vision call for all images → one confirmation message.
+    """
+    from app.integrations.whatsapp import send_whatsapp_message
+    from app.services.media_service import release_prefetched_media
+
+    db = SessionLocal()
+
     try:
-        from app.services.media_service import download_whatsapp_media
+        # Same replacement rule as route_message: new media replaces
+        # an order still waiting for media confirmation
+        session = get_active_session_by_phone(db, phone)
+        if session and session.workflow_state == OrderState.MEDIA_CONFIRMATION:
+            from app.services.media_working_set import drop_working_set
+
+            update_workflow_state(db, session.order_id, OrderState.ORDER_COMPLETED)
+            db.commit()
+            drop_working_set(session.order_id)
 
-        media_bytes, mime_type = download_whatsapp_media(media_info["id"])
+        reply = _process_media_order(db, phone, media_infos, " / ".join(captions) or None)
+
+        if reply:
+            send_whatsapp_message(phone, reply)
 
-        if media_info["type"] == "image":
+    finally:
+        db.close()
+        for info in media_infos:
+            if info.get("prefetch"):
+                release_prefetched_media(info["prefetch"])
+
+
+def _process_media_order(
+    db,
+    phone: str,
+    media_infos: list,
+    message: str | None,
+    message_id: str | None = None
+) -> str:
+    """
+    Extracts items from one voice note or one/more images
+    → shows echo-back → waits for confirmation.
+    """
+    from app.services.audio_preprocessor import VoiceNoteTooLongError
+    from app.services.media_service import MediaRejectedError
+
+    started_at = time.perf_counter()
+    media_type = media_infos[0]["type"]
+    media_files = []
+    transcript = None
+
+    try:
+        from app.services.media_service import get_media
+
+        # Spooled temp file handles (usually prefetched at webhook receipt)
+        # — passed straight to the extractors
+        for info in media_infos:
+            media_files.append(get_media(info))
+
+        if media_type == "image" and len(media_files) == 1:
             from app.services.image_order_extractor import extract_order_from_image
-            extracted_items = extract_order_from_image(media_bytes, mime_type, caption=message)
+            media_file, mime_type = media_files[0]
+            extracted_items = extract_order_from_image(media_file, mime_type, caption=message)
 
-        elif media_info["type"] == "audio":
+        elif media_type == "image":
+            from app.services.image_order_extractor import extract_order_from_images
+            extracted_items = extract_order_from_images(media_files, caption=message)
+
+        elif media_type == "audio":
             from app.services.voice_order_extractor import extract_order_from_voice
-            extracted_items = extract_order_from_voice(media_bytes, mime_type)
+            media_file, mime_type = media_files[0]
+            extracted_items, transcript = extract_order_from_voice(media_file, mime_type)
+
+            if message_id and transcript:
+                _store_transcript(db, message_id, transcript)
 
         else:
             return "🙏 Abhi hum sirf text, image aur voice messages support karte hain."
 
+    except MediaRejectedError as e:
+        print(f"Media rejected: {e}")
+        if e.reason == "too_large":
+            return (
+                "📦 Ye file bahut badi hai, hum process nahi kar paaye.\n\n"
+                "Kripya chhoti photo / chhota voice note bhejein, "
+                "ya order text mein likh dein:\n"
+                "Example: *50m red cotton aur 20m blue polyester*"
+            )
+        return (
+            "🙏 Ye file type support nahi hai.\n\n"
+            "Kripya photo (JPG/PNG), voice note, ya text mein order bhejein:\n"
+            "Example: *50m red cotton aur 20m blue polyester*"
+        )
+
+    except VoiceNoteTooLongError as e:
+        return (
+            f"🎤 Aapka voice note thoda lamba hai ({e.duration_seconds:.0f} sec).\n\n"
+            f"Kripya {e.max_seconds / 60:.0f} minute se chhota voice note bhejein, "
+            "ya order text mein likh dein:\n"
+            "Example: *50m red cotton aur 20m blue polyester*"
+        )
+
     except Exception as e:
         print(f"Media extraction failed: {e}")
         return (
@@ -149,15 +274,27 @@ def _handle_media_order(db, phone: str, message: str, media_info: dict) -> str:
             "Example: *50m red cotton aur 20m blue polyester*"
         )
 
+    finally:
+        for media_file, _ in media_files:
+            media_file.close()
+
+    from app.services.catalog_resolver import resolve_measurements
+    resolve_measurements(db, extracted_items or [])
+
+    # Voice note without order items — let the text flow answer the
+    # transcript (greeting / help / query replies). The transcript was
+    # already parsed: pass the empty result instead of extracting again
+    if not extracted_items and transcript:
+        return _handle_text_order(db, phone, transcript, pre_extracted_items=[])
+
     # Empty extraction
     if not extracted_items:
-        return (
-            "🤔 Is image/voice se koi order items nahi dikhe.\n\n"
-            "Kripya order aise bhejein:\n"
-            "📝 Text: *50m red cotton aur 20m blue polyester*\n"
-            "📷 Clear photo with item list\n"
-            "🎤 Voice note mein material, color, quantity batayein"
-        )
+        return NO_MEDIA_ITEMS_REPLY
+
+    print(
+        f"{media_type.capitalize()} order ({len(media_infos)} file(s)) extracted in "
+        f"{(time.perf_counter() - started_at) * 1000:.0f}ms"
+    )
 
     # -----------------------------------------------
     # 🔒 MEDIA CONFIRMATION GATE
@@ -167,6 +304,14 @@ def _handle_media_order(db, phone: str, message: str, media_info: dict) -> str:
     update_workflow_state(db, session.order_id, OrderState.MEDIA_CONFIRMATION)
     db.commit()
 
+    # Keep items, prompt context and candidate batches in memory
+    # for the confirmation / edit replies that follow
+    try:
+        from app.services.media_working_set import start_working_set
+        start_working_set(db, session.order_id, extracted_items, context=transcript or message)
+    except Exception as e:
+        print(f"Media working set not started (non-critical): {e}")
+
     # Build echo-back message
     item_lines = []
     for item in extracted_items:
@@ -175,7 +320,12 @@ def _handle_media_order(db, phone: str, message: str, media_info: dict) -> str:
 
     item_summary = "\n".join(item_lines)
 
-    prefix = "📷 Image" if media_info["type"] == "image" else "🎤 Voice note"
+    if media_type == "audio":
+        prefix = "🎤 Voice note"
+    elif len(media_infos) > 1:
+        prefix = f"📷 {len(media_infos)} images"
+    else:
+        prefix = "📷 Image"
 
     return (
         f"{prefix} se samjha gaya order:\n\n"
@@ -191,10 +341,18 @@ def _handle_media_order(db, phone: str, message: str, media_info: dict) -> str:
 # 💬 TEXT ORDER HANDLER
 # ---------------------------------------------------------
 
-def _handle_text_order(db, phone: str, message: str) -> str:
+def _handle_text_order(
+    db,
+    phone: str,
+    message: str,
+    message_id: str | None = None,
+    pre_extracted_items: list | None = None
+) -> str:
     """
     Handles text messages with intent classification.
     Distinguishes orders from greetings, help, and general queries.
+    pre_extracted_items: items already parsed from `message` (voice
+    transcripts) — the order is not extracted a second time.
     """
     # -----------------------------------------------
     # STEP 1: Intent Classification
@@ -204,6 +362,10 @@ def _handle_text_order(db, phone: str, message: str) -> str:
     intent_result = classify_message_intent(message)
     intent = intent_result.get("intent", "unclear")
 
+    # Store LLM labels as training data for the local classifier
+    if message_id and intent_result.get("source") == "llm":
+        _store_intent_label(db, message_id, intent)
+
     # Non-order intents — reply directly
     if intent in ["greeting", "help", "general_query", "unclear"]:
         reply = intent_result.get("reply", "")
@@ -231,14 +393,16 @@ def _handle_text_order(db, phone: str, message: str) -> str:
     # -----------------------------------------------
     # STEP 2: Process as order
     # -----------------------------------------------
-    inventory_batches = get_all_inventory_batches(db)
+    if pre_extracted_items is not None and not pre_extracted_items:
+        return NO_MEDIA_ITEMS_REPLY
 
     try:
+        # Inventory is loaded for the extracted items only
         result = process_customer_order(
             db=db,
             message=message,
             customer_phone=phone,
-            available_batches=inventory_batches
+            pre_extracted_items=pre_extracted_items
         )
     except (ValueError, Exception) as e:
         print(f"Order extraction failed: {e}")
@@ -254,6 +418,41 @@ def _handle_text_order(db, phone: str, message: str) -> str:
     return _build_combined_order_response(result)
 
 
+def _store_intent_label(db, message_id: str, intent: str) -> None:
+    """
+    Saves the LLM-decided intent on the stored Message row.
+    Non-critical: a failure here must never block the reply.
+    """
+    from app.models.message import Message
+
+    try:
+        db.query(Message).filter(Message.message_id == message_id).update(
+            {"intent": intent}
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Storing intent label failed (non-critical): {e}")
+
+
+def _store_transcript(db, message_id: str, transcript: str) -> None:
+    """
+    Saves the voice note transcript on the stored Message row
+    (reused by media confirmation edits and for later analysis).
+    Non-critical: a failure here must never block the reply.
+    """
+    from app.models.message import Message
+
+    try:
+        db.query(Message).filter(Message.message_id == message_id).update(
+            {"transcript": transcript}
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Storing transcript failed (non-critical): {e}")
+
+
 # ---------------------------------------------------------
 # 📋 COMBINED MULTI-ITEM RESPONSE BUILDER
 # ---------------------------------------------------------
@@ -299,28 +498,9 @@ def _build_combined_order_response(result: dict) -> str:
 
 def get_all_inventory_batches(db):
     """
-    Fetch DB inventory and convert to schema
-    expected by Dev-1 logic.
+    Current inventory in the schema expected by Dev-1 logic.
+    Served from the shared in-process snapshot (see inventory_snapshot).
     """
+    from app.services.inventory_snapshot import get_inventory_batches
 
-    from app.models.inventory import InventoryBatch as DBBatch
-
-    batches = db.query(DBBatch).all()
-
-    converted = []
-
-    for batch in batches:
-        converted.append(
-            InventoryBatchSchema(
-                material_name=batch.material.material_name,
-                material_id=str(batch.material_id),
-                color=batch.color,
-                batch_id=str(batch.batch_id),
-                rolls_available=batch.rolls_available,
-                meters_per_roll=batch.meters_per_roll,
-                loose_meters_available=batch.loose_meters_available,
-                created_at=batch.created_at
-            )
-        )
-
-    return converted
+    return get_inventory_batches(db)
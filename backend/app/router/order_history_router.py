@@ -18,11 +18,14 @@ from app.models.order_session import OrderSessionDB
 from app.models.order_session_item import OrderSessionItemDB
 from app.models.material import Material
 from app.services.order_session_manager import get_session_by_order_id, update_workflow_state
-from app.crud.inventory import deduct_inventory_from_batch, deduct_meters_from_batch
+from app.services.inventory_reservations import release_order_holds
+from app.crud.inventory import deduct_allocations_bulk
+from app.services.catalog_resolver import find_material
 from app.crud.invoice import create_invoice
 from app.integrations.whatsapp import send_whatsapp_message, upload_media, send_document_message
 from app.utils.pdf import generate_invoice_pdf
 from app.workflows.order_states import OrderState
+from app.workflows.order_item_status import OrderItemStatus
 import logging
 import os
 
@@ -113,12 +116,13 @@ def get_pending_orders():
             total_estimate = 0
             for item in session.items:
                 material_name = item.material_name or "Unknown"
-                qty = float(item.normalized_meters or item.input_quantity or 0)
+                # Unknown meters (rolls of unknown length) are not priced
+                qty = float(item.normalized_meters or 0)
                 
                 # Estimate price
                 # We need to look up material price to be accurate
                 # Use a simple query or Material model
-                mat_obj = db.query(Material).filter(func.lower(Material.material_name) == material_name.lower()).first()
+                mat_obj = find_material(db, material_name)
                 price = float(mat_obj.price_per_meter) if mat_obj and mat_obj.price_per_meter else 0.0
                 if price == 0: price = 150.0 # Fallback
                 
@@ -168,22 +172,32 @@ def approve_order(order_id: str):
         if db_session.workflow_state != OrderState.WAITING_OWNER_CONFIRMATION.value:
             raise HTTPException(status_code=400, detail=f"Order not awaiting confirmation (current: {db_session.workflow_state})")
 
+        active_items = [
+            item for item in session.items
+            if item.status not in [OrderItemStatus.CANCELLED, OrderItemStatus.REPLACED]
+        ]
+
+        # Every item needs its quantity in meters (order_items.quantity_meters)
+        missing = [item.measurement.material_name for item in active_items if not item.measurement.normalized_meters]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Quantity in meters unknown for: {', '.join(missing)}. Cannot approve order.")
+
         # 3. Operations
-        # Reuse logic from main.py (simplified import)
-        for item in session.items:
-            if item.fulfilled_batches:
-                for batch in item.fulfilled_batches:
-                    # SMART DEDUCTION: Use allocated meters directly
-                    if "allocated_meters" in batch:
-                        deduct_meters_from_batch(db, batch["batch_id"], batch["allocated_meters"])
-                    else:
-                        # Fallback for old structure (if any)
-                        deduct_inventory_from_batch(db, batch["batch_id"], batch.get("rolls",0), batch.get("loose_meters",0))
+        # Deduct every allocation at once: one sorted row lock, one batched UPDATE
+        deduct_allocations_bulk(db, [
+            batch
+            for item in session.items
+            for batch in (item.fulfilled_batches or [])
+        ], order_id=order_id)
+
+        # Deducted stock is no longer held for this order
+        release_order_holds(db, order_id)
 
+        for item in active_items:
             # Create Permanent Item
             mat_name = item.measurement.material_name
             # Case-insensitive lookup
-            mat_obj = db.query(Material).filter(func.lower(Material.material_name) == mat_name.lower()).first()
+            mat_obj = find_material(db, mat_name)
             
             if mat_obj:
                 price = float(mat_obj.price_per_meter) if mat_obj.price_per_meter else 150.0
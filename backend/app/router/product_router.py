@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models.material import Material
 from app.schemas.material_schema import MaterialSchema, MaterialPriceUpdate, MaterialCreate
+from app.schemas.color_alias_schema import ColorAliasSchema
+from app.crud.color_alias import get_all_color_aliases, set_color_alias, delete_color_alias
 from decimal import Decimal
 
 router = APIRouter(prefix="/config", tags=["Configuration"])
@@ -20,21 +22,12 @@ def get_db():
 def get_all_prices(db: Session = Depends(get_db)):
     """
     List all materials and their current prices.
-    Total stock is calculated dynamically from batches.
+    Total stock comes from the stock_summary table.
     """
-    from sqlalchemy import func
-    from app.models.inventory import InventoryBatch
+    from app.crud.stock_summary import get_stock_meters_by_material
 
-    # 1. Fetch stock aggregates (avoid N+1)
-    stock_query = db.query(
-        InventoryBatch.material_id,
-        func.sum(
-            (InventoryBatch.rolls_available * InventoryBatch.meters_per_roll) + 
-            InventoryBatch.loose_meters_available
-        ).label("total_meters")
-    ).group_by(InventoryBatch.material_id).all()
-
-    stock_map = {str(s.material_id): float(s.total_meters or 0) for s in stock_query}
+    # 1. Stock totals (pre-aggregated per material / color)
+    stock_map = get_stock_meters_by_material(db)
 
     # 2. Fetch materials
     materials = db.query(Material).all()
@@ -111,3 +104,32 @@ def create_material(new_mat: MaterialCreate, db: Session = Depends(get_db)):
         "price_per_meter": float(material.price_per_meter),
         "category": material.category
     }
+
+
+@router.get("/color-aliases", response_model=list[ColorAliasSchema])
+def list_color_aliases(db: Session = Depends(get_db)):
+    """
+    Admin color aliases (on top of the built-in Hindi dictionary).
+    """
+    return get_all_color_aliases(db)
+
+
+@router.post("/color-aliases", response_model=ColorAliasSchema)
+def upsert_color_alias(entry: ColorAliasSchema, db: Session = Depends(get_db)):
+    """
+    Map a customer color name to a stored color, e.g. "rani" → "Magenta".
+    """
+    try:
+        return set_color_alias(db, entry.alias, entry.color)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/color-aliases/{alias}")
+def remove_color_alias(alias: str, db: Session = Depends(get_db)):
+    """
+    Remove an admin color alias.
+    """
+    if not delete_color_alias(db, alias):
+        raise HTTPException(status_code=404, detail=f"Color alias '{alias}' not found")
+    return {"status": "deleted", "alias": alias}
@@ -1,13 +1,12 @@
 import os
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models.inventory import InventoryBatch
 from app.integrations.whatsapp import send_whatsapp_message
 
 
 def check_low_stock_daily():
     """
-    Checks for batches with low stock (< 5 rolls) and notifies the owner.
+    Checks for materials / colors with low stock (< 5 rolls in total) and notifies the owner.
     """
     OWNER_PHONE = os.getenv("OWNER_PHONE_NUMBER")
     if not OWNER_PHONE:
@@ -16,20 +15,10 @@ def check_low_stock_daily():
 
     db: Session = SessionLocal()
     try:
-        from app.models.material import Material
-        
-        # Explicit JOIN to ensure we get the data
-        results = (
-            db.query(
-                InventoryBatch.batch_id,
-                InventoryBatch.rolls_available, 
-                InventoryBatch.color,
-                Material.material_name
-            )
-            .join(Material, InventoryBatch.material_id == Material.material_id)
-            .filter(InventoryBatch.rolls_available < 5)
-            .all()
-        )
+        from app.crud.stock_summary import low_stock_query
+
+        # Per material / color totals from stock_summary (indexed on total_rolls)
+        results = low_stock_query(db, 5).all()
         
         if not results:
             print("No low stock items found.")
@@ -39,8 +28,9 @@ def check_low_stock_daily():
         msg_lines = ["⚠️ *Low Stock Alert*"]
         msg_lines.append("") # Empty line
         
-        for batch_id, rolls, color, mat_name in results:
-            msg_lines.append(f"• *{mat_name}* ({color}): {rolls} rolls left")
+        for mat_name, color, rolls in results:
+            label = f"{mat_name} ({color})" if color else mat_name
+            msg_lines.append(f"• *{label}*: {rolls} rolls left")
         
         msg_lines.append("\nPlease restock soon.")
         
@@ -0,0 +1,26 @@
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.crud.inventory_journal import backfill_opening_balances, take_stock_snapshots
+
+
+def snapshot_inventory_daily():
+    """
+    Journals stock the movements don't account for, then writes per-batch
+    stock snapshots so point-in-time queries only replay recent movements.
+    """
+    db: Session = SessionLocal()
+
+    try:
+        backfilled = backfill_opening_balances(db)
+        db.flush()
+        snapshots = take_stock_snapshots(db)
+        db.commit()
+        print(f"Inventory journal: {backfilled} opening balances, {snapshots} snapshots")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Inventory snapshot job failed: {e}")
+
+    finally:
+        db.close()
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.crud.reservation import purge_expired_reservations
+
+
+def purge_expired_reservations_job():
+    """
+    Deletes expired inventory holds. Availability checks already ignore
+    them; this only keeps the table small.
+    """
+    db: Session = SessionLocal()
+
+    try:
+        purged = purge_expired_reservations(db)
+        db.commit()
+        if purged:
+            print(f"Purged {purged} expired inventory reservations")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Reservation purge failed: {e}")
+
+    finally:
+        db.close()
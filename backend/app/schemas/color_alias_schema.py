@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class ColorAliasSchema(BaseModel):
+    alias: str
+    color: str
+
+    class Config:
+        from_attributes = True
@@ -9,6 +9,13 @@ class InventoryBatchCreate(BaseModel):
     meters_per_roll: float
     total_meters: float
 
+class InventoryImportRow(BaseModel):
+    material_name: str
+    color: Optional[str] = None
+    rolls: int
+    meters_per_roll: float
+    loose_meters: float = 0
+
 class InventoryBatchAdjust(BaseModel):
     batch_id: str
     adjustment_type: str # 'add', 'subtract', 'set'
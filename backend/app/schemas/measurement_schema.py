@@ -10,5 +10,5 @@ class TextileMeasurement(BaseModel):
     material_name: str
     color: str | None = None
     input_quantity: float
-    input_unit: str  # Example: "roll", "meter"
-    normalized_meters: float
+    input_unit: str  # Example: "roll", "meter", "gaj"
+    normalized_meters: float | None = None  # None until unit_normalizer knows the roll length
@@ -0,0 +1,292 @@
+"""
+Roll-aware batch allocation.
+
+check_inventory used to take batches first-fit in whatever order they came
+back. It ignored batch age and roll boundaries: deduct_meters_from_batch
+takes loose meters first and then opens whole rolls, so a bad split opens
+extra rolls and leaves new loose fragments behind.
+
+allocate() picks per-batch meters with the same loose-then-rolls model the
+deduction uses, so the plan's rolls_opened / loose_created are exactly
+what approval will do. Strategies (INVENTORY_ALLOCATION_STRATEGY):
+
+    fifo        : oldest batch first (loose, then rolls), like stock rotation
+    loose_first : all loose meters first (biggest fragments first), then
+                  rolls oldest-first
+    min_rolls   : loose meters first, then a small branch-and-bound over
+                  roll counts: fewest rolls opened, then least new loose
+                  meters, then fewest batches, then oldest (default)
+
+The solver stops at INVENTORY_ALLOCATION_TIME_BUDGET_MS and returns the
+best plan found so far (greedy seed included), flagged optimal=False.
+"""
+
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.services.inventory_index import batch_total_meters
+
+
+EPSILON = 1e-6
+
+# Search depth guard — above this many batches of one item, keep the greedy plan
+MAX_SEARCH_BATCHES = 200
+
+
+def _get_strategy() -> str:
+    return os.getenv("INVENTORY_ALLOCATION_STRATEGY", "min_rolls").lower()
+
+
+def _get_time_budget() -> float:
+    return float(os.getenv("INVENTORY_ALLOCATION_TIME_BUDGET_MS", "20")) / 1000
+
+
+@dataclass
+class _Stock:
+    """Usable stock of one batch (after other orders' holds)."""
+    batch_id: str
+    created_at: datetime | None
+    loose: float
+    rolls: int
+    meters_per_roll: float
+
+    @property
+    def total(self) -> float:
+        return self.loose + self.rolls * self.meters_per_roll
+
+
+@dataclass
+class Allocation:
+    fulfilled_batches: list = field(default_factory=list)  # [{batch_id, allocated_meters, rolls_opened}]
+    allocated_meters: float = 0.0
+    available_meters: float = 0.0
+    rolls_opened: int = 0
+    loose_created: float = 0.0
+    strategy: str = ""
+    optimal: bool = True
+    solve_ms: float = 0.0
+
+
+def _stock_from_batch(batch, available: float) -> _Stock:
+    """
+    Applies held meters the way deduct_meters_from_batch would take them:
+    loose first, then whole rolls (the unused part of a roll becomes loose).
+    """
+    loose = float(batch.loose_meters_available)
+    rolls = int(batch.rolls_available)
+    per_roll = float(batch.meters_per_roll)
+
+    held = max(batch_total_meters(batch) - available, 0)
+    if held <= loose + EPSILON:
+        loose = max(loose - held, 0)
+    elif per_roll > 0:
+        remaining = held - loose
+        opened = min(math.ceil(remaining / per_roll - EPSILON), rolls)
+        rolls -= opened
+        loose = max(opened * per_roll - remaining, 0)
+
+    return _Stock(batch.batch_id, batch.created_at, loose, rolls, per_roll)
+
+
+def _age_key(stock: _Stock):
+    return stock.created_at or datetime.max
+
+
+# ─── Plan helpers: plan = {batch_id: (loose_used, rolls_opened)} ───
+
+def _take_rolls(stock: _Stock, meters: float) -> int:
+    if meters <= EPSILON or stock.meters_per_roll <= 0:
+        return 0
+    return min(math.ceil(meters / stock.meters_per_roll - EPSILON), stock.rolls)
+
+
+def _greedy(stocks, required: float, loose_order, roll_order) -> dict:
+    plan = {}
+    remaining = required
+
+    for stock in loose_order:
+        if remaining <= EPSILON:
+            break
+        used = min(stock.loose, remaining)
+        if used > 0:
+            plan[stock.batch_id] = (used, 0)
+            remaining -= used
+
+    for stock in roll_order:
+        if remaining <= EPSILON:
+            break
+        rolls = _take_rolls(stock, remaining)
+        if rolls:
+            loose_used, _ = plan.get(stock.batch_id, (0, 0))
+            plan[stock.batch_id] = (loose_used, rolls)
+            remaining -= rolls * stock.meters_per_roll
+
+    return plan
+
+
+def _fifo(stocks, required, deadline):
+    plan = {}
+    remaining = required
+
+    for stock in sorted(stocks, key=_age_key):
+        if remaining <= EPSILON:
+            break
+        used = min(stock.loose, remaining)
+        remaining -= used
+        rolls = _take_rolls(stock, remaining)
+        remaining -= rolls * stock.meters_per_roll
+        if used > 0 or rolls:
+            plan[stock.batch_id] = (used, rolls)
+
+    return plan, True
+
+
+def _loose_first(stocks, required, deadline):
+    by_loose = sorted(stocks, key=lambda s: (-s.loose, _age_key(s)))
+    return _greedy(stocks, required, by_loose, sorted(stocks, key=_age_key)), True
+
+
+def _min_rolls(stocks, required, deadline):
+    """
+    Loose meters never cost a roll, so they are used first (largest
+    fragments first). The rest is a bounded knapsack over roll counts.
+    """
+    by_loose = sorted(stocks, key=lambda s: (-s.loose, _age_key(s)))
+    loose_plan = _greedy(stocks, required, by_loose, [])
+    residual = required - sum(used for used, _ in loose_plan.values())
+
+    if residual <= EPSILON:
+        return loose_plan, True
+
+    # Biggest rolls first: tighter bounds, better greedy seed
+    candidates = sorted(
+        (s for s in stocks if s.rolls > 0 and s.meters_per_roll > 0),
+        key=lambda s: (-s.meters_per_roll, _age_key(s))
+    )
+
+    def cost(counts):
+        opened = sum(counts)
+        covered = sum(k * s.meters_per_roll for k, s in zip(counts, candidates))
+        batches = sum(1 for k in counts if k)
+        age = tuple(i for i, k in enumerate(counts) if k)
+        return (opened, round(covered - residual, 6), batches, age)
+
+    # Greedy seed (always feasible: callers cap required at total stock)
+    seed = []
+    remaining = residual
+    for stock in candidates:
+        k = _take_rolls(stock, remaining)
+        seed.append(k)
+        remaining -= k * stock.meters_per_roll
+
+    best = {"counts": seed, "cost": cost(seed)}
+    optimal = True
+
+    if len(candidates) > MAX_SEARCH_BATCHES:
+        return _with_rolls(loose_plan, seed, candidates), False
+    counts = [0] * len(candidates)
+
+    # Remaining roll capacity from position i on (for feasibility pruning)
+    capacity = [0.0] * (len(candidates) + 1)
+    for i in range(len(candidates) - 1, -1, -1):
+        capacity[i] = capacity[i + 1] + candidates[i].rolls * candidates[i].meters_per_roll
+
+    def search(i, remaining, opened):
+        nonlocal optimal
+
+        if remaining <= EPSILON:
+            c = cost(counts)
+            if c < best["cost"]:
+                best["counts"], best["cost"] = list(counts), c
+            return
+
+        if i == len(candidates) or capacity[i] + EPSILON < remaining:
+            return
+
+        if time.perf_counter() > deadline:
+            optimal = False
+            return
+
+        # Lower bound: remaining meters in the biggest rolls left
+        bound = opened + math.ceil(remaining / candidates[i].meters_per_roll - EPSILON)
+        if bound > best["cost"][0]:
+            return
+
+        stock = candidates[i]
+        for k in range(_take_rolls(stock, remaining), -1, -1):
+            counts[i] = k
+            search(i + 1, remaining - k * stock.meters_per_roll, opened + k)
+        counts[i] = 0
+
+    search(0, residual, 0)
+
+    return _with_rolls(loose_plan, best["counts"], candidates), optimal
+
+
+def _with_rolls(loose_plan: dict, counts, candidates) -> dict:
+    plan = dict(loose_plan)
+    for k, stock in zip(counts, candidates):
+        if k:
+            loose_used, _ = plan.get(stock.batch_id, (0, 0))
+            plan[stock.batch_id] = (loose_used, k)
+    return plan
+
+
+STRATEGIES = {
+    "fifo": _fifo,
+    "loose_first": _loose_first,
+    "min_rolls": _min_rolls,
+}
+
+
+def allocate(batches, required_meters: float, meters_of=None, strategy: str | None = None) -> Allocation:
+    """
+    Splits required_meters across batches (same material / color).
+    meters_of(batch) gives usable meters (e.g. InventoryIndex.meters, which
+    subtracts holds); defaults to the batch total. If stock is short,
+    everything available is allocated.
+    """
+    start = time.perf_counter()
+    strategy = (strategy or _get_strategy()).lower()
+    solver = STRATEGIES.get(strategy)
+    if solver is None:
+        print(f"Unknown allocation strategy '{strategy}', using min_rolls")
+        strategy, solver = "min_rolls", _min_rolls
+
+    meters_of = meters_of or batch_total_meters
+    stocks = [_stock_from_batch(batch, meters_of(batch)) for batch in batches]
+    stocks = [stock for stock in stocks if stock.total > EPSILON]
+    by_id = {stock.batch_id: stock for stock in stocks}
+
+    available = round(sum(stock.total for stock in stocks), 4)
+    required = min(float(required_meters or 0), available)
+
+    plan, optimal = solver(stocks, required, start + _get_time_budget()) if required > EPSILON else ({}, True)
+
+    # Plan → per-batch meters; the overshoot of the last roll stays loose
+    allocation = Allocation(available_meters=available, strategy=strategy, optimal=optimal)
+    remaining = required
+
+    for stock in sorted((by_id[batch_id] for batch_id in plan), key=_age_key):
+        loose_used, rolls = plan[stock.batch_id]
+        meters = min(loose_used + rolls * stock.meters_per_roll, remaining)
+        if meters <= EPSILON:
+            continue
+
+        rolls_needed = _take_rolls(stock, meters - min(stock.loose, meters))
+        allocation.fulfilled_batches.append({
+            "batch_id": stock.batch_id,
+            "allocated_meters": round(meters, 4),
+            "rolls_opened": rolls_needed,
+        })
+        allocation.allocated_meters += meters
+        allocation.rolls_opened += rolls_needed
+        allocation.loose_created += rolls_needed * stock.meters_per_roll - max(meters - stock.loose, 0)
+        remaining -= meters
+
+    allocation.loose_created = round(allocation.loose_created, 4)
+    allocation.solve_ms = round((time.perf_counter() - start) * 1000, 3)
+    return allocation
@@ -1,55 +1,22 @@
 from typing import List, Dict
 from app.schemas.order_item_schema import OrderItem
-
-
-def find_alternatives(session, item: OrderItem) -> List[Dict]:
-
-    alternatives = []
-
-    target_material = (item.measurement.material_name or "").lower()
-    target_color = (item.measurement.color or "").lower()
-
-    batches = session.available_batches or []
-
-    for batch in batches:
-
-        batch_material = (batch.material_name or "").lower()
-        batch_color = (batch.color or "").lower()
-
-        # Skip exact same item
-        if batch_material == target_material and batch_color == target_color:
-            continue
-
-        available_meters = (
-            batch.rolls_available * batch.meters_per_roll
-            + batch.loose_meters_available
-        )
-
-        if available_meters <= 0:
-            continue
-
-        # Priority 1 → Same material different color
-        if batch_material == target_material:
-            alternatives.append({
-                "material": batch.material_name,
-                "color": batch.color,
-                "available_meters": available_meters,
-                "priority": 1
-            })
-
-        # Priority 2 → Same color different material
-        elif batch_color == target_color:
-            alternatives.append({
-                "material": batch.material_name,
-                "color": batch.color,
-                "available_meters": available_meters,
-                "priority": 2
-            })
-
-    # Sort by priority
-    alternatives.sort(key=lambda x: x["priority"])
-
-    return alternatives[:3]  # Limit suggestions
+from app.services.similarity_graph import SimilarityGraph
+
+
+def find_alternatives(session, item: OrderItem, graph: SimilarityGraph | None = None) -> List[Dict]:
+    """
+    Up to 3 in-stock alternatives ranked by material similarity (category,
+    price) and color closeness (same color / color family) — see
+    similarity_graph. Without a graph only colors are compared.
+    """
+    graph = graph or SimilarityGraph()
+
+    return graph.alternatives(
+        session.available_batches,
+        item.measurement.material_name,
+        item.measurement.color,
+        limit=3
+    )
 
 
 def build_alternative_message(item: OrderItem, alternatives: List[Dict]):
@@ -0,0 +1,168 @@
+"""
+Voice note preprocessing before Gemini audio upload.
+
+1. decode (pydub / ffmpeg)
+2. strip leading and trailing silence
+3. enforce VOICE_MAX_SECONDS — longer notes raise VoiceNoteTooLongError
+   so the router can ask for a shorter note instead of paying for it
+4. downmix to mono, resample to 16 kHz and re-encode as low-bitrate Opus
+
+Accepts raw bytes or the spooled file handle from download_whatsapp_media.
+If ffmpeg is unavailable or decoding fails, the original bytes are sent;
+for OGG/Opus the duration cap is still enforced from the container header.
+"""
+
+import io
+import os
+import struct
+import time
+from typing import BinaryIO
+
+from app.services.media_service import media_size, read_media
+
+
+class VoiceNoteTooLongError(ValueError):
+    """Raised when a voice note exceeds VOICE_MAX_SECONDS after trimming."""
+
+    def __init__(self, duration_seconds: float, max_seconds: float):
+        self.duration_seconds = duration_seconds
+        self.max_seconds = max_seconds
+        super().__init__(
+            f"Voice note is {duration_seconds:.0f}s (max {max_seconds:.0f}s)"
+        )
+
+
+# WhatsApp mime type → ffmpeg container format
+DECODE_FORMATS = {
+    "audio/ogg": "ogg",
+    "audio/opus": "ogg",
+    "audio/mpeg": "mp3",
+    "audio/mp4": "mp4",
+    "audio/aac": "aac",
+    "audio/amr": "amr",
+}
+
+
+def _get_config():
+    """Read preprocessing config at runtime (not import time)."""
+    return {
+        "max_seconds": float(os.getenv("VOICE_MAX_SECONDS", "120")),
+        "silence_dbfs": float(os.getenv("VOICE_SILENCE_THRESHOLD_DBFS", "-40")),
+        "keep_silence_ms": int(os.getenv("VOICE_KEEP_SILENCE_MS", "200")),
+        "sample_rate": int(os.getenv("VOICE_SAMPLE_RATE", "16000")),
+        "bitrate": os.getenv("VOICE_BITRATE", "16k"),
+    }
+
+
+def ogg_opus_duration(audio_bytes: bytes) -> float | None:
+    """
+    Duration of an OGG/Opus file from the last page's granule position
+    (48 kHz samples) minus the OpusHead pre-skip. No decoding needed.
+    """
+    last_page = audio_bytes.rfind(b"OggS")
+    head = audio_bytes.find(b"OpusHead")
+
+    if last_page < 0 or head < 0 or len(audio_bytes) < last_page + 14:
+        return None
+
+    granule = struct.unpack_from("<q", audio_bytes, last_page + 6)[0]
+    pre_skip = struct.unpack_from("<H", audio_bytes, head + 10)[0]
+
+    if granule <= 0:
+        return None
+
+    return max(granule - pre_skip, 0) / 48000
+
+
+def _trim_silence(segment, silence_dbfs: float, keep_ms: int):
+    from pydub.silence import detect_leading_silence
+
+    start = detect_leading_silence(segment, silence_threshold=silence_dbfs)
+    end = detect_leading_silence(segment.reverse(), silence_threshold=silence_dbfs)
+
+    start = max(start - keep_ms, 0)
+    end = max(end - keep_ms, 0)
+
+    # Entire note is "silence" — keep it and let the model decide
+    if start + end >= len(segment):
+        return segment
+
+    return segment[start:len(segment) - end]
+
+
+def preprocess_audio(audio: bytes | BinaryIO, mime_type: str) -> tuple[bytes, str, dict]:
+    """
+    Returns (bytes_to_upload, mime_type, stats).
+    stats: original_bytes, output_bytes, original_seconds, output_seconds, elapsed_ms.
+    Raises VoiceNoteTooLongError if the trimmed note exceeds VOICE_MAX_SECONDS.
+    """
+    config = _get_config()
+    start = time.perf_counter()
+    base_mime = (mime_type or "").split(";")[0].strip().lower()
+    original_bytes = media_size(audio)
+
+    stats = {
+        "original_bytes": original_bytes,
+        "output_bytes": original_bytes,
+        "original_seconds": None,
+        "output_seconds": None,
+        "elapsed_ms": 0.0,
+    }
+
+    try:
+        from pydub import AudioSegment
+
+        source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else audio
+        source.seek(0)
+        segment = AudioSegment.from_file(
+            source,
+            format=DECODE_FORMATS.get(base_mime)
+        )
+    except Exception as e:
+        print(f"Voice preprocessing unavailable, sending original: {e}")
+
+        audio_bytes = read_media(audio)
+
+        # Still enforce the cap when the container tells us the length
+        duration = ogg_opus_duration(audio_bytes) if base_mime in ["audio/ogg", "audio/opus"] else None
+        stats["original_seconds"] = stats["output_seconds"] = duration
+        stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+
+        if duration and duration > config["max_seconds"]:
+            raise VoiceNoteTooLongError(duration, config["max_seconds"])
+
+        return audio_bytes, mime_type, stats
+
+    stats["original_seconds"] = len(segment) / 1000
+
+    segment = _trim_silence(segment, config["silence_dbfs"], config["keep_silence_ms"])
+    stats["output_seconds"] = len(segment) / 1000
+
+    if stats["output_seconds"] > config["max_seconds"]:
+        raise VoiceNoteTooLongError(stats["output_seconds"], config["max_seconds"])
+
+    try:
+        segment = segment.set_channels(1).set_frame_rate(config["sample_rate"])
+
+        output = io.BytesIO()
+        segment.export(
+            output,
+            format="ogg",
+            codec="libopus",
+            bitrate=config["bitrate"]
+        )
+        processed = output.getvalue()
+    except Exception as e:
+        print(f"Voice re-encoding failed, sending original: {e}")
+        stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return read_media(audio), mime_type, stats
+
+    stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+
+    # Keep original if re-encoding did not help
+    if len(processed) >= original_bytes:
+        return read_media(audio), mime_type, stats
+
+    stats["output_bytes"] = len(processed)
+
+    return processed, "audio/ogg", stats
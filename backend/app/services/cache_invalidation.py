@@ -0,0 +1,108 @@
+"""
+Commit-driven invalidation for the process-wide caches.
+
+The inventory snapshot, similarity graph, catalog index and color map all
+go stale when a local transaction that wrote certain models commits — and
+must not when it rolls back. One set of Session listeners serves them all:
+
+    after_flush    : each flushed (new / dirty / deleted) object is offered
+                     to the caches registered for its model; their
+                     `collect` records what changed in session.info
+    after_commit   : every cache with recorded changes gets callback(changes)
+    after_rollback : recorded changes are dropped
+
+Writes that bypass the ORM (Core UPDATE / bulk insert) add to the same
+record through pending_changes().
+
+ProcessCache is the common case on top: one value per process, rebuilt
+on next use after such a commit, or after its TTL (other workers' writes).
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+INFO_KEY = "cache_invalidation"
+
+_registrations = []  # (name, models, collect, callback)
+
+
+def _mark_stale(session, obj, changes: dict) -> None:
+    changes["stale"] = True
+
+
+def register_cache_invalidation(name: str, models, callback, collect=None) -> None:
+    """
+    callback(changes) runs after each commit that recorded changes for `name`.
+
+    collect(session, obj, changes) is called for every flushed instance of
+    `models` and fills the `changes` dict (left empty: nothing to do).
+    Default: any write marks the cache stale ({"stale": True}).
+    """
+    _registrations.append((name, tuple(models), collect or _mark_stale, callback))
+
+
+def pending_changes(session, name: str) -> dict:
+    """Changes recorded for `name` in this session's open transaction."""
+    return session.info.setdefault(INFO_KEY, {}).setdefault(name, {})
+
+
+class ProcessCache:
+    """
+    build(db) → value, shared by the whole process. Rebuilt when a local
+    commit wrote one of `models` (collect as in register_cache_invalidation)
+    or when get_ttl() seconds have passed.
+    """
+
+    def __init__(self, name: str, models, build, get_ttl, collect=None):
+        self._build = build
+        self._get_ttl = get_ttl
+        self._value = None
+        self._built_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+        register_cache_invalidation(name, models, lambda changes: self.invalidate(), collect)
+
+    def get(self, db: Session):
+        with self._lock:
+            if self._value is None or self._stale or time.monotonic() - self._built_at >= self._get_ttl():
+                self._value = self._build(db)
+                self._built_at = time.monotonic()
+                self._stale = False
+            return self._value
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    objects = [*session.new, *session.dirty, *session.deleted]
+    if not objects:
+        return
+
+    for name, models, collect, _ in _registrations:
+        for obj in objects:
+            if isinstance(obj, models):
+                collect(session, obj, pending_changes(session, name))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    recorded = session.info.pop(INFO_KEY, None)
+    if not recorded:
+        return
+
+    for name, _, _, callback in _registrations:
+        changes = recorded.get(name)
+        if changes:
+            callback(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(INFO_KEY, None)
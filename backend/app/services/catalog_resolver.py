@@ -0,0 +1,241 @@
+"""
+Canonical material / color resolver.
+
+The LLM returns names as the customer wrote them ("cotten", "Cotton 60s",
+"GREY"), and every later step (filter_matching_batches, the session item
+lookups, approve_order's material lookup) compares exact lowercase
+strings, so a near-miss meant a false OUT_OF_STOCK or a failed approval.
+
+resolve_measurements() rewrites extracted items to the catalog's own
+spelling once, right after extraction. Each name goes through:
+
+    1. exact        : lowercase, punctuation / extra spaces dropped
+    2. alias        : MATERIAL_ALIASES / COLOR_ALIASES
+    3. contained    : materials only — "Cotton 60s" → Cotton (longest
+                      catalog name made of the message's words)
+    4. fuzzy        : trigram shortlist, then edit-similarity ≥ FUZZY_MIN_RATIO
+                      (names of FUZZY_MIN_LENGTH+ characters only)
+
+Names that resolve to nothing are left as given. Vocabulary: every
+Material.material_name and every color stored on a batch. The index is
+cached per process and rebuilt after a local commit touching materials or
+adding batches, or after CATALOG_RESOLVER_TTL_SECONDS for other workers.
+"""
+
+import difflib
+import os
+import re
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from app.models.inventory import InventoryBatch
+from app.models.material import Material
+from app.services.cache_invalidation import ProcessCache
+from app.services.color_normalizer import canonicalize_color
+
+
+# Common spellings → catalog key (applied only if the target exists)
+MATERIAL_ALIASES = {
+    "polyster": "polyester",
+    "poly": "polyester",
+    "reyon": "rayon",
+    "linnen": "linen",
+    "georgete": "georgette",
+}
+
+COLOR_ALIASES = {
+    "gray": "grey",
+    "grey": "gray",
+    "off-white": "off white",
+    "navy": "navy blue",
+}
+
+FUZZY_MIN_RATIO = 0.75
+FUZZY_MIN_LENGTH = 4
+
+
+def normalize_name(value) -> str:
+    """Lowercase, punctuation → space, single spaces."""
+    return " ".join(re.sub(r"[^\w\s]", " ", (value or "").lower()).split())
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _get_ttl() -> float:
+    return float(os.getenv("CATALOG_RESOLVER_TTL_SECONDS", "300"))
+
+
+@dataclass
+class Resolution:
+    value: str          # canonical spelling
+    method: str         # exact / alias / contained / fuzzy
+    score: float = 1.0
+    material_id: str | None = None
+
+
+class _Vocabulary:
+    """key → canonical value, plus a trigram index for the fuzzy step."""
+
+    def __init__(self, values, aliases: dict):
+        self.values = {}
+        for value in values:
+            key = normalize_name(value)
+            if key:
+                self.values.setdefault(key, value)
+
+        self.aliases = {
+            normalize_name(alias): normalize_name(target)
+            for alias, target in aliases.items()
+            if normalize_name(target) in self.values
+        }
+
+        self.trigrams = {}
+        for key in self.values:
+            for gram in _trigrams(key):
+                self.trigrams.setdefault(gram, set()).add(key)
+
+    def resolve(self, text, allow_contained: bool = False) -> tuple[str, str, float] | None:
+        key = normalize_name(text)
+        if not key:
+            return None
+
+        if key in self.values:
+            return key, "exact", 1.0
+        if key in self.aliases:
+            return self.aliases[key], "alias", 1.0
+
+        if allow_contained:
+            contained = self._contained(key)
+            if contained:
+                return contained, "contained", 1.0
+
+        return self._fuzzy(key)
+
+    def _contained(self, key: str) -> str | None:
+        words = key.split()
+        found = set()
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size + 1):
+                phrase = " ".join(words[start:start + size])
+                phrase = self.aliases.get(phrase, phrase)
+                if phrase in self.values:
+                    found.add(phrase)
+            if found:
+                # Longest match wins; two different ones of that length are ambiguous
+                return found.pop() if len(found) == 1 else None
+        return None
+
+    def _fuzzy(self, key: str) -> tuple[str, str, float] | None:
+        if len(key) < FUZZY_MIN_LENGTH:
+            return None
+
+        shared = {}
+        for gram in _trigrams(key):
+            for candidate in self.trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        shortlist = sorted(shared, key=shared.get, reverse=True)[:10]
+        scored = sorted(
+            ((difflib.SequenceMatcher(None, key, candidate).ratio(), candidate) for candidate in shortlist),
+            reverse=True
+        )
+        if not scored or scored[0][0] < FUZZY_MIN_RATIO:
+            return None
+        if len(scored) > 1 and scored[1][0] == scored[0][0]:
+            return None  # tie — don't guess
+
+        ratio, candidate = scored[0]
+        return candidate, "fuzzy", round(ratio, 3)
+
+
+class CatalogIndex:
+
+    def __init__(self, materials=(), colors=(), color_aliases: dict | None = None):
+        """materials: (material_id, material_name) pairs; colors: stored batch colors."""
+        materials = list(materials)
+        self.material_ids = {normalize_name(name): str(material_id) for material_id, name in materials}
+        self.materials = _Vocabulary([name for _, name in materials], MATERIAL_ALIASES)
+        self.colors = _Vocabulary(colors, {**COLOR_ALIASES, **(color_aliases or {})})
+
+    def resolve_material(self, name) -> Resolution | None:
+        found = self.materials.resolve(name, allow_contained=True)
+        if not found:
+            return None
+        key, method, score = found
+        return Resolution(self.materials.values[key], method, score, self.material_ids.get(key))
+
+    def resolve_color(self, color) -> Resolution | None:
+        found = self.colors.resolve(color)
+        if not found:
+            return None
+        key, method, score = found
+        return Resolution(self.colors.values[key], method, score)
+
+
+# ─── Process-wide index ───
+
+def _build_index(db: Session) -> CatalogIndex:
+    return CatalogIndex(
+        db.query(Material.material_id, Material.material_name).all(),
+        [color for (color,) in db.query(InventoryBatch.color).distinct()]
+    )
+
+
+def _collect_catalog_changes(session, obj, changes: dict) -> None:
+    # Any material write; batches only when added (new colors)
+    if isinstance(obj, Material) or obj in session.new:
+        changes["stale"] = True
+
+
+_index = ProcessCache(
+    "catalog_index", [Material, InventoryBatch], _build_index, _get_ttl, collect=_collect_catalog_changes
+)
+
+
+def get_catalog_index(db: Session) -> CatalogIndex:
+    return _index.get(db)
+
+
+def invalidate_catalog_index() -> None:
+    _index.invalidate()
+
+
+def resolve_measurements(db: Session, measurements) -> list:
+    """
+    Rewrites material_name / color of extracted TextileMeasurements to
+    their canonical spelling in place (colors translated to English by
+    color_normalizer first). Returns the measurements.
+    """
+    index = get_catalog_index(db)
+
+    for measurement in measurements:
+        material = index.resolve_material(measurement.material_name)
+        if material and material.value != measurement.material_name:
+            print(f"Resolved material '{measurement.material_name}' → '{material.value}' ({material.method})")
+            measurement.material_name = material.value
+
+        if measurement.color:
+            translated = canonicalize_color(db, measurement.color)
+            if translated != measurement.color:
+                print(f"Translated color '{measurement.color}' → '{translated}'")
+                measurement.color = translated
+
+        color = index.resolve_color(measurement.color) if measurement.color else None
+        if color and color.value != measurement.color:
+            print(f"Resolved color '{measurement.color}' → '{color.value}' ({color.method})")
+            measurement.color = color.value
+
+    return measurements
+
+
+def find_material(db: Session, material_name: str):
+    """Material row for a (possibly misspelled) name, or None."""
+    resolution = get_catalog_index(db).resolve_material(material_name)
+    if resolution is None or resolution.material_id is None:
+        return None
+    return db.get(Material, uuid.UUID(resolution.material_id))
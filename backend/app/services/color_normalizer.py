@@ -0,0 +1,143 @@
+"""
+Deterministic color canonicalization.
+
+Customers write "laal", "neela", "safed", "aasmani" or "rani" while batches
+are stored in English, and filter_matching_batches compares exact
+lowercase strings — those orders missed stock unless the LLM happened to
+translate. canonicalize_color() maps a color name to its English form:
+
+    1. whole name      : admin aliases (color_aliases table), then
+                         HINDI_COLOR_NAMES (romanized + Devanagari)
+    2. word by word    : "gehra laal" → "Dark Red"
+    3. fuzzy           : close spelling of a known color word ("neelaa"),
+                         for words of FUZZY_MIN_LENGTH+ characters
+
+Modifiers (gehra / halka) are translated word by word only: they are not
+fuzzy candidates ("khaki" and "haldi" are a spelling away from "halki"),
+and a name made of modifiers alone is not a color.
+
+Unknown names come back unchanged. Results are title-cased ("Sky Blue"),
+the way batches are stored. Applied to extracted items (before the
+catalog resolver) and to batch colors when stock is added or imported —
+with fuzzy=False there, so stock is never stored under a guessed color.
+
+The dictionary and the aliases are compiled into one dict per process,
+rebuilt after a local commit touching color_aliases or after
+COLOR_ALIAS_TTL_SECONDS (other workers' edits).
+"""
+
+import difflib
+import os
+
+from sqlalchemy.orm import Session
+
+from app.models.color_alias import ColorAlias
+from app.services.cache_invalidation import ProcessCache
+
+
+# Hindi / regional color names → English (lowercase)
+HINDI_COLOR_NAMES = {
+    "laal": "red", "lal": "red", "surkh": "red", "लाल": "red",
+    "neela": "blue", "nila": "blue", "neeli": "blue", "nili": "blue", "नीला": "blue", "नीली": "blue",
+    "aasmani": "sky blue", "asmani": "sky blue", "आसमानी": "sky blue",
+    "firozi": "turquoise", "फिरोज़ी": "turquoise",
+    "safed": "white", "safaid": "white", "sufed": "white", "सफेद": "white", "सफ़ेद": "white",
+    "kala": "black", "kaala": "black", "kaali": "black", "kali": "black", "काला": "black", "काली": "black",
+    "hara": "green", "hari": "green", "haraa": "green", "हरा": "green", "हरी": "green",
+    "dhani": "light green", "धानी": "light green",
+    "peela": "yellow", "pila": "yellow", "peeli": "yellow", "pili": "yellow", "पीला": "yellow", "पीली": "yellow",
+    "gulabi": "pink", "गुलाबी": "pink",
+    "rani": "magenta", "rani pink": "magenta", "रानी": "magenta",
+    "narangi": "orange", "santri": "orange", "नारंगी": "orange",
+    "kesariya": "saffron", "kesari": "saffron", "केसरिया": "saffron",
+    "bhura": "brown", "bhoora": "brown", "भूरा": "brown",
+    "badami": "beige", "बादामी": "beige",
+    "jamuni": "purple", "baingani": "purple", "jamunee": "purple", "जामुनी": "purple", "बैंगनी": "purple",
+    "mehroon": "maroon", "maharoon": "maroon", "मैरून": "maroon",
+    "sunehra": "golden", "sunehri": "golden", "सुनहरा": "golden",
+    "chandi": "silver", "rupehri": "silver", "चांदी": "silver",
+    "sleti": "grey", "saleti": "grey", "slaty": "grey", "स्लेटी": "grey",
+    "kathai": "brown",
+}
+
+# Shade modifiers — only meaningful in front of a color
+COLOR_MODIFIERS = {
+    "gehra": "dark", "gehri": "dark", "गहरा": "dark",
+    "halka": "light", "halki": "light", "हल्का": "light",
+}
+
+FUZZY_MIN_LENGTH = 4
+FUZZY_CUTOFF = 0.8
+
+
+def color_key(value) -> str:
+    """Lowercase, separators → space, single spaces (keeps Devanagari intact)."""
+    text = (value or "").lower()
+    for separator in "-_/.,":
+        text = text.replace(separator, " ")
+    return " ".join(text.split())
+
+
+def _get_ttl() -> float:
+    return float(os.getenv("COLOR_ALIAS_TTL_SECONDS", "300"))
+
+
+class ColorMap:
+
+    def __init__(self, aliases: dict | None = None):
+        """aliases: admin alias → color; they override the dictionary."""
+        self.names = {**HINDI_COLOR_NAMES, **COLOR_MODIFIERS}
+        self.names.update({color_key(alias): color_key(color) for alias, color in (aliases or {}).items()})
+        self._fuzzy_keys = [
+            key for key in self.names if len(key) >= FUZZY_MIN_LENGTH and key not in COLOR_MODIFIERS
+        ]
+        self._modifier_words = set(COLOR_MODIFIERS.values())
+
+    def _lookup(self, key: str, fuzzy: bool) -> str | None:
+        if key in self.names:
+            return self.names[key]
+        if not fuzzy or len(key) < FUZZY_MIN_LENGTH:
+            return None
+        close = difflib.get_close_matches(key, self._fuzzy_keys, n=1, cutoff=FUZZY_CUTOFF)
+        return self.names[close[0]] if close else None
+
+    def canonicalize(self, color, fuzzy: bool = True):
+        """fuzzy=False: dictionary and alias matches only (stock writes)."""
+        key = color_key(color)
+        if not key:
+            return color
+
+        translated = self.names.get(key)
+
+        if translated is None:
+            words = [self._lookup(word, fuzzy) for word in key.split()]
+            if any(words):
+                translated = " ".join(word or original for word, original in zip(words, key.split()))
+
+        if translated is None or set(translated.split()) <= self._modifier_words:
+            return color
+        return translated.title()
+
+
+# ─── Process-wide map ───
+
+def _build_color_map(db: Session) -> ColorMap:
+    return ColorMap({alias: color for alias, color in db.query(ColorAlias.alias, ColorAlias.color)})
+
+
+_map = ProcessCache("color_map", [ColorAlias], _build_color_map, _get_ttl)
+
+
+def get_color_map(db: Session) -> ColorMap:
+    return _map.get(db)
+
+
+def canonicalize_color(db: Session, color, fuzzy: bool = True):
+    """English canonical color for `color`, or `color` unchanged."""
+    if not color:
+        return color
+    return get_color_map(db).canonicalize(color, fuzzy=fuzzy)
+
+
+def invalidate_color_map() -> None:
+    _map.invalidate()
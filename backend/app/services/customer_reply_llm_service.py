@@ -1,8 +1,9 @@
 import json
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from app.services.llm_service import get_llm
+from app.services.model_router import select_model_tier
 from app.schemas.measurement_schema import TextileMeasurement
 
 PROMPT_PATH = Path("app/prompts/customer_reply_prompt.txt")
@@ -15,9 +16,16 @@ def load_prompt():
 
 def classify_customer_reply(
     message: str,
-    session_items: List[TextileMeasurement]):
-
-    llm = get_llm()
+    session_items: List[TextileMeasurement],
+    context: Optional[str] = None):
+    """
+    context: optional original order text (voice note transcript or
+    image caption) shown to the model alongside the pending items.
+    """
+
+    # Tier by the reply itself — a one-word "haan" on a five-item order is
+    # still a one-word reply
+    llm = get_llm(select_model_tier(message))
     prompt_template = load_prompt()
 
     item_list = "\n".join(
@@ -29,12 +37,17 @@ def classify_customer_reply(
         ]
     )
 
+    context_block = (
+        f"\nOriginal order context:\n{context}\n"
+        if context else ""
+    )
+
     full_prompt = f"""
 {prompt_template}
 
 Pending Order Items:
 {item_list}
-
+{context_block}
 Customer Message:
 {message}
 """
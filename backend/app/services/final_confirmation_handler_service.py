@@ -6,7 +6,7 @@ from app.services.customer_reply_llm_service import (
     classify_final_confirmation_intent
 )
 
-from app.services.order_update_service import apply_customer_decisions
+from app.services.order_update_service import apply_customer_decisions, items_missing_quantity
 from app.services.order_session_manager import (
     get_active_session_by_phone,
     update_workflow_state,
@@ -20,6 +20,9 @@ from app.services.negotiation_handler_service import (
     build_pending_negotiation_message,
     get_pending_items
 )
+from app.services.similarity_graph import get_similarity_graph
+from app.services.catalog_resolver import resolve_measurements, find_material
+from app.services.unit_normalizer import normalize_quantities
 
 from app.schemas.order_item_schema import OrderItem
 from app.workflows.order_states import OrderState
@@ -34,6 +37,8 @@ def add_new_items_to_session(session, extracted_items):
 
     new_items = []
 
+    normalize_quantities(extracted_items, session.available_batches or [])
+
     for measurement in extracted_items:
 
         new_item = OrderItem(
@@ -41,8 +46,8 @@ def add_new_items_to_session(session, extracted_items):
             status=OrderItemStatus.NEGOTIATING
         )
 
-        # Only run inventory check if color is present
-        if measurement.color:
+        # Only run inventory check if color and quantity are known
+        if measurement.color and measurement.normalized_meters:
             inventory_result = check_inventory(
                 measurement,
                 session.available_batches or [],
@@ -52,7 +57,7 @@ def add_new_items_to_session(session, extracted_items):
             new_item.available_meters = inventory_result["available_meters"]
             new_item.fulfilled_batches = inventory_result["fulfilled_batches"]
         else:
-            new_item.inventory_status = None  # Will prompt for color during negotiation
+            new_item.inventory_status = None  # Will prompt for color / quantity during negotiation
 
         session.items.append(new_item)
         new_items.append(new_item)
@@ -73,7 +78,7 @@ def negotiation_required(session):
 
         if (
             item.status == OrderItemStatus.NEGOTIATING
-            and item.inventory_status in ["PARTIAL_AVAILABLE", "OUT_OF_STOCK"]
+            and item.inventory_status in ["PARTIAL_AVAILABLE", "OUT_OF_STOCK", "QUANTITY_NEEDED"]
         ):
             return True
 
@@ -119,6 +124,11 @@ def handle_final_confirmation_message(db: Session, customer_phone: str, message:
     if session.workflow_state != OrderState.FINAL_CUSTOMER_CONFIRMATION:
         return {"message": "Order is not in final confirmation stage."}
 
+    # Stock for items added or edited at this stage (snapshot minus other orders' holds)
+    from app.services.inventory_snapshot import get_inventory_batches
+    from app.services.inventory_reservations import apply_active_holds
+    session.available_batches = apply_active_holds(db, get_inventory_batches(db), session.order_id)
+
     # -------------------------------------------------
     # STEP 1 — GLOBAL INTENT CLASSIFICATION (LLM)
     # -------------------------------------------------
@@ -157,12 +167,39 @@ def handle_final_confirmation_message(db: Session, customer_phone: str, message:
 
     if global_intent == "confirm_order":
 
+        # -------------------------------------------------
+        # METERS STILL UNKNOWN → Back to negotiation
+        # -------------------------------------------------
+        # (rolls of unknown length can be neither priced nor approved)
+
+        missing_quantity = items_missing_quantity(session)
+
+        if missing_quantity:
+
+            for item in missing_quantity:
+                item.status = OrderItemStatus.NEGOTIATING
+                item.inventory_status = "QUANTITY_NEEDED"
+
+            sync_session_items_to_db(db, session)
+            update_workflow_state(
+                db,
+                session.order_id,
+                OrderState.CUSTOMER_NEGOTIATION
+            )
+
+            pending_message = build_pending_negotiation_message(session, missing_quantity)
+
+            db.commit() # Atomic commit
+
+            return {
+                "message": pending_message,
+                "awaiting_customer_confirmation": False
+            }
+
         # -------------------------------------------------
         # CALCULATE & SAVE ESTIMATED TOTAL
         # -------------------------------------------------
         from app.models.order import Order
-        from app.models.material import Material
-        from sqlalchemy import func
 
         total_amount = 0.0
         
@@ -171,11 +208,11 @@ def handle_final_confirmation_message(db: Session, customer_phone: str, message:
             if item.status in [OrderItemStatus.CANCELLED, OrderItemStatus.REPLACED]:
                 continue
                 
-            qty = float(item.measurement.normalized_meters or item.measurement.input_quantity or 0)
+            qty = float(item.measurement.normalized_meters)
             mat_name = item.measurement.material_name
 
             # Lookup Price
-            mat_obj = db.query(Material).filter(func.lower(Material.material_name) == mat_name.lower()).first()
+            mat_obj = find_material(db, mat_name)
             price = float(mat_obj.price_per_meter) if mat_obj and mat_obj.price_per_meter else 0.0
             
             # If price is 0, maybe use a default? Or leave it (it's an estimate).
@@ -243,10 +280,10 @@ def handle_final_confirmation_message(db: Session, customer_phone: str, message:
             [item.measurement for item in session.items]
         )
 
-        apply_customer_decisions(session, decision_output)
+        apply_customer_decisions(db, session, decision_output)
 
         # Detect new item addition
-        extracted_items = extract_textile_order(message)
+        extracted_items = resolve_measurements(db, extract_textile_order(message))
 
         if extracted_items:
             add_new_items_to_session(session, extracted_items)
@@ -265,7 +302,8 @@ def handle_final_confirmation_message(db: Session, customer_phone: str, message:
 
             pending_message = build_pending_negotiation_message(
                 session,
-                pending_items
+                pending_items,
+                get_similarity_graph(db)
             )
 
             db.commit() # Atomic commit
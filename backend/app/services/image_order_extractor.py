@@ -1,9 +1,14 @@
 
 import json
 import os
+import time
 import google.generativeai as genai
 from pathlib import Path
+from typing import BinaryIO
 from app.schemas.measurement_schema import TextileMeasurement
+from app.services.model_router import get_model_name, select_model_tier
+from app.services.image_preprocessor import preprocess_image
+from app.services.media_cache import hash_media, prompt_version, get_cached_items, cache_items
 
 PROMPT_PATH = Path("app/prompts/image_order_prompt.txt")
 
@@ -11,33 +16,77 @@ def load_prompt():
     with open(PROMPT_PATH, "r") as file:
         return file.read()
 
-def get_gemini_vision_model():
+def get_gemini_vision_model(tier: str = "standard"):
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found")
     
     genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-2.5-flash')
+    return genai.GenerativeModel(get_model_name(tier))
 
-def extract_order_from_image(image_bytes: bytes, mime_type: str, caption: str | None = None) -> list[TextileMeasurement]:
+def extract_order_from_image(image: bytes | BinaryIO, mime_type: str, caption: str | None = None) -> list[TextileMeasurement]:
     """
     Extracts textile order items from an image using Gemini Vision.
+    Accepts bytes or the spooled handle from download_whatsapp_media.
+    Identical images (same bytes, prompt, model and caption) are served
+    from the content-hash cache without calling the model.
     """
-    model = get_gemini_vision_model()
+    return extract_order_from_images([(image, mime_type)], caption=caption)
+
+def extract_order_from_images(
+    images: list[tuple[bytes | BinaryIO, str]],
+    caption: str | None = None
+) -> list[TextileMeasurement]:
+    """
+    Extracts ONE merged item list from several photos of the same order
+    (e.g. a handwritten list sent as an album) in a single multi-part
+    Gemini Vision request. images: [(bytes_or_handle, mime_type), ...]
+    """
+    tier = select_model_tier(caption, media_type="image", media_count=len(images))
     prompt_template = load_prompt()
+
+    image_hashes = [hash_media(image) for image, _ in images]
+    media_hash = image_hashes[0] if len(images) == 1 else prompt_version(*image_hashes)
+    version = prompt_version(prompt_template, get_model_name(tier), caption)
+
+    cached = get_cached_items(media_hash, version)
+    if cached is not None:
+        print(f"Image extraction cache hit ({media_hash[:12]})")
+        return cached
+
+    model = get_gemini_vision_model(tier)
     
     prompt_parts = [prompt_template]
+
+    if len(images) > 1:
+        prompt_parts.append(
+            f"\n\nThe following {len(images)} images are parts of ONE order "
+            "(e.g. pages of the same list). Return a single merged item list. "
+            "If the same item appears in more than one image, include it only once."
+        )
     
     if caption:
         prompt_parts.append(f"\n\nUser Caption/Note: {caption}")
         
-    prompt_parts.append({
-        "mime_type": mime_type,
-        "data": image_bytes
-    })
+    for image, mime_type in images:
+        # Downscale / re-encode before upload
+        upload_bytes, upload_mime, stats = preprocess_image(image, mime_type)
+        print(
+            f"Image preprocessed: {stats['original_bytes'] // 1024}KB → "
+            f"{stats['output_bytes'] // 1024}KB "
+            f"(saved {stats['bytes_saved'] // 1024}KB, {stats['elapsed_ms']:.0f}ms, "
+            f"grayscale={stats['grayscale']})"
+        )
+
+        prompt_parts.append({
+            "mime_type": upload_mime,
+            "data": upload_bytes
+        })
     
     try:
+        vision_start = time.perf_counter()
         response = model.generate_content(prompt_parts)
+        print(f"Gemini Vision call ({len(images)} image(s)) took {(time.perf_counter() - vision_start) * 1000:.0f}ms")
         raw_output = response.text.strip()
         
         # Cleanup Markdown formatting
@@ -52,6 +101,8 @@ def extract_order_from_image(image_bytes: bytes, mime_type: str, caption: str |
             TextileMeasurement(**item) 
             for item in parsed_json.get("items", [])
         ]
+
+        cache_items(media_hash, version, items)
         
         return items
         
@@ -0,0 +1,130 @@
+"""
+Image preprocessing before Gemini Vision upload.
+
+WhatsApp phone photos are often several MB. Before the vision call we:
+1. decode and auto-orient (EXIF rotation)
+2. downscale to IMAGE_MAX_DIMENSION on the longest side
+3. convert to grayscale when the photo is effectively monochrome
+   (handwritten order slips) — colour photos of fabric keep their colour
+4. re-encode as compact JPEG / WebP
+
+Accepts raw bytes or the spooled file handle from download_whatsapp_media;
+the handle is decoded in place without copying it into memory first.
+
+If anything fails, or the result is not smaller, the original bytes are sent.
+"""
+
+import io
+import os
+import time
+
+from typing import BinaryIO
+
+from PIL import Image, ImageOps, ImageStat
+
+from app.services.media_service import media_size, read_media
+
+
+OUTPUT_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+
+def _get_config():
+    """Read preprocessing config at runtime (not import time)."""
+    output_format = os.getenv("IMAGE_OUTPUT_FORMAT", "JPEG").upper()
+    if output_format not in OUTPUT_MIME_TYPES:
+        output_format = "JPEG"
+
+    return {
+        "max_dimension": int(os.getenv("IMAGE_MAX_DIMENSION", "1600")),
+        "quality": int(os.getenv("IMAGE_QUALITY", "80")),
+        "output_format": output_format,
+        # "auto" | "always" | "never"
+        "grayscale": os.getenv("IMAGE_GRAYSCALE", "auto").lower(),
+        # Mean HSV saturation (0-255) below which a photo counts as monochrome
+        "grayscale_saturation": float(os.getenv("IMAGE_GRAYSCALE_SATURATION", "25")),
+    }
+
+
+def is_effectively_monochrome(image: Image.Image, saturation_threshold: float) -> bool:
+    """
+    True for photos of paper slips: low average colour saturation.
+    Measured on a small thumbnail so it costs ~1 ms.
+    """
+    sample = image.copy()
+    sample.thumbnail((128, 128))
+    saturation = sample.convert("RGB").convert("HSV").getchannel("S")
+    return ImageStat.Stat(saturation).mean[0] < saturation_threshold
+
+
+def preprocess_image(image: bytes | BinaryIO, mime_type: str) -> tuple[bytes, str, dict]:
+    """
+    Returns (bytes_to_upload, mime_type, stats).
+    stats: original_bytes, output_bytes, bytes_saved, elapsed_ms, grayscale, size.
+    """
+    config = _get_config()
+    start = time.perf_counter()
+    original_bytes = media_size(image)
+
+    stats = {
+        "original_bytes": original_bytes,
+        "output_bytes": original_bytes,
+        "bytes_saved": 0,
+        "elapsed_ms": 0.0,
+        "grayscale": False,
+        "size": None,
+    }
+
+    try:
+        source = io.BytesIO(image) if isinstance(image, (bytes, bytearray)) else image
+        source.seek(0)
+        decoded = Image.open(source)
+        max_dim = config["max_dimension"]
+
+        # JPEG: let the decoder skip detail we'd throw away anyway (DCT scaling)
+        if max_dim > 0 and decoded.format == "JPEG":
+            scale = max_dim / max(decoded.size)
+            if scale < 1:
+                decoded.draft("RGB", (int(decoded.width * scale), int(decoded.height * scale)))
+
+        decoded = ImageOps.exif_transpose(decoded)
+
+        # Downscale (keeps aspect ratio, never upscales)
+        if max_dim > 0:
+            decoded.thumbnail((max_dim, max_dim), Image.LANCZOS)
+
+        grayscale = config["grayscale"] == "always" or (
+            config["grayscale"] == "auto"
+            and is_effectively_monochrome(decoded, config["grayscale_saturation"])
+        )
+
+        decoded = decoded.convert("L") if grayscale else decoded.convert("RGB")
+
+        output = io.BytesIO()
+        decoded.save(
+            output,
+            format=config["output_format"],
+            quality=config["quality"],
+            optimize=True
+        )
+        processed = output.getvalue()
+
+    except Exception as e:
+        print(f"Image preprocessing failed, sending original: {e}")
+        stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return read_media(image), mime_type, stats
+
+    stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    stats["size"] = decoded.size
+    stats["grayscale"] = grayscale
+
+    # Keep original if re-encoding did not help
+    if len(processed) >= original_bytes:
+        return read_media(image), mime_type, stats
+
+    stats["output_bytes"] = len(processed)
+    stats["bytes_saved"] = original_bytes - len(processed)
+
+    return processed, OUTPUT_MIME_TYPES[config["output_format"]], stats
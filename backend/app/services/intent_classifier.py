@@ -2,14 +2,22 @@
 Intent classifier for incoming WhatsApp messages.
 Determines if a message is an order, greeting, help request, or general query.
 Only called when there is NO active order session and NO media attached.
+
+A locally trained classifier answers first; the LLM is only called when
+the local model is missing or not confident enough, and for general
+queries, which need the LLM's written answer rather than a canned reply.
 """
 
 import json
 from pathlib import Path
 from app.services.llm_service import get_llm
+from app.services.local_intent_model import predict_intent, get_confidence_threshold
 
 PROMPT_PATH = Path("app/prompts/intent_prompt.txt")
 
+# Intents whose reply the LLM writes — a local label alone is not enough
+LLM_REPLY_INTENTS = ["general_query"]
+
 
 def load_prompt():
     with open(PROMPT_PATH, "r") as file:
@@ -24,7 +32,26 @@ def classify_message_intent(message: str) -> dict:
         dict with keys:
         - intent: "order" | "greeting" | "help" | "general_query" | "unclear"
         - reply: suggested reply text (for non-order intents)
+        - source: "local" | "llm" (only LLM answers are stored as training labels)
     """
+    # -------------------------------------------------
+    # ⚡ LOCAL MODEL FIRST
+    # -------------------------------------------------
+    try:
+        local_result = predict_intent(message)
+    except Exception as e:
+        print(f"Local intent model failed: {e}")
+        local_result = None
+
+    if local_result:
+        intent, confidence = local_result
+        if confidence >= get_confidence_threshold() and intent not in LLM_REPLY_INTENTS:
+            # Router supplies the canned reply for non-order intents
+            return {"intent": intent, "reply": "", "source": "local", "confidence": confidence}
+
+    # -------------------------------------------------
+    # 🤖 LLM FALLBACK
+    # -------------------------------------------------
     llm = get_llm()
     prompt_template = load_prompt()
 
@@ -41,6 +68,7 @@ def classify_message_intent(message: str) -> dict:
             raw_output = raw_output[4:].strip()
 
         parsed = json.loads(raw_output)
+        parsed["source"] = "llm"
         return parsed
 
     except Exception as e:
@@ -0,0 +1,168 @@
+"""
+Bulk inventory import (POST /inventory/import).
+
+Receiving a truckload used to mean one POST /inventory/add per batch: an
+exact-name material lookup, one insert and one commit each. Here a CSV or
+NDJSON upload is read row by row (never fully in memory), materials are
+resolved from a name map loaded once per import, colors are translated
+to their English form (color_normalizer), and valid rows go in as
+multi-row INSERTs of INVENTORY_IMPORT_CHUNK_SIZE rows — all in the
+caller's single transaction, journaled as receipts.
+
+Rows that fail validation are skipped and reported with their line number;
+the rest are imported.
+
+    CSV    : header row with material_name, rolls, meters_per_roll
+             and optional color, loose_meters
+    NDJSON : one JSON object per line with the same keys
+"""
+
+import csv
+import io
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.models.material import Material
+from app.schemas.inventory_schema import InventoryImportRow
+
+
+FORMATS = ["csv", "ndjson"]
+
+# Per-row errors beyond this are counted but not listed
+MAX_REPORTED_ERRORS = 200
+
+
+def _get_chunk_size() -> int:
+    return int(os.getenv("INVENTORY_IMPORT_CHUNK_SIZE", "1000"))
+
+
+def detect_format(filename: str | None, content_type: str | None) -> str | None:
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonlines" in content_type:
+        return "ndjson"
+    return None
+
+
+def iter_raw_rows(stream, fmt: str):
+    """
+    Yields (line_number, dict | error message) from a binary stream,
+    one row at a time.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+        for row in reader:
+            if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, "")}
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e.msg}"
+            continue
+        yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def _validate(raw, materials: dict, color_map):
+    """Returns (batch row dict, None) or (None, error message)."""
+    if isinstance(raw, str):
+        return None, raw
+
+    try:
+        row = InventoryImportRow(**raw)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return None, f"{field}: {error['msg']}"
+
+    material_id = materials.get(row.material_name.strip().lower())
+    if material_id is None:
+        return None, f"Material '{row.material_name}' not found"
+    if row.rolls < 0 or row.loose_meters < 0:
+        return None, "rolls and loose_meters cannot be negative"
+    if row.meters_per_roll <= 0:
+        return None, "meters_per_roll must be positive"
+    if row.rolls == 0 and row.loose_meters == 0:
+        return None, "Batch has no stock"
+
+    return {
+        "batch_id": uuid.uuid4(),
+        "material_id": material_id,
+        "color": color_map.canonicalize((row.color or "").strip(), fuzzy=False) or "Unknown",
+        "rolls_available": row.rolls,
+        "meters_per_roll": row.meters_per_roll,
+        "loose_meters_available": row.loose_meters,
+    }, None
+
+
+def import_inventory(db: Session, stream, fmt: str) -> dict:
+    """
+    Streams rows from `stream` into inventory_batches. Returns the report:
+    rows_read, imported, failed, errors [{line, error}], throughput stats.
+    """
+    from app.crud.inventory import insert_batches_bulk
+    from app.services.inventory_snapshot import note_inventory_change
+    from app.services.color_normalizer import get_color_map
+
+    start = time.perf_counter()
+    chunk_size = _get_chunk_size()
+    now = datetime.now(timezone.utc)
+
+    # Name map once per import instead of one lookup per row
+    materials = {
+        name.strip().lower(): material_id
+        for material_id, name in db.query(Material.material_id, Material.material_name).all()
+    }
+
+    color_map = get_color_map(db)
+
+    report = {"rows_read": 0, "imported": 0, "failed": 0, "errors": []}
+    chunk = []
+
+    for line_number, raw in iter_raw_rows(stream, fmt):
+        report["rows_read"] += 1
+
+        row, error = _validate(raw, materials, color_map)
+        if error:
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": line_number, "error": error})
+            continue
+
+        row["created_at"] = now
+        row["updated_at"] = now
+        chunk.append(row)
+
+        if len(chunk) >= chunk_size:
+            report["imported"] += insert_batches_bulk(db, chunk)
+            chunk = []
+
+    report["imported"] += insert_batches_bulk(db, chunk)
+
+    if report["imported"]:
+        note_inventory_change(db, (), reload=True)
+
+    elapsed = time.perf_counter() - start
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    report["elapsed_ms"] = round(elapsed * 1000, 1)
+    report["rows_per_second"] = round(report["rows_read"] / elapsed) if elapsed > 0 else None
+
+    # db.commit() left to caller for atomicity
+    return report
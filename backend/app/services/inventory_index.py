@@ -0,0 +1,236 @@
+"""
+Hash index over inventory batches.
+
+filter_matching_batches, get_available_colors and find_alternatives used to
+scan every batch and lowercase both sides of every comparison, once per
+item per turn. InventoryIndex is still a plain list of batches (so any code
+iterating available_batches keeps working) plus lookup maps built once:
+
+    by_id             : batch_id → batch
+    by_material_color : (material, color) → [batches]
+    colors_by_material: material → {color: color as stored}   (with stock)
+    materials_by_color: color → {material: material as stored} (with stock)
+    batch_meters      : batch_id → total meters
+    pair_meters       : (material, color) → total meters
+
+All keys are lowercased. Pair lists keep the original batch order.
+BatchRecord items (what the snapshot and the DB fetchers build) bring
+their keys and totals precomputed; any object with the same attributes
+(e.g. InventoryBatchSchema) works too.
+
+with_holds() returns a view sharing all maps where meters() (and every
+in-stock lookup) subtracts reserved meters per batch — see
+inventory_reservations.
+
+The inventory snapshot keeps one index per version: apply_changes() returns
+a new index that shares every untouched pair list, so a refresh of k
+batches costs O(k) map work plus one flat copy of the maps instead of a
+full rebuild, and readers holding the previous version never see it
+change. For any other list as_inventory_index() builds an index on the fly
+(one pass, same cost as a single old linear scan). Treat it as read-only.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable
+
+
+def _key(value) -> str:
+    return (value or "").lower()
+
+
+@dataclass(slots=True)
+class BatchRecord:
+    """
+    Batch as the order path sees it (snapshot, index, allocation): plain
+    slotted object, no validation, total meters and lowercase lookup keys
+    computed once. InventoryBatchSchema stays at the API boundary.
+    Shared between requests — read-only.
+    """
+    batch_id: str
+    material_id: str
+    material_name: str | None
+    color: str | None
+    rolls_available: int
+    meters_per_roll: float
+    loose_meters_available: float
+    created_at: datetime | None = None
+
+    total_meters: float = field(init=False)
+    material_key: str = field(init=False)
+    color_key: str = field(init=False)
+
+    def __post_init__(self):
+        self.total_meters = (self.rolls_available * self.meters_per_roll) + self.loose_meters_available
+        self.material_key = _key(self.material_name)
+        self.color_key = _key(self.color)
+
+
+def _pair(batch) -> tuple[str, str]:
+    if type(batch) is BatchRecord:
+        return batch.material_key, batch.color_key
+    return _key(batch.material_name), _key(batch.color)
+
+
+def batch_total_meters(batch) -> float:
+    if type(batch) is BatchRecord:
+        return batch.total_meters
+    return (batch.rolls_available * batch.meters_per_roll) + batch.loose_meters_available
+
+
+class InventoryIndex(list):
+
+    held = {}  # batch_id → meters reserved by other orders (views only)
+
+    def __init__(self, batches: Iterable = ()):
+        super().__init__(batches)
+
+        self.by_id = {}
+        self.by_material_color = {}
+        self.colors_by_material = {}
+        self.materials_by_color = {}
+        self.batch_meters = {}
+        self.pair_meters = {}
+
+        for batch in self:
+            pair = _pair(batch)
+            meters = batch_total_meters(batch)
+
+            self.by_id[batch.batch_id] = batch
+            self.batch_meters[batch.batch_id] = meters
+            self.by_material_color.setdefault(pair, []).append(batch)
+            self.pair_meters[pair] = self.pair_meters.get(pair, 0) + meters
+
+            # Only batches with stock are offered as colors / alternatives
+            if meters > 0:
+                self._add_stocked_pair(pair, batch)
+
+    def _add_stocked_pair(self, pair, batch) -> None:
+        material, color = pair
+        self.colors_by_material.setdefault(material, {}).setdefault(color, batch.color)
+        self.materials_by_color.setdefault(color, {}).setdefault(material, batch.material_name)
+
+    def apply_changes(self, changed: Iterable = (), removed_ids: Iterable = ()) -> "InventoryIndex":
+        """
+        New index with `changed` batches inserted/replaced and `removed_ids`
+        dropped. Only the (material, color) pairs those batches belong to
+        (before or after the change) are recomputed.
+        """
+        changed = {batch.batch_id: batch for batch in changed}
+        removed = set(removed_ids) - set(changed)
+
+        old_versions = [self.by_id[batch_id] for batch_id in [*changed, *removed] if batch_id in self.by_id]
+        pairs = {_pair(batch) for batch in [*old_versions, *changed.values()]}
+
+        new = InventoryIndex.__new__(InventoryIndex)
+        list.__init__(new, [changed.get(b.batch_id, b) for b in self if b.batch_id not in removed])
+        list.extend(new, [b for batch_id, b in changed.items() if batch_id not in self.by_id])
+
+        new.by_id = {**self.by_id, **changed}
+        new.batch_meters = dict(self.batch_meters)
+        for batch_id in removed:
+            new.by_id.pop(batch_id, None)
+            new.batch_meters.pop(batch_id, None)
+        for batch_id, batch in changed.items():
+            new.batch_meters[batch_id] = batch_total_meters(batch)
+
+        new.by_material_color = dict(self.by_material_color)
+        new.pair_meters = dict(self.pair_meters)
+        new.colors_by_material = dict(self.colors_by_material)
+        new.materials_by_color = dict(self.materials_by_color)
+
+        for pair in pairs:
+            material, color = pair
+
+            # Pair lists are small — rebuild them outright
+            batches = [
+                changed.get(b.batch_id, b) for b in self.by_material_color.get(pair, [])
+                if b.batch_id not in removed
+            ]
+            batches = [b for b in batches if _pair(b) == pair]
+            present = {b.batch_id for b in batches}
+            batches += [b for b in changed.values() if b.batch_id not in present and _pair(b) == pair]
+
+            # Copy-on-write for the inner dicts this pair lives in
+            new.colors_by_material[material] = {
+                k: v for k, v in new.colors_by_material.get(material, {}).items() if k != color
+            }
+            new.materials_by_color[color] = {
+                k: v for k, v in new.materials_by_color.get(color, {}).items() if k != material
+            }
+
+            if batches:
+                new.by_material_color[pair] = batches
+                new.pair_meters[pair] = sum(new.batch_meters[b.batch_id] for b in batches)
+                stocked = next((b for b in batches if new.batch_meters[b.batch_id] > 0), None)
+                if stocked is not None:
+                    new._add_stocked_pair(pair, stocked)
+            else:
+                new.by_material_color.pop(pair, None)
+                new.pair_meters.pop(pair, None)
+
+            for mapping, key in [(new.colors_by_material, material), (new.materials_by_color, color)]:
+                if not mapping[key]:
+                    del mapping[key]
+
+        return new
+
+    def with_holds(self, held: dict) -> "InventoryIndex":
+        """View of this index with `held` meters (batch_id → meters) unavailable."""
+        view = InventoryIndex.__new__(InventoryIndex)
+        list.__init__(view, self)
+        view.__dict__.update(self.__dict__)
+        view.held = held
+        return view
+
+    # ─── Lookups ───
+
+    def matching(self, material_name: str, color: str) -> list:
+        return self.by_material_color.get((_key(material_name), _key(color)), [])
+
+    def colors_for(self, material_name: str) -> list:
+        material = _key(material_name)
+        colors = self.colors_by_material.get(material, {})
+        return [name for color, name in colors.items() if self._pair_available((material, color))]
+
+    def materials_for(self, color: str) -> list:
+        color = _key(color)
+        materials = self.materials_by_color.get(color, {})
+        return [name for material, name in materials.items() if self._pair_available((material, color))]
+
+    def _pair_available(self, pair) -> bool:
+        if not self.held:
+            return True  # colors_by_material / materials_by_color hold stocked pairs only
+        return any(self.meters(batch) > 0 for batch in self.by_material_color.get(pair, []))
+
+    def _in_stock(self, pairs) -> Iterable:
+        for pair in pairs:
+            for batch in self.by_material_color.get(pair, []):
+                if self.meters(batch) > 0:
+                    yield batch
+
+    def in_stock_for_material(self, material_name: str) -> Iterable:
+        """Batches with stock, lazily, grouped by color."""
+        material = _key(material_name)
+        return self._in_stock((material, color) for color in self.colors_by_material.get(material, {}))
+
+    def in_stock_for_color(self, color: str) -> Iterable:
+        """Batches with stock, lazily, grouped by material."""
+        color = _key(color)
+        return self._in_stock((material, color) for material in self.materials_by_color.get(color, {}))
+
+    def meters(self, batch) -> float:
+        """Available meters: batch total minus any reserved meters."""
+        meters = self.batch_meters.get(batch.batch_id)
+        if meters is None:
+            meters = batch_total_meters(batch)
+        if self.held:
+            meters = max(meters - self.held.get(batch.batch_id, 0), 0)
+        return meters
+
+
+def as_inventory_index(batches) -> InventoryIndex:
+    """Returns batches unchanged if already indexed, else indexes them."""
+    if isinstance(batches, InventoryIndex):
+        return batches
+    return InventoryIndex(batches or [])
@@ -0,0 +1,102 @@
+"""
+Soft inventory holds for orders still being negotiated.
+
+check_inventory writes fulfilled_batches into session items, but stock was
+only deducted at approve_order — two customers negotiating for the same
+last 100 m both saw FULL_AVAILABLE and one approval later failed.
+
+Now every sync of a session's items replaces that order's holds with its
+current allocations (negotiating / accepted items only), each expiring
+INVENTORY_RESERVATION_TTL_MINUTES after the last activity. Cancelled or
+replaced items simply drop out of the next sync. While the order waits
+for the owner, its holds do not expire (the customer is done, the owner
+may take hours); approval and terminal states release everything.
+Availability checks for other orders subtract active holds through an
+InventoryIndex view (one GROUP BY over the expires_at index).
+
+Set INVENTORY_RESERVATIONS_ENABLED=false to turn holds off.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.workflows.order_item_status import OrderItemStatus
+from app.workflows.order_states import OrderState
+from app.services.inventory_index import InventoryIndex, as_inventory_index
+
+
+HELD_STATUSES = [OrderItemStatus.NEGOTIATING.value, OrderItemStatus.ACCEPTED.value]
+
+# Orders in these states keep their holds until approved / rejected
+PINNED_STATES = [OrderState.WAITING_OWNER_CONFIRMATION.value]
+
+# Expiry of a pinned hold
+PINNED_EXPIRY = datetime(9999, 1, 1, tzinfo=timezone.utc)
+
+
+def is_reservation_enabled() -> bool:
+    return os.getenv("INVENTORY_RESERVATIONS_ENABLED", "true").lower() in ["1", "true", "yes"]
+
+
+def _get_ttl() -> timedelta:
+    return timedelta(minutes=float(os.getenv("INVENTORY_RESERVATION_TTL_MINUTES", "30")))
+
+
+def apply_active_holds(db: Session, batches, order_id=None) -> InventoryIndex:
+    """
+    Batches as an index whose availability excludes meters held by other
+    orders (the given order's own holds still count as available to it).
+    """
+    index = as_inventory_index(batches)
+
+    if not is_reservation_enabled():
+        return index
+
+    from app.crud.reservation import get_reserved_meters
+
+    held = get_reserved_meters(db, exclude_order_id=order_id)
+    return index.with_holds(held) if held else index
+
+
+def _hold_expiry(session) -> datetime:
+    state = getattr(session, "workflow_state", None)
+    state = state.value if hasattr(state, "value") else state
+
+    if state in PINNED_STATES:
+        return PINNED_EXPIRY
+    return datetime.now(timezone.utc) + _get_ttl()
+
+
+def hold_session_items(db: Session, session) -> int:
+    """
+    Replaces the order's holds with the current item allocations and
+    pushes their expiry out by the TTL (pinned while the order awaits the
+    owner). Returns the number of holds.
+    """
+    if not is_reservation_enabled():
+        return 0
+
+    from app.crud.reservation import replace_order_reservations
+
+    holds = []
+    for item in session.items:
+        status = item.status.value if hasattr(item.status, "value") else item.status
+        if status not in HELD_STATUSES or not item.fulfilled_batches:
+            continue
+
+        for batch in item.fulfilled_batches:
+            if batch.get("batch_id") and batch.get("allocated_meters"):
+                holds.append((item.item_id, batch["batch_id"], batch["allocated_meters"]))
+
+    return replace_order_reservations(db, session.order_id, holds, _hold_expiry(session))
+
+
+def release_order_holds(db: Session, order_id) -> None:
+    if not is_reservation_enabled():
+        return
+
+    from app.crud.reservation import release_order_reservations
+
+    release_order_reservations(db, order_id)
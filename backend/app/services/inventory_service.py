@@ -1,65 +1,80 @@
 from typing import List, Dict
 
-from app.schemas.inventory_schema import InventoryBatchSchema
 from app.schemas.measurement_schema import TextileMeasurement
+from app.services.inventory_index import BatchRecord, as_inventory_index, batch_total_meters
+from app.services.allocation_engine import allocate
 
 
-def calculate_batch_meters(batch: InventoryBatchSchema) -> float:
+def batch_from_db(batch) -> BatchRecord:
+    """
+    Converts an InventoryBatch DB row (material loaded) to the record
+    the inventory logic works with.
+    """
+    return BatchRecord(
+        batch_id=str(batch.batch_id),
+        material_id=str(batch.material_id),
+        material_name=batch.material.material_name,
+        color=batch.color,
+        rolls_available=batch.rolls_available,
+        meters_per_roll=float(batch.meters_per_roll),
+        loose_meters_available=float(batch.loose_meters_available),
+        created_at=batch.created_at
+    )
+
+
+def calculate_batch_meters(batch: BatchRecord) -> float:
     """
     Calculates total available meters in a batch.
     """
-    return (batch.rolls_available * batch.meters_per_roll) + batch.loose_meters_available
+    return batch_total_meters(batch)
 
 
-def filter_matching_batches(batches: List[InventoryBatchSchema],
+def filter_matching_batches(batches: List[BatchRecord],
                             material_name: str,
-                            color: str) -> List[InventoryBatchSchema]:
+                            color: str) -> List[BatchRecord]:
     """
     Filters inventory batches by material and color.
+    O(1) lookup on the inventory index.
     """
     if not material_name or not color:
         return []
 
-    mat_lower = material_name.lower()
-    color_lower = color.lower()
+    return list(as_inventory_index(batches).matching(material_name, color))
 
-    return [
-        batch for batch in batches        
-        if (batch.material_name or "").lower() == mat_lower
-        and (batch.color or "").lower() == color_lower
-    ]
 
-
-def get_available_colors(batches: List[InventoryBatchSchema],
+def get_available_colors(batches: List[BatchRecord],
                          material_name: str) -> List[str]:
     """
     Returns a list of unique colors available for a given material.
+    Only colors with actual stock are suggested.
     """
     if not material_name:
         return []
 
-    mat_lower = material_name.lower()
-    colors = set()
-    for batch in batches:
-        if (batch.material_name or "").lower() == mat_lower:
-            # Only suggest if actual stock exists
-            total_meters = calculate_batch_meters(batch)
-            if total_meters > 0:
-                colors.add(batch.color)
-    
-    return list(colors)
+    return as_inventory_index(batches).colors_for(material_name)
 
 
 def check_inventory(order_item: TextileMeasurement,
-                    available_batches: List[InventoryBatchSchema],
+                    available_batches: List[BatchRecord],
                     color: str) -> Dict:
     """
     Checks inventory availability and returns fulfillment plan.
+    QUANTITY_NEEDED (nothing allocated) while the meters are unknown —
+    e.g. rolls whose length could not be settled.
     """
 
     required_meters = order_item.normalized_meters
 
-    matching_batches = filter_matching_batches(available_batches,
+    if not required_meters or required_meters <= 0:
+        return {
+            "status": "QUANTITY_NEEDED",
+            "fulfilled_batches": [],
+            "available_meters": 0
+        }
+
+    index = as_inventory_index(available_batches)
+
+    matching_batches = filter_matching_batches(index,
                                                order_item.material_name,
                                                color)
 
@@ -70,25 +85,11 @@ def check_inventory(order_item: TextileMeasurement,
             "available_meters": 0
         }
 
-    fulfilled_batches = []
-    total_available = 0
-    remaining_required = required_meters
-
-    for batch in matching_batches:
-        batch_meters = calculate_batch_meters(batch)
-
-        if remaining_required <= 0:
-            break
-
-        allocated = min(batch_meters, remaining_required)
-
-        fulfilled_batches.append({
-            "batch_id": batch.batch_id,
-            "allocated_meters": allocated
-        })
+    # Roll-aware split across batches (strategy: INVENTORY_ALLOCATION_STRATEGY)
+    allocation = allocate(matching_batches, required_meters, meters_of=index.meters)
 
-        total_available += batch_meters
-        remaining_required -= allocated
+    fulfilled_batches = allocation.fulfilled_batches
+    total_available = allocation.available_meters
 
     if total_available >= required_meters:
         status = "FULL_AVAILABLE"
@@ -0,0 +1,275 @@
+"""
+Versioned in-process inventory snapshot.
+
+Order processing used to run `db.query(InventoryBatch).all()` (plus one
+lazy `materials` lookup per batch) on every new order and media
+confirmation. Instead, each worker keeps all batches in memory as
+BatchRecord objects and refreshes them incrementally:
+
+1. Local writes — session events (cache_invalidation) record which
+   InventoryBatch rows a session flushed; after commit just those rows
+   are re-read.
+   Core UPDATEs that bypass the ORM call note_inventory_change().
+2. Other workers' writes — at most every INVENTORY_SNAPSHOT_CHECK_SECONDS
+   a cheap `max(updated_at), count(*)` probe runs; rows updated since the
+   last watermark are re-read (deleted rows trigger a full reload).
+3. Material changes (rename / delete) trigger a full reload.
+
+Every applied change bumps `version`. stats() reports staleness and
+refresh metrics (GET /debug/inventory-snapshot).
+
+Batch objects are shared between requests — treat them as read-only.
+Set INVENTORY_SNAPSHOT_ENABLED=false to fall back to per-request DB reads.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.inventory import InventoryBatch
+from app.models.material import Material
+from app.services.cache_invalidation import pending_changes, register_cache_invalidation
+from app.services.inventory_service import batch_from_db
+from app.services.inventory_index import InventoryIndex
+
+
+CACHE_NAME = "inventory_snapshot"
+
+
+def is_snapshot_enabled() -> bool:
+    return os.getenv("INVENTORY_SNAPSHOT_ENABLED", "true").lower() in ["1", "true", "yes"]
+
+
+def _get_check_interval() -> float:
+    return float(os.getenv("INVENTORY_SNAPSHOT_CHECK_SECONDS", "5"))
+
+
+# Re-read window behind the watermark: a transaction that started before
+# the last check (older now()) may commit after it
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+class InventorySnapshot:
+
+    def __init__(self):
+        self._list = InventoryIndex()  # current version; by_id: batch_id (str) → BatchRecord
+        self._lock = threading.RLock()
+
+        self.loaded = False
+        self.version = 0
+        self._watermark = None      # max(updated_at) seen
+        self._row_count = 0
+        self._last_check = 0.0
+        self._last_refresh = 0.0
+
+        self._pending_ids = set()   # committed locally, not yet re-read
+        self._reload_required = False
+
+        self.metrics = {
+            "full_loads": 0,
+            "incremental_refreshes": 0,
+            "rows_refreshed": 0,
+            "remote_checks": 0,
+            "last_refresh_ms": 0.0,
+        }
+
+    # ─── Public API ───
+
+    def get_batches(self, db: Session) -> InventoryIndex:
+        """All batches (indexed), refreshed as needed. Read-only objects."""
+        with self._lock:
+            if not self.loaded or self._reload_required:
+                self._full_load(db)
+            else:
+                if self._pending_ids:
+                    self._refresh_ids(db, self._pending_ids)
+                    self._pending_ids = set()
+
+                if time.monotonic() - self._last_check >= _get_check_interval():
+                    self._check_remote(db)
+
+            return self._list
+
+    def mark_dirty(self, batch_ids=(), reload: bool = False) -> None:
+        with self._lock:
+            self._pending_ids.update(str(batch_id) for batch_id in batch_ids)
+            if reload:
+                self._reload_required = True
+
+    def invalidate(self) -> None:
+        self.mark_dirty(reload=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "enabled": is_snapshot_enabled(),
+                "loaded": self.loaded,
+                "version": self.version,
+                "batches": len(self._list),
+                "pending_changes": len(self._pending_ids),
+                "seconds_since_refresh": round(now - self._last_refresh, 1) if self.loaded else None,
+                "seconds_since_remote_check": round(now - self._last_check, 1) if self.loaded else None,
+                "watermark": self._watermark.isoformat() if self._watermark else None,
+                **self.metrics,
+            }
+
+    # ─── Loading ───
+
+    def _query(self, db: Session):
+        return db.query(InventoryBatch).options(joinedload(InventoryBatch.material))
+
+    def _full_load(self, db: Session) -> None:
+        start = time.perf_counter()
+
+        rows = self._query(db).all()
+        self._row_count = len(rows)
+        self._watermark = max((row.updated_at for row in rows if row.updated_at), default=None)
+
+        self._pending_ids = set()
+        self._reload_required = False
+        self.loaded = True
+        self._publish(InventoryIndex(batch_from_db(row) for row in rows))
+
+        self.metrics["full_loads"] += 1
+        self.metrics["rows_refreshed"] += len(rows)
+        self._finish_refresh(start)
+
+    def _refresh_ids(self, db: Session, batch_ids) -> None:
+        start = time.perf_counter()
+
+        rows = (
+            self._query(db)
+            .filter(InventoryBatch.batch_id.in_([uuid.UUID(batch_id) for batch_id in batch_ids]))
+            .all()
+        )
+        found = {str(row.batch_id) for row in rows}
+        deleted = [batch_id for batch_id in batch_ids if batch_id not in found]
+
+        self._advance_watermark(rows)
+        self._publish(self._list.apply_changes((batch_from_db(row) for row in rows), deleted))
+        self._row_count = len(self._list)
+
+        self.metrics["incremental_refreshes"] += 1
+        self.metrics["rows_refreshed"] += len(rows)
+        self._finish_refresh(start)
+
+    def _check_remote(self, db: Session) -> None:
+        """Picks up writes made by other workers."""
+        self._last_check = time.monotonic()
+        self.metrics["remote_checks"] += 1
+
+        latest, count = db.query(
+            func.max(InventoryBatch.updated_at),
+            func.count(InventoryBatch.batch_id)
+        ).one()
+
+        if count < self._row_count:
+            self._full_load(db)  # rows were deleted elsewhere
+            return
+
+        if latest is None or (self._watermark and latest <= self._watermark and count == self._row_count):
+            return
+
+        start = time.perf_counter()
+
+        query = self._query(db)
+        if self._watermark:
+            query = query.filter(InventoryBatch.updated_at > self._watermark - WATERMARK_OVERLAP)
+        rows = query.all()
+
+        self._advance_watermark(rows)
+        self._publish(self._list.apply_changes(batch_from_db(row) for row in rows))
+        self._row_count = len(self._list)
+
+        self.metrics["incremental_refreshes"] += 1
+        self.metrics["rows_refreshed"] += len(rows)
+        self._finish_refresh(start)
+
+    def _advance_watermark(self, rows) -> None:
+        for row in rows:
+            if row.updated_at and (self._watermark is None or row.updated_at > self._watermark):
+                self._watermark = row.updated_at
+
+    def _publish(self, index: InventoryIndex) -> None:
+        # New index object per version — readers keep a consistent view
+        self._list = index
+        self.version += 1
+
+    def _finish_refresh(self, start: float) -> None:
+        self._last_refresh = time.monotonic()
+        if not self._last_check:
+            self._last_check = self._last_refresh
+        self.metrics["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+
+inventory_snapshot = InventorySnapshot()
+
+
+def get_inventory_batches(db: Session) -> InventoryIndex:
+    """
+    Current inventory as an indexed BatchRecord list — from the snapshot,
+    or straight from the DB when the snapshot is disabled.
+    """
+    if is_snapshot_enabled():
+        return inventory_snapshot.get_batches(db)
+
+    rows = db.query(InventoryBatch).options(joinedload(InventoryBatch.material)).all()
+    return InventoryIndex(batch_from_db(row) for row in rows)
+
+
+def get_inventory_batches_for_items(db: Session, items) -> InventoryIndex:
+    """
+    Inventory needed to check one order's items (measurements or OrderItems).
+    The snapshot already holds everything in memory; without it, only the
+    in-stock batches sharing a material or color with the items are read.
+    """
+    if is_snapshot_enabled():
+        return inventory_snapshot.get_batches(db)
+
+    from app.crud.inventory import get_in_stock_batches_for_items
+
+    pairs = []
+    for item in items:
+        measurement = getattr(item, "measurement", item)
+        pairs.append((measurement.material_name, measurement.color))
+
+    rows = get_in_stock_batches_for_items(db, pairs)
+    return InventoryIndex(batch_from_db(row) for row in rows)
+
+
+def note_inventory_change(db: Session, batch_ids, reload: bool = False) -> None:
+    """
+    For writes that bypass the ORM unit of work (Core UPDATE / bulk):
+    the snapshot re-reads these batches once the session commits.
+    reload=True asks for one full reload instead (bulk imports).
+    """
+    changes = pending_changes(db, CACHE_NAME)
+    changes.setdefault("batch_ids", set()).update(str(batch_id) for batch_id in batch_ids)
+    if reload:
+        changes["reload"] = True
+
+
+# ─── Commit-driven refresh: track InventoryBatch / Material writes per session ───
+
+def _collect_inventory_changes(session, obj, changes: dict) -> None:
+    if isinstance(obj, InventoryBatch):
+        if obj.batch_id is not None:
+            changes.setdefault("batch_ids", set()).add(str(obj.batch_id))
+    elif obj not in session.new:
+        # Renamed / deleted material — names inside batches are stale
+        changes["reload"] = True
+
+
+def _apply_inventory_changes(changes: dict) -> None:
+    inventory_snapshot.mark_dirty(changes.get("batch_ids", ()), reload=changes.get("reload", False))
+
+
+register_cache_invalidation(
+    CACHE_NAME, [InventoryBatch, Material], _apply_inventory_changes, collect=_collect_inventory_changes
+)
@@ -2,11 +2,14 @@ import os
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from app.services.model_router import get_model_name
+
 load_dotenv()
 
-def get_llm():
+def get_llm(tier: str = "lite"):
     '''
     Returns configured Gemini LLM instance using LangChain.
+    `tier` ("lite" | "standard" | "pro") is picked by model_router.
     '''
 
     api_key=os.getenv("GEMINI_API_KEY")
@@ -16,7 +19,7 @@ def get_llm():
     
 
     llm= ChatGoogleGenerativeAI(
-        model='gemini-2.5-flash-lite',
+        model=get_model_name(tier),
         temperature=0,
         google_api_key=api_key
     )
@@ -0,0 +1,307 @@
+"""
+Local intent classifier (char n-gram logistic regression).
+
+Trained offline with scikit-learn from stored `messages` labelled by past
+LLM outputs (see backend/train_intent_classifier.py), then exported to a
+compact JSON weight table shipped with the app (app/ml/intent_classifier.json,
+a seed-only model until retrained on history). Inference is plain Python
+over that table — no scikit-learn needed at runtime — and answers well
+under a millisecond. The caller falls back to the LLM whenever confidence
+is below INTENT_LOCAL_THRESHOLD or the model file is missing.
+"""
+
+import json
+import math
+import os
+import re
+from pathlib import Path
+
+MODEL_PATH = Path(os.getenv("INTENT_MODEL_PATH", "app/ml/intent_classifier.json"))
+
+INTENTS = ["order", "greeting", "help", "general_query", "unclear"]
+
+# Seed examples (intent_prompt.txt plus common variants) so a fresh
+# install answers greetings, help and plain orders locally before enough
+# labelled history exists.
+SEED_EXAMPLES = [
+    # order
+    ("50m red cotton bhej do", "order"),
+    ("3 roll polyester chahiye", "order"),
+    ("mujhe silk aur cotton chahiye", "order"),
+    ("20 meter blue silk", "order"),
+    ("100m white rayon aur 40m pink crepe", "order"),
+    ("30m black cotton", "order"),
+    ("2 roll red silk bhejo", "order"),
+    ("40 meter green rayon chahiye", "order"),
+    ("10m yellow crepe aur 5m white cotton", "order"),
+    ("5 roll navy blue polyester", "order"),
+    ("laal cotton 25 meter", "order"),
+    ("neela silk 2 roll bhej dena", "order"),
+    ("60m maroon rayon", "order"),
+    ("1 than safed muslin", "order"),
+    ("15 gaj pink cotton chahiye", "order"),
+    ("cotton red 50m, silk blue 20m", "order"),
+    ("order: 4 roll black crepe", "order"),
+    ("80 meter grey polyester bhejo", "order"),
+    ("mujhe 2 roll cotton chahiye", "order"),
+    ("35m sky blue rayon", "order"),
+    ("kal tak 100m white cotton bhej do", "order"),
+    ("ek roll peela cotton", "order"),
+    ("silk 30 meter golden", "order"),
+    ("3 than muslin aur 2 roll crepe", "order"),
+    # greeting
+    ("hello", "greeting"),
+    ("hi", "greeting"),
+    ("namaste", "greeting"),
+    ("kaise ho", "greeting"),
+    ("good morning", "greeting"),
+    ("hello ji", "greeting"),
+    ("hi bhai", "greeting"),
+    ("namaste ji", "greeting"),
+    ("namaskar", "greeting"),
+    ("good evening", "greeting"),
+    ("good afternoon", "greeting"),
+    ("hey", "greeting"),
+    ("hii", "greeting"),
+    ("helo", "greeting"),
+    ("ram ram", "greeting"),
+    ("jai shree krishna", "greeting"),
+    ("salaam", "greeting"),
+    ("kaise ho bhai", "greeting"),
+    ("hello sir", "greeting"),
+    ("hi there", "greeting"),
+    # help
+    ("help", "help"),
+    ("?", "help"),
+    ("kya kar sakte ho", "help"),
+    ("options batao", "help"),
+    ("menu", "help"),
+    ("help chahiye", "help"),
+    ("order kaise karu", "help"),
+    ("order kaise dena hai", "help"),
+    ("tum kya kar sakte ho", "help"),
+    ("kaise use karu", "help"),
+    ("menu dikhao", "help"),
+    ("options", "help"),
+    ("help me", "help"),
+    ("kya kya hota hai yahan", "help"),
+    ("??", "help"),
+    ("how to order", "help"),
+    # general_query
+    ("mera order kab aayega?", "general_query"),
+    ("cotton ka rate kya hai?", "general_query"),
+    ("last order ka invoice bhejo", "general_query"),
+    ("payment ho gaya hai", "general_query"),
+    ("delivery kab hogi", "general_query"),
+    ("silk ka price batao", "general_query"),
+    ("bill bhej do", "general_query"),
+    ("order status kya hai", "general_query"),
+    ("payment kaise karu", "general_query"),
+    ("maal kab tak pahunchega", "general_query"),
+    ("shop kab khulti hai", "general_query"),
+    ("gst number bhejo", "general_query"),
+    ("mera balance kitna hai", "general_query"),
+    ("rayon ka rate", "general_query"),
+    # unclear
+    ("ok", "unclear"),
+    ("hmm", "unclear"),
+    ("okay", "unclear"),
+    ("theek hai", "unclear"),
+    ("acha", "unclear"),
+    ("k", "unclear"),
+    ("haan", "unclear"),
+    ("👍", "unclear"),
+    ("asdf", "unclear"),
+    ("hmm ok", "unclear"),
+]
+
+NGRAM_RANGE = (2, 4)
+
+# Inverse regularization strength. Weak: with short messages and few
+# examples per intent the default (1.0) keeps every probability near the
+# class prior, so nothing ever clears the confidence threshold.
+REGULARIZATION_C = 20.0
+
+_WHITESPACE = re.compile(r"\s\s+")
+
+_model = None
+_model_loaded = False
+
+
+def get_confidence_threshold() -> float:
+    return float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.85"))
+
+
+def train_intent_model(texts: list[str], labels: list[str]):
+    """
+    Fits a char n-gram TF-IDF + logistic regression pipeline (training only).
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    model = Pipeline([
+        ("tfidf", TfidfVectorizer(
+            analyzer="char_wb",
+            ngram_range=NGRAM_RANGE,
+            lowercase=True,
+            sublinear_tf=True,
+            min_df=1
+        )),
+        ("clf", LogisticRegression(
+            C=REGULARIZATION_C,
+            max_iter=1000,
+            class_weight="balanced"
+        )),
+    ])
+
+    model.fit([normalize_text(t) for t in texts], labels)
+    return model
+
+
+def export_intent_model(model, metadata: dict | None = None) -> dict:
+    """
+    Flattens a fitted pipeline into {ngram: [idf, w_class0, w_class1, ...]}.
+    """
+    vectorizer = model.named_steps["tfidf"]
+    clf = model.named_steps["clf"]
+
+    classes = [str(c) for c in clf.classes_]
+    coef = clf.coef_
+    intercept = clf.intercept_
+
+    # Binary LR stores one row (sigmoid); softmax over [0, z] is equivalent
+    if len(classes) == 2:
+        coef = [[0.0] * len(coef[0]), coef[0]]
+        intercept = [0.0, intercept[0]]
+
+    features = {}
+    for ngram, index in vectorizer.vocabulary_.items():
+        features[ngram] = [float(vectorizer.idf_[index])] + [
+            float(row[index]) for row in coef
+        ]
+
+    return {
+        "classes": classes,
+        "intercept": [float(b) for b in intercept],
+        "ngram_range": list(NGRAM_RANGE),
+        "features": features,
+        "metadata": metadata or {},
+    }
+
+
+def save_intent_model(model, path: Path = MODEL_PATH, metadata: dict | None = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(export_intent_model(model, metadata), file)
+
+
+def load_intent_model() -> dict | None:
+    """
+    Loads the exported weight table once per process.
+    Returns None when no model has been trained yet.
+    """
+    global _model, _model_loaded
+
+    if _model_loaded:
+        return _model
+
+    _model_loaded = True
+
+    if not MODEL_PATH.exists():
+        print(f"⚠️ Local intent model not found at {MODEL_PATH} — every intent goes to the LLM")
+        return None
+
+    try:
+        with open(MODEL_PATH, "r") as file:
+            _model = json.load(file)
+    except Exception as e:
+        print(f"Local intent model could not be loaded: {e}")
+        _model = None
+
+    return _model
+
+
+def reload_intent_model():
+    """
+    Forces the next predict_intent() call to re-read the model file.
+    """
+    global _model, _model_loaded
+    _model = None
+    _model_loaded = False
+
+
+def normalize_text(message: str) -> str:
+    return " ".join((message or "").lower().split())
+
+
+def char_wb_ngrams(text: str, min_n: int, max_n: int) -> list[str]:
+    """
+    Same n-grams as scikit-learn's analyzer="char_wb":
+    each word is padded with spaces and n-grams never cross words.
+    """
+    ngrams = []
+
+    for word in _WHITESPACE.sub(" ", text).split():
+        word = f" {word} "
+        length = len(word)
+
+        for n in range(min_n, max_n + 1):
+            offset = 0
+            ngrams.append(word[offset:offset + n])
+            while offset + n < length:
+                offset += 1
+                ngrams.append(word[offset:offset + n])
+            if offset == 0:  # word shorter than n — counted once
+                break
+
+    return ngrams
+
+
+def score_intents(model: dict, message: str) -> dict[str, float]:
+    """
+    Sublinear TF-IDF (L2-normalized) · coef + intercept, then softmax.
+    """
+    min_n, max_n = model["ngram_range"]
+    features = model["features"]
+    classes = model["classes"]
+
+    counts = {}
+    for ngram in char_wb_ngrams(normalize_text(message), min_n, max_n):
+        if ngram in features:
+            counts[ngram] = counts.get(ngram, 0) + 1
+
+    logits = list(model["intercept"])
+
+    if counts:
+        weighted = {
+            ngram: (1 + math.log(tf)) * features[ngram][0]
+            for ngram, tf in counts.items()
+        }
+        norm = math.sqrt(sum(v * v for v in weighted.values()))
+
+        for ngram, value in weighted.items():
+            row = features[ngram]
+            scaled = value / norm
+            for c in range(len(classes)):
+                logits[c] += scaled * row[c + 1]
+
+    peak = max(logits)
+    exps = [math.exp(logit - peak) for logit in logits]
+    total = sum(exps)
+
+    return {cls: e / total for cls, e in zip(classes, exps)}
+
+
+def predict_intent(message: str) -> tuple[str, float] | None:
+    """
+    Returns (intent, confidence) from the local model, or None if unavailable.
+    """
+    model = load_intent_model()
+    if model is None:
+        return None
+
+    probabilities = score_intents(model, message)
+    intent = max(probabilities, key=probabilities.get)
+
+    return intent, probabilities[intent]
@@ -0,0 +1,98 @@
+"""
+Per-phone batching window for image albums.
+
+Customers often send 3–5 photos of one handwritten list back to back.
+Instead of one vision call + one confirmation session per photo, images
+from the same phone are collected until no new image has arrived for
+MEDIA_BATCH_WINDOW_SECONDS (or MEDIA_BATCH_MAX_IMAGES is reached), then
+handed to the flush callback as one batch.
+
+The flush runs on a timer thread, so the callback must open its own DB
+session and send its own WhatsApp reply. In-process only: each worker
+batches the messages it receives.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+def get_batch_window() -> float:
+    """Seconds to wait for more images. 0 disables batching."""
+    return float(os.getenv("MEDIA_BATCH_WINDOW_SECONDS", "4"))
+
+
+def get_batch_max_images() -> int:
+    return int(os.getenv("MEDIA_BATCH_MAX_IMAGES", "5"))
+
+
+@dataclass
+class PendingBatch:
+    media: list = field(default_factory=list)       # media_info dicts (with prefetch futures)
+    captions: list = field(default_factory=list)
+    timer: threading.Timer | None = None
+
+
+class MediaBatcher:
+
+    def __init__(self):
+        self._batches: dict[str, PendingBatch] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        phone: str,
+        media_info: dict,
+        caption: str | None,
+        on_flush: Callable[[str, list, list], None]
+    ) -> int:
+        """
+        Queues an image for this phone and (re)starts its window.
+        Takes ownership of media_info["prefetch"]: the caller must not
+        release it. Returns the number of images now waiting.
+        """
+        queued = dict(media_info)
+        media_info.pop("prefetch", None)
+
+        with self._lock:
+            batch = self._batches.get(phone)
+
+            if batch is None:
+                batch = PendingBatch()
+                self._batches[phone] = batch
+            elif batch.timer:
+                batch.timer.cancel()
+
+            batch.media.append(queued)
+            if caption:
+                batch.captions.append(caption)
+
+            delay = 0 if len(batch.media) >= get_batch_max_images() else get_batch_window()
+
+            batch.timer = threading.Timer(delay, self._flush, args=(phone, batch, on_flush))
+            batch.timer.daemon = True
+            batch.timer.start()
+
+            return len(batch.media)
+
+    def _flush(self, phone: str, batch: PendingBatch, on_flush) -> None:
+        with self._lock:
+            # A stale timer (already firing when a new image arrived) may
+            # flush the grown batch; the newer timer then finds nothing
+            if self._batches.get(phone) is not batch:
+                return
+            del self._batches[phone]
+
+        try:
+            on_flush(phone, batch.media, batch.captions)
+        except Exception as e:
+            print(f"Media batch flush failed for {phone}: {e}")
+
+    def pending(self, phone: str) -> int:
+        with self._lock:
+            batch = self._batches.get(phone)
+            return len(batch.media) if batch else 0
+
+
+media_batcher = MediaBatcher()
@@ -0,0 +1,131 @@
+"""
+Content-hash cache for media extraction results.
+
+The same fabric photo / price list is often forwarded by many customers.
+Results are keyed by SHA-256 of the raw media bytes plus a prompt version
+(prompt text + model), so identical media skips preprocessing and Gemini
+entirely, while a prompt change naturally invalidates old entries.
+
+In-process LRU with TTL; each worker keeps its own copy.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def hash_media(data) -> str:
+    """
+    SHA-256 hex digest of raw media — bytes or a seekable file handle
+    (hashed in chunks, position restored to the start).
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return hashlib.sha256(data).hexdigest()
+
+    digest = hashlib.sha256()
+    data.seek(0)
+    for chunk in iter(lambda: data.read(64 * 1024), b""):
+        digest.update(chunk)
+    data.seek(0)
+    return digest.hexdigest()
+
+
+def prompt_version(*parts: str | None) -> str:
+    """
+    Short fingerprint of everything that shapes the model's answer
+    (prompt template, model name, caption...).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+
+class MediaResultCache:
+    """
+    Thread-safe LRU cache with per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int = 500, ttl_seconds: float = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Extracted TextileMeasurement lists, keyed by (media_hash, prompt_version)
+extraction_cache = MediaResultCache(
+    max_entries=int(os.getenv("MEDIA_CACHE_MAX_ENTRIES", "500")),
+    ttl_seconds=float(os.getenv("MEDIA_CACHE_TTL_SECONDS", "86400")),
+)
+
+# Voice note transcripts (plain strings), keyed by (media_hash, prompt_version)
+transcript_cache = MediaResultCache(
+    max_entries=int(os.getenv("MEDIA_CACHE_MAX_ENTRIES", "500")),
+    ttl_seconds=float(os.getenv("MEDIA_CACHE_TTL_SECONDS", "86400")),
+)
+
+
+def get_cached_items(media_hash: str, version: str):
+    """
+    Returns a fresh copy of cached items (callers mutate them), or None.
+    """
+    items = extraction_cache.get((media_hash, version))
+    if items is None:
+        return None
+    return [item.model_copy(deep=True) for item in items]
+
+
+def cache_items(media_hash: str, version: str, items) -> None:
+    extraction_cache.put(
+        (media_hash, version),
+        [item.model_copy(deep=True) for item in items]
+    )
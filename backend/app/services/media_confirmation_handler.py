@@ -5,6 +5,7 @@ for the customer to confirm, reject, or correct the extracted items.
 """
 
 import json
+from typing import Optional
 from sqlalchemy.orm import Session
 
 from app.services.llm_service import get_llm
@@ -14,6 +15,13 @@ from app.services.order_session_manager import (
     sync_session_items_to_db,
     hydrate_session_from_db
 )
+from app.services.media_working_set import (
+    get_working_set,
+    update_working_set_items,
+    refresh_candidate_batches,
+    drop_working_set
+)
+from app.schemas.order_session_schema import OrderSession
 from app.workflows.order_states import OrderState
 from app.workflows.order_item_status import OrderItemStatus
 
@@ -65,15 +73,49 @@ Customer Message:
         return "unclear"
 
 
-def handle_media_confirmation(db: Session, customer_phone: str, message: str) -> str:
+def get_media_transcript(db: Session, customer_phone: str) -> str | None:
+    """
+    Transcript of the voice note behind the current MEDIA_CONFIRMATION session.
+    The session always comes from the customer's latest image/voice message
+    (a newer one replaces it), so that message is the source.
+    Returns None for image orders.
+    """
+    from app.models.message import Message
+
+    latest_media = (
+        db.query(Message)
+        .filter(Message.phone_number == customer_phone)
+        .filter(Message.direction == "incoming")
+        .filter(Message.message_type.in_(["image", "audio"]))
+        .order_by(Message.timestamp.desc())
+        .first()
+    )
+
+    if latest_media and latest_media.message_type == "audio":
+        return latest_media.transcript
+
+    return None
+
+
+def handle_media_confirmation(
+    db: Session,
+    customer_phone: str,
+    message: str,
+    session: Optional[OrderSession] = None
+) -> str:
     """
     Processes customer reply in MEDIA_CONFIRMATION state.
+    The router passes the session it already hydrated; the in-memory
+    working set (items, transcript, candidate batches) is used when present.
     """
-    session = get_active_session_by_phone(db, customer_phone)
+    if session is None:
+        session = get_active_session_by_phone(db, customer_phone)
 
     if not session:
         return "No active order found."
 
+    working_set = get_working_set(session.order_id)
+
     intent = classify_media_confirmation_intent(message)
 
     # -------------------------------------------------
@@ -81,9 +123,14 @@ def handle_media_confirmation(db: Session, customer_phone: str, message: str) ->
     # -------------------------------------------------
     if intent == "confirm":
         from app.services.order_processing_service import process_confirmed_media_order
-        from app.router.message_router import get_all_inventory_batches, _build_combined_order_response
+        from app.router.message_router import _build_combined_order_response
+        from app.services.inventory_snapshot import get_inventory_batches_for_items
 
-        inventory_batches = get_all_inventory_batches(db)
+        # Only the shortlisted materials' batches, re-read for fresh stock
+        if working_set:
+            inventory_batches = refresh_candidate_batches(db, working_set)
+        else:
+            inventory_batches = get_inventory_batches_for_items(db, session.items)
 
         result = process_confirmed_media_order(
             db=db,
@@ -91,6 +138,8 @@ def handle_media_confirmation(db: Session, customer_phone: str, message: str) ->
             available_batches=inventory_batches
         )
 
+        drop_working_set(session.order_id)
+
         return _build_combined_order_response(result)
 
     # -------------------------------------------------
@@ -99,6 +148,7 @@ def handle_media_confirmation(db: Session, customer_phone: str, message: str) ->
     elif intent == "reject":
         update_workflow_state(db, session.order_id, OrderState.ORDER_REJECTED)
         db.commit()
+        drop_working_set(session.order_id)
 
         return (
             "❌ Order cancel kar diya gaya hai.\n\n"
@@ -115,13 +165,21 @@ def handle_media_confirmation(db: Session, customer_phone: str, message: str) ->
         from app.services.customer_reply_llm_service import classify_customer_reply
         from app.services.order_update_service import apply_customer_decisions
 
-        decision_output = classify_customer_reply(
-            message,
-            [item.measurement for item in session.items
-             if item.status not in [OrderItemStatus.CANCELLED, OrderItemStatus.REPLACED]]
-        )
-
-        apply_customer_decisions(session, decision_output)
+        # Voice orders: the original transcript helps resolve
+        # corrections like "nahi, pehle wala 60 meter tha"
+        if working_set:
+            current_items = working_set.items
+            context = working_set.context
+        else:
+            current_items = [
+                item.measurement for item in session.items
+                if item.status not in [OrderItemStatus.CANCELLED, OrderItemStatus.REPLACED]
+            ]
+            context = get_media_transcript(db, customer_phone)
+
+        decision_output = classify_customer_reply(message, current_items, context=context)
+
+        apply_customer_decisions(db, session, decision_output)
         sync_session_items_to_db(db, session)
 
         # Show updated order for re-confirmation
@@ -133,8 +191,13 @@ def handle_media_confirmation(db: Session, customer_phone: str, message: str) ->
         if not active_items:
             update_workflow_state(db, session.order_id, OrderState.ORDER_REJECTED)
             db.commit()
+            drop_working_set(session.order_id)
             return "Sab items cancel ho gaye. Naya order bhejein."
 
+        # Shortlist only materials introduced by this edit
+        if working_set:
+            update_working_set_items(db, working_set, [item.measurement for item in active_items])
+
         item_summary = "\n".join([
             f"• {i.measurement.input_quantity} {i.measurement.input_unit} {i.measurement.color or ''} {i.measurement.material_name}"
             for i in active_items
@@ -1,18 +1,78 @@
-
 import os
+import tempfile
+import threading
+import time
 import requests
-from typing import Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Tuple
+
+
+# Media types the extractors can handle (checked before the body is read)
+DEFAULT_ALLOWED_MIME_TYPES = [
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "audio/ogg",
+    "audio/opus",
+    "audio/mpeg",
+    "audio/mp4",
+    "audio/aac",
+    "audio/amr",
+]
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaRejectedError(ValueError):
+    """Raised when media is too large or of an unsupported type."""
+
+    def __init__(self, reason: str, message: str):
+        self.reason = reason  # "too_large" | "unsupported_type"
+        super().__init__(message)
+
+
+def _get_media_limits():
+    """Read download limits at runtime (not import time)."""
+    allowed = os.getenv("MEDIA_ALLOWED_MIME_TYPES")
+    return {
+        "max_bytes": int(os.getenv("MEDIA_MAX_BYTES", str(10 * 1024 * 1024))),
+        # Files up to this size stay in memory; larger ones spill to disk
+        "spool_max_memory": int(os.getenv("MEDIA_SPOOL_MAX_MEMORY", str(1024 * 1024))),
+        "allowed_mime_types": (
+            [m.strip() for m in allowed.split(",") if m.strip()]
+            if allowed else DEFAULT_ALLOWED_MIME_TYPES
+        ),
+    }
+
+
+def _check_mime_type(mime_type: str | None, allowed: list[str]) -> None:
+    base_type = (mime_type or "").split(";")[0].strip().lower()
+    if base_type not in allowed:
+        raise MediaRejectedError("unsupported_type", f"Unsupported media type: {mime_type}")
+
 
+def _check_size(size, max_bytes: int) -> None:
+    if size is not None and int(size) > max_bytes:
+        raise MediaRejectedError("too_large", f"Media is {int(size)} bytes (max {max_bytes})")
 
-def download_whatsapp_media(media_id: str) -> Tuple[bytes, str]:
+
+def download_whatsapp_media(media_id: str) -> Tuple[BinaryIO, str]:
     """
     Downloads media from WhatsApp Cloud API.
-    Returns (file_bytes, mime_type).
+    Returns (file_handle, mime_type).
+
+    The body is streamed into a SpooledTemporaryFile: small files stay in
+    memory, large ones spill to disk. Type and size are checked from the
+    metadata and response headers before any of the body is read, and the
+    download is aborted as soon as it passes MEDIA_MAX_BYTES.
+    Callers own the handle and should close() it.
     """
     WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
     if not WHATSAPP_TOKEN:
         raise ValueError("WHATSAPP_TOKEN not found in environment")
 
+    limits = _get_media_limits()
+
     # 1. Get Media URL
     url = f"https://graph.facebook.com/v18.0/{media_id}"
     headers = {
@@ -23,19 +83,122 @@ def download_whatsapp_media(media_id: str) -> Tuple[bytes, str]:
         response = requests.get(url, headers=headers)
         response.raise_for_status()
         data = response.json()
-        
+
         media_url = data.get("url")
         mime_type = data.get("mime_type")
-        
+
         if not media_url:
             raise ValueError("Media URL not found in WhatsApp response")
 
-        # 2. Download File Bytes
-        media_response = requests.get(media_url, headers=headers)
-        media_response.raise_for_status()
-        
-        return media_response.content, mime_type
+        # 2. Reject early from metadata (no body downloaded yet)
+        _check_mime_type(mime_type, limits["allowed_mime_types"])
+        _check_size(data.get("file_size"), limits["max_bytes"])
+
+        # 3. Stream file bytes into spooled temp storage
+        with requests.get(media_url, headers=headers, stream=True) as media_response:
+            media_response.raise_for_status()
+            _check_size(media_response.headers.get("Content-Length"), limits["max_bytes"])
+
+            spool = tempfile.SpooledTemporaryFile(max_size=limits["spool_max_memory"])
+            received = 0
+
+            try:
+                for chunk in media_response.iter_content(chunk_size=CHUNK_SIZE):
+                    received += len(chunk)
+                    _check_size(received, limits["max_bytes"])
+                    spool.write(chunk)
+            except Exception:
+                spool.close()
+                raise
+
+        spool.seek(0)
+        return spool, mime_type
 
     except Exception as e:
         print(f"Error downloading WhatsApp media {media_id}: {e}")
         raise e
+
+
+# ─── Prefetch: start the download at webhook receipt ───
+
+_prefetch_executor = None
+_prefetch_lock = threading.Lock()
+
+
+def _get_prefetch_executor() -> ThreadPoolExecutor:
+    global _prefetch_executor
+
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("MEDIA_PREFETCH_WORKERS", "4")),
+                thread_name_prefix="media-prefetch"
+            )
+        return _prefetch_executor
+
+
+def prefetch_whatsapp_media(media_id: str) -> Future:
+    """
+    Starts download_whatsapp_media in the background and returns the Future,
+    so the Graph API round trip overlaps the idempotency check and session lookup.
+    """
+    return _get_prefetch_executor().submit(download_whatsapp_media, media_id)
+
+
+def release_prefetched_media(future: Future) -> None:
+    """
+    Closes the prefetched handle once the download finishes.
+    Safe to call after the handler already consumed (and closed) it,
+    and for messages that never reached the media handler (duplicates, owner, ...).
+    """
+    if future.cancel():
+        return
+
+    def _close(done: Future):
+        if not done.cancelled() and done.exception() is None:
+            done.result()[0].close()
+
+    future.add_done_callback(_close)
+
+
+def get_media(media_info: dict) -> Tuple[BinaryIO, str]:
+    """
+    Returns (file_handle, mime_type) for a media message — from the
+    prefetch started by the webhook if there is one, else downloads now.
+    Download errors (incl. MediaRejectedError) are re-raised here.
+    """
+    future = media_info.get("prefetch")
+    if future is None:
+        return download_whatsapp_media(media_info["id"])
+
+    wait_start = time.perf_counter()
+    result = future.result(timeout=float(os.getenv("MEDIA_PREFETCH_TIMEOUT_SECONDS", "30")))
+    print(f"Media prefetch wait {(time.perf_counter() - wait_start) * 1000:.0f}ms")
+    return result
+
+
+# ─── Helpers for extractors that accept bytes or a file handle ───
+
+def media_size(media: bytes | BinaryIO) -> int:
+    if isinstance(media, (bytes, bytearray)):
+        return len(media)
+
+    position = media.tell()
+    media.seek(0, os.SEEK_END)
+    size = media.tell()
+    media.seek(position)
+    return size
+
+
+def read_media(media: bytes | BinaryIO) -> bytes:
+    """
+    Returns the full content. Only used where bytes are unavoidable
+    (inline Gemini upload of unprocessed media).
+    """
+    if isinstance(media, (bytes, bytearray)):
+        return bytes(media)
+
+    media.seek(0)
+    data = media.read()
+    media.seek(0)
+    return data
@@ -0,0 +1,119 @@
+"""
+Per-order working set for the MEDIA_CONFIRMATION loop.
+
+After an image/voice extraction the customer usually replies a few times
+("haan", "cotton nahi silk hai", ...). Instead of rebuilding everything
+from the DB and the full inventory on every reply, each media order keeps:
+
+- items      : the active extracted items (what the customer is confirming)
+- context    : prompt context for edits (voice transcript / image caption)
+- shortlist  : candidate inventory batches, per lowercased material name
+
+Edits only load batches for materials that were not shortlisted yet;
+confirmation re-reads just the shortlisted materials' rows, so stock
+numbers are fresh without a full inventory scan (read from the inventory
+snapshot when enabled, else one filtered DB query).
+
+In-process (LRU + TTL). If the set is missing — expired, restarted, or
+another worker — callers fall back to the full DB path.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.services.inventory_service import batch_from_db
+from app.services.media_cache import MediaResultCache
+
+
+@dataclass
+class MediaWorkingSet:
+    order_id: str
+    items: list
+    context: str | None = None
+    shortlist: dict = field(default_factory=dict)  # material (lower) → [BatchRecord]
+
+
+working_sets = MediaResultCache(
+    max_entries=int(os.getenv("MEDIA_WORKING_SET_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.getenv("MEDIA_WORKING_SET_TTL_SECONDS", "1800")),
+)
+
+
+def _material_keys(items) -> set[str]:
+    return {
+        item.material_name.lower()
+        for item in items
+        if item.material_name and item.material_name.lower() not in ["unknown", "unclear"]
+    }
+
+
+def _load_shortlist(db: Session, materials: set[str]) -> dict:
+    from app.services.inventory_snapshot import is_snapshot_enabled, inventory_snapshot
+
+    shortlist = {material: [] for material in materials}
+
+    if not materials:
+        return shortlist
+
+    if is_snapshot_enabled():
+        # Snapshot is kept fresh on read — just filter it in memory
+        for batch in inventory_snapshot.get_batches(db):
+            material = (batch.material_name or "").lower()
+            if material in shortlist:
+                shortlist[material].append(batch)
+        return shortlist
+
+    from app.crud.inventory import get_batches_for_materials
+
+    for batch in get_batches_for_materials(db, materials):
+        record = batch_from_db(batch)
+        shortlist.setdefault(record.material_key, []).append(record)
+
+    return shortlist
+
+
+def start_working_set(db: Session, order_id: str, items, context: str | None = None) -> MediaWorkingSet:
+    """
+    Called right after extraction, when the MEDIA_CONFIRMATION session is created.
+    """
+    working_set = MediaWorkingSet(
+        order_id=str(order_id),
+        items=list(items),
+        context=context,
+        shortlist=_load_shortlist(db, _material_keys(items))
+    )
+    working_sets.put(working_set.order_id, working_set)
+    return working_set
+
+
+def get_working_set(order_id: str) -> MediaWorkingSet | None:
+    return working_sets.get(str(order_id))
+
+
+def update_working_set_items(db: Session, working_set: MediaWorkingSet, items) -> None:
+    """
+    After an edit: swap in the new items and shortlist only materials
+    that were not already loaded.
+    """
+    working_set.items = list(items)
+
+    new_materials = _material_keys(items) - set(working_set.shortlist)
+    if new_materials:
+        working_set.shortlist.update(_load_shortlist(db, new_materials))
+
+    working_sets.put(working_set.order_id, working_set)
+
+
+def refresh_candidate_batches(db: Session, working_set: MediaWorkingSet) -> list:
+    """
+    Re-reads current stock for the shortlisted materials only and returns
+    the flat batch list for the inventory check.
+    """
+    working_set.shortlist = _load_shortlist(db, set(working_set.shortlist))
+    return [batch for batches in working_set.shortlist.values() for batch in batches]
+
+
+def drop_working_set(order_id: str) -> None:
+    working_sets.pop(str(order_id))
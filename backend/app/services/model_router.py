@@ -0,0 +1,117 @@
+"""
+Complexity-based model tiering for Gemini calls.
+
+Scores each incoming message (length, item count, edit verbs, media) and
+picks the cheapest model tier that can reliably handle it, so a simple
+"50m red cotton" does not pay the same price as a five-item edit.
+"""
+
+import os
+import re
+
+
+# ─── Tier → model name (overridable per deployment) ───
+
+DEFAULT_MODELS = {
+    "lite": "gemini-2.5-flash-lite",
+    "standard": "gemini-2.5-flash",
+    "pro": "gemini-2.5-pro",
+}
+
+TIER_ORDER = ["lite", "standard", "pro"]
+
+# Quantity mentions ("50m", "3 roll", "20 meter", "2 than", "10 gaj")
+QUANTITY_PATTERN = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:m\b|mtr|meter|metre|roll|than|gaj|yard)",
+    re.IGNORECASE
+)
+
+# Item separators used by customers ("aur", "+", ",", new lines)
+SEPARATOR_PATTERN = re.compile(r"\baur\b|\band\b|\+|,|\n", re.IGNORECASE)
+
+# Words that signal an edit / correction rather than a plain order
+EDIT_WORDS = [
+    "change", "badal", "badlo", "instead", "replace", "hata", "hatao",
+    "remove", "cancel", "jod", "add", "kam", "zyada", "nahi", "galat",
+    "wrong", "update", "sirf",
+]
+
+
+def get_model_name(tier: str) -> str:
+    """
+    Returns the Gemini model name for a tier.
+    Read at runtime so GEMINI_MODEL_<TIER> env overrides apply without restart.
+    """
+    if tier not in DEFAULT_MODELS:
+        tier = "standard"
+
+    return os.getenv(f"GEMINI_MODEL_{tier.upper()}", DEFAULT_MODELS[tier])
+
+
+def score_message_complexity(
+    message: str | None,
+    media_type: str | None = None,
+    media_count: int = 1,
+    item_count: int | None = None,
+) -> int:
+    """
+    Scores how hard a message is to extract.
+
+    - length:      +1 above 120 chars, +2 above 300
+    - item count:  +1 per item beyond the first (max +3)
+    - edit verbs:  +2 if the message edits/corrects an order
+    - media:       +2 for image/audio, +1 more for multi-image albums
+    """
+    text = (message or "").strip()
+    lowered = text.lower()
+    score = 0
+
+    # 1. Length
+    if len(text) > 300:
+        score += 2
+    elif len(text) > 120:
+        score += 1
+
+    # 2. Item count (explicit, or estimated from the text)
+    if item_count is None:
+        quantities = len(QUANTITY_PATTERN.findall(text))
+        separators = len(SEPARATOR_PATTERN.findall(text)) + 1 if text else 0
+        item_count = max(1, min(quantities, separators))
+
+    score += min(max(item_count - 1, 0), 3)
+
+    # 3. Edit verbs
+    words = set(re.findall(r"[a-z]+", lowered))
+    if any(word in words for word in EDIT_WORDS):
+        score += 2
+
+    # 4. Media
+    if media_type in ["image", "audio"]:
+        score += 2
+        if media_count > 1:
+            score += 1
+
+    return score
+
+
+def select_model_tier(
+    message: str | None,
+    media_type: str | None = None,
+    media_count: int = 1,
+    item_count: int | None = None,
+) -> str:
+    """
+    Maps a complexity score to a model tier.
+    GEMINI_FORCE_TIER pins every call to one tier (useful for benchmarks).
+    """
+    forced = os.getenv("GEMINI_FORCE_TIER")
+    if forced in DEFAULT_MODELS:
+        return forced
+
+    score = score_message_complexity(message, media_type, media_count, item_count)
+
+    if score <= 1:
+        return "lite"
+    if score <= 4:
+        return "standard"
+    return "pro"
@@ -17,11 +17,13 @@ from app.workflows.order_item_status import OrderItemStatus
 
 from app.services.inventory_service import check_inventory
 from app.services.negotiation_service import generate_inventory_response
+from app.services.unit_normalizer import build_quantity_question
 
 from app.services.alternative_service import (
     find_alternatives,
     build_alternative_message
 )
+from app.services.similarity_graph import get_similarity_graph
 
 # -------------------------------------------------
 # FINAL ORDER SUMMARY BUILDER
@@ -34,11 +36,12 @@ def build_final_summary(session):
     for item in session.items:
         if item.status == OrderItemStatus.ACCEPTED:
             m = item.measurement
-            qty = m.normalized_meters or m.input_quantity or "?"
+            # Rolls / gaj are never shown as meters
+            qty = f"{m.normalized_meters}m" if m.normalized_meters else f"{m.input_quantity:g} {m.input_unit} (meter pending)"
             color = m.color or ""
             material = m.material_name or "Unknown"
             summary_lines.append(
-                f"• {qty}m {color} {material}".strip()
+                f"• {qty} {color} {material}".strip()
             )
 
     if not summary_lines:
@@ -80,7 +83,7 @@ def get_active_items(session):
 # BUILD NEGOTIATION MESSAGE
 # -------------------------------------------------
 
-def build_pending_negotiation_message(session, pending_items):
+def build_pending_negotiation_message(session, pending_items, graph=None):
 
     pending_messages = []
 
@@ -91,6 +94,16 @@ def build_pending_negotiation_message(session, pending_items):
 
         measurement = item.measurement
 
+        # -------------------------------------------------
+        # ⭐ METERS UNKNOWN → Ask for the quantity
+        # -------------------------------------------------
+
+        if item.inventory_status == "QUANTITY_NEEDED" or not measurement.normalized_meters:
+            pending_messages.append(
+                build_quantity_question(measurement, session.available_batches or [])
+            )
+            continue
+
         # -------------------------------------------------
         # ⭐ ONLY OUT OF STOCK → Alternative Suggestions
         # -------------------------------------------------
@@ -104,7 +117,7 @@ def build_pending_negotiation_message(session, pending_items):
                 )
                 continue
 
-            alternatives = find_alternatives(session, item)
+            alternatives = find_alternatives(session, item, graph)
 
             alt_message = build_alternative_message(
                 item,
@@ -177,6 +190,11 @@ def handle_negotiation_message(db: Session, customer_phone: str, message: str):
         if session.workflow_state != OrderState.CUSTOMER_NEGOTIATION:
             return {"message": "Order is not in negotiation stage."}
 
+        # Stock for new / edited items and alternatives (snapshot minus other orders' holds)
+        from app.services.inventory_snapshot import get_inventory_batches
+        from app.services.inventory_reservations import apply_active_holds
+        session.available_batches = apply_active_holds(db, get_inventory_batches(db), session.order_id)
+
         # -------------------------------------------------
         # STEP 1 — LLM CLASSIFICATION (active items only)
         # -------------------------------------------------
@@ -192,7 +210,7 @@ def handle_negotiation_message(db: Session, customer_phone: str, message: str):
         # STEP 2 — APPLY DECISIONS
         # -------------------------------------------------
 
-        apply_customer_decisions(session, decision_output)
+        apply_customer_decisions(db, session, decision_output)
 
         # -------------------------------------------------
         # STEP 2.5 — DETECT NEW ITEMS IN MESSAGE
@@ -200,9 +218,10 @@ def handle_negotiation_message(db: Session, customer_phone: str, message: str):
 
         try:
             from app.services.order_extractor import extract_textile_order
+            from app.services.catalog_resolver import resolve_measurements
             from app.services.final_confirmation_handler_service import add_new_items_to_session
 
-            extracted_items = extract_textile_order(message)
+            extracted_items = resolve_measurements(db, extract_textile_order(message))
 
             if extracted_items:
                 # Filter out items that match existing session materials+color pair
@@ -280,7 +299,8 @@ def handle_negotiation_message(db: Session, customer_phone: str, message: str):
 
         pending_message = build_pending_negotiation_message(
             session,
-            pending_items
+            pending_items,
+            get_similarity_graph(db)
         )
 
         db.commit()  # Atomic commit
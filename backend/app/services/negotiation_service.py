@@ -1,6 +1,7 @@
 from typing import Dict
 
 from app.schemas.measurement_schema import TextileMeasurement
+from app.services.unit_normalizer import build_quantity_question
 
 
 def generate_inventory_response(order_item: TextileMeasurement,
@@ -35,6 +36,11 @@ def generate_inventory_response(order_item: TextileMeasurement,
 
         next_step = "CUSTOMER_NEGOTIATION"
 
+    elif status == "QUANTITY_NEEDED":
+        message = build_quantity_question(order_item, [])
+
+        next_step = "CUSTOMER_NEGOTIATION"
+
     else:
         message = (
             f"❌ {color_display} {material} abhi stock mein available nahi hai."
@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 
 from app.services.llm_service import get_llm
+from app.services.model_router import select_model_tier
 from app.schemas.measurement_schema import TextileMeasurement
 
 
@@ -13,13 +14,14 @@ def load_prompt():
         return file.read()
 
 
-def extract_textile_order(message: str):
+def extract_textile_order(message: str, tier: str | None = None):
     """
     Uses Gemini LLM to extract textile order information
     from customer message.
+    Model tier is picked from message complexity unless given.
     """
 
-    llm = get_llm()
+    llm = get_llm(tier or select_model_tier(message))
     prompt_template = load_prompt()
 
     full_prompt = f"{prompt_template}\n\nCustomer Message:\n{message}"
@@ -5,7 +5,10 @@ from app.workflows.order_item_status import OrderItemStatus
 from app.services.negotiation_handler_service import build_final_summary
 
 from app.services.order_extractor import extract_textile_order
+from app.services.catalog_resolver import resolve_measurements
+from app.services.unit_normalizer import normalize_quantities, build_quantity_question
 from app.services.inventory_service import check_inventory, get_available_colors
+from app.services.inventory_reservations import apply_active_holds
 from app.services.negotiation_service import generate_inventory_response
 from app.services.order_session_manager import (
     create_order_session,
@@ -14,7 +17,7 @@ from app.services.order_session_manager import (
     sync_session_items_to_db
 )
 
-from app.schemas.inventory_schema import InventoryBatchSchema
+from app.services.inventory_index import BatchRecord
 from app.workflows.order_states import OrderState
 
 
@@ -22,13 +25,21 @@ def process_customer_order(
     db: Session,
     message: str,
     customer_phone: str,
-    available_batches: List[InventoryBatchSchema],
+    available_batches: List[BatchRecord] | None = None,
     pre_extracted_items: List | None = None) -> Dict:
     """
     Full order processing pipeline with DB-backed OrderSession.
+    Without available_batches, only the inventory for the extracted items is loaded.
     """
 
-    extracted_items = pre_extracted_items or extract_textile_order(message)
+    extracted_items = pre_extracted_items or resolve_measurements(db, extract_textile_order(message))
+
+    if available_batches is None:
+        from app.services.inventory_snapshot import get_inventory_batches_for_items
+        available_batches = get_inventory_batches_for_items(db, extracted_items)
+
+    # Rolls / than / gaj → meters from the stocked roll lengths
+    normalize_quantities(extracted_items, available_batches)
 
     # Create DB-backed Order Session after successful extraction
     session = create_order_session(db, customer_phone, extracted_items)
@@ -99,7 +110,8 @@ def process_customer_order(
                 }]
             }
 
-    session.available_batches = available_batches
+    # Meters held by other in-flight orders are not available
+    session.available_batches = apply_active_holds(db, available_batches, session.order_id)
     
     responses = []
     negotiation_required = False
@@ -134,10 +146,7 @@ def process_customer_order(
         # -------------------------------------------------
         if not measurement.normalized_meters or measurement.normalized_meters <= 0:
             negotiation_response = {
-                "message": (
-                    f"{color or ''} {measurement.material_name} kitna chahiye?\n"
-                    "Meter ya roll mein batayein. (Example: *50 meter* ya *2 roll*)"
-                ),
+                "message": build_quantity_question(measurement, session.available_batches),
                 "next_step": "CUSTOMER_NEGOTIATION"
             }
             session_item.status = OrderItemStatus.NEGOTIATING
@@ -256,7 +265,7 @@ def process_customer_order(
 def process_confirmed_media_order(
     db: Session,
     session,
-    available_batches: List[InventoryBatchSchema]) -> Dict:
+    available_batches: List[BatchRecord]) -> Dict:
     """
     Processes an already-created order session from MEDIA_CONFIRMATION state.
     Runs inventory check on stored items without re-extracting.
@@ -320,7 +329,11 @@ def process_confirmed_media_order(
     # -------------------------------------------------
     # RUN INVENTORY CHECK ON SESSION ITEMS
     # -------------------------------------------------
-    session.available_batches = available_batches
+    # Meters held by other in-flight orders are not available
+    session.available_batches = apply_active_holds(db, available_batches, session.order_id)
+
+    # Media items were stored before inventory was loaded
+    normalize_quantities([item.measurement for item in session.items], available_batches)
 
     responses = []
     negotiation_required = False
@@ -343,7 +356,7 @@ def process_confirmed_media_order(
         # HANDLE MISSING QUANTITY
         if not measurement.normalized_meters or measurement.normalized_meters <= 0:
             negotiation_response = {
-                "message": f"{color or ''} {measurement.material_name} kitna chahiye?\nMeter ya roll mein batayein.",
+                "message": build_quantity_question(measurement, session.available_batches),
                 "next_step": "CUSTOMER_NEGOTIATION"
             }
             session_item.status = OrderItemStatus.NEGOTIATING
@@ -250,6 +250,18 @@ def update_workflow_state(
             order.status = "REJECTED"
         elif new_state == OrderState.WAITING_OWNER_CONFIRMATION:
             order.status = "PENDING_APPROVAL"
+
+    # Closed orders hold no stock (completed ones were deducted)
+    if new_state.value in TERMINAL_STATES:
+        from app.services.inventory_reservations import release_order_holds
+        release_order_holds(db, order_id)
+
+    # Awaiting the owner: re-hold the stored allocations without expiry,
+    # so a slow approval cannot lose the stock to another order
+    elif new_state == OrderState.WAITING_OWNER_CONFIRMATION:
+        from app.services.inventory_reservations import hold_session_items
+        db.flush()
+        hold_session_items(db, hydrate_session_from_db(db, order_id))
         
     # db.commit() REMOVED for atomicity
     db.flush() 
@@ -385,5 +397,9 @@ def sync_session_items_to_db(
         db_item.color = item.measurement.color
         db_item.normalized_meters = item.measurement.normalized_meters
 
+    # Hold the current allocations (cancelled / replaced items drop out)
+    from app.services.inventory_reservations import hold_session_items
+    hold_session_items(db, session)
+
     # db.commit() REMOVED for atomicity
 
@@ -1,8 +1,9 @@
 from app.workflows.customer_decisions import CustomerDecision
 from app.workflows.order_item_status import OrderItemStatus
 from app.services.inventory_service import check_inventory
+from app.services.catalog_resolver import resolve_measurements
 
-def apply_customer_decisions(session, decision_output):
+def apply_customer_decisions(db, session, decision_output):
 
     decisions = decision_output["item_decisions"]
 
@@ -31,6 +32,12 @@ def apply_customer_decisions(session, decision_output):
             # ---------------- ACCEPT ----------------
             if action == CustomerDecision.ACCEPT_AVAILABLE:
 
+                # Nothing to accept until the meters are known
+                if not item.measurement.normalized_meters:
+                    item.status = OrderItemStatus.NEGOTIATING
+                    item.inventory_status = "QUANTITY_NEEDED"
+                    break
+
                 if (
                     item.inventory_status == "PARTIAL_AVAILABLE"
                     and item.available_meters
@@ -74,6 +81,10 @@ def apply_customer_decisions(session, decision_output):
                 if new_quantity:
                     updated_measurement.normalized_meters = new_quantity
 
+                # Edited names are free text too ("cotten", "laal")
+                if new_color or new_material:
+                    resolve_measurements(db, [updated_measurement])
+
                 from app.schemas.order_item_schema import OrderItem
 
                 new_item = OrderItem(
@@ -115,9 +126,9 @@ def all_items_resolved(session):
             return False
 
         # 🚨 NEW RULE
-        # If OUT OF STOCK but not cancelled yet → unresolved
+        # If OUT OF STOCK (or meters unknown) but not cancelled yet → unresolved
         if (
-            item.inventory_status == "OUT_OF_STOCK"
+            item.inventory_status in ["OUT_OF_STOCK", "QUANTITY_NEEDED"]
             and item.status != OrderItemStatus.CANCELLED
         ):
             return False
@@ -125,6 +136,16 @@ def all_items_resolved(session):
     return True
 
 
+def items_missing_quantity(session):
+    """Active items whose meters are still unknown (cannot be priced or approved)."""
+
+    return [
+        item for item in session.items
+        if item.status not in [OrderItemStatus.CANCELLED, OrderItemStatus.REPLACED]
+        and not item.measurement.normalized_meters
+    ]
+
+
 
 
 def all_items_cancelled(session):
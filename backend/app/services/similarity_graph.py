@@ -0,0 +1,197 @@
+"""
+Material / color similarity graph for alternative suggestions.
+
+find_alternatives used to offer "same material, other color" and then
+"same color, other material", first three batches found. It did not know
+that navy is close to blue, that two cottons are closer than cotton and
+silk, or that a ₹900 silk is a poor swap for a ₹150 cotton.
+
+The graph is built once from the materials catalog:
+
+    material similarity : same category (Material.category) + price
+                          proximity (price_per_meter), precomputed as a
+                          ranked neighbour list per material
+    color similarity    : COLOR_FAMILIES (navy ↔ blue, maroon ↔ red, ...)
+
+alternatives() scores only the stocked colors of the target material and
+its top MAX_NEIGHBOURS (plus at most `limit` other materials stocking the
+exact color), all inventory index lookups, and returns the best `limit` —
+cost bounded by the neighbour count, not by inventory size.
+
+Material writes in this process mark the graph stale (session event);
+other workers' catalog edits are picked up after
+SIMILARITY_GRAPH_TTL_SECONDS.
+"""
+
+import heapq
+import os
+
+from sqlalchemy.orm import Session
+
+from app.models.material import Material
+from app.services.cache_invalidation import ProcessCache
+from app.services.inventory_index import as_inventory_index
+
+
+# Family → member colors (lowercase). A color belongs to one family.
+COLOR_FAMILIES = {
+    "red": ["red", "maroon", "crimson", "wine", "burgundy", "cherry", "scarlet", "rust"],
+    "blue": ["blue", "navy", "navy blue", "sky blue", "royal blue", "indigo", "denim", "teal", "turquoise", "aqua"],
+    "green": ["green", "olive", "mint", "bottle green", "parrot green", "sea green", "emerald"],
+    "yellow": ["yellow", "mustard", "lemon", "gold", "golden"],
+    "orange": ["orange", "peach", "saffron", "coral"],
+    "pink": ["pink", "rose", "baby pink", "magenta", "fuchsia", "rani"],
+    "purple": ["purple", "violet", "lavender", "lilac", "mauve"],
+    "brown": ["brown", "beige", "khaki", "tan", "coffee", "chocolate", "camel"],
+    "white": ["white", "off white", "cream", "ivory"],
+    "black": ["black", "jet black"],
+    "grey": ["grey", "gray", "silver", "ash", "charcoal"],
+}
+
+FAMILY_OF_COLOR = {color: family for family, colors in COLOR_FAMILIES.items() for color in colors}
+
+# Ranked neighbours kept per material
+MAX_NEIGHBOURS = 8
+
+SAME_FAMILY_SCORE = 0.6
+MATERIAL_WEIGHT = 0.5
+COLOR_WEIGHT = 0.5
+
+
+def _key(value) -> str:
+    return (value or "").strip().lower()
+
+
+def _get_ttl() -> float:
+    return float(os.getenv("SIMILARITY_GRAPH_TTL_SECONDS", "300"))
+
+
+def color_family(color: str) -> str | None:
+    """Family of a color; for "dark navy" style names, of its last known word."""
+    color = _key(color)
+    if color in FAMILY_OF_COLOR:
+        return FAMILY_OF_COLOR[color]
+
+    words = color.split()
+    for i in range(1, len(words)):
+        family = FAMILY_OF_COLOR.get(" ".join(words[i:]))
+        if family:
+            return family
+    return None
+
+
+def color_similarity(a: str, b: str) -> float:
+    a, b = _key(a), _key(b)
+    if a == b:
+        return 1.0
+    family = color_family(a)
+    return SAME_FAMILY_SCORE if family and family == color_family(b) else 0.0
+
+
+class SimilarityGraph:
+
+    def __init__(self, materials=()):
+        """materials: (material_name, category, price_per_meter) tuples."""
+        self.catalog = {
+            _key(name): (_key(category) or None, float(price or 0))
+            for name, category, price in materials
+        }
+
+        self.neighbours = {}  # material → [(material, score)] best first
+        for material in self.catalog:
+            scored = (
+                (other, self.material_similarity(material, other))
+                for other in self.catalog if other != material
+            )
+            self.neighbours[material] = heapq.nlargest(MAX_NEIGHBOURS, scored, key=lambda pair: pair[1])
+
+    def material_similarity(self, a: str, b: str) -> float:
+        """
+        1 for the same material; otherwise price proximity (0..1), counted
+        in full within a category and at 30% across categories.
+        """
+        a, b = _key(a), _key(b)
+        if a == b:
+            return 1.0
+        if a not in self.catalog or b not in self.catalog:
+            return 0.0
+
+        (category_a, price_a), (category_b, price_b) = self.catalog[a], self.catalog[b]
+        top = max(price_a, price_b)
+        proximity = 1 - abs(price_a - price_b) / top if top > 0 else 1.0
+
+        if category_a and category_a == category_b:
+            return 0.5 + 0.5 * proximity
+        return 0.3 * proximity
+
+    def alternatives(self, batches, material_name: str, color: str, limit: int = 3) -> list:
+        """
+        Best in-stock (material, color) pairs other than the requested one.
+        A different material only qualifies with the same color or a color
+        of the same family.
+        """
+        index = as_inventory_index(batches)
+        target_material, target_color = _key(material_name), _key(color)
+
+        materials = {target_material: 1.0}
+        materials.update(self.neighbours.get(target_material, []))
+
+        candidates = []
+        for material, material_score in materials.items():
+            for stored_color in index.colors_for(material):
+                color_score = color_similarity(target_color, stored_color)
+                if material == target_material:
+                    if _key(stored_color) == target_color:
+                        continue  # the requested item itself
+                elif color_score == 0:
+                    continue
+
+                candidates.append((
+                    MATERIAL_WEIGHT * material_score + COLOR_WEIGHT * color_score,
+                    material,
+                    stored_color
+                ))
+
+        # Same color in materials outside the neighbour list — less similar
+        # than every neighbour, so a few are enough to fill up
+        extra = 0
+        for name in index.materials_for(target_color):
+            if extra >= limit:
+                break
+            if _key(name) not in materials:
+                extra += 1
+                candidates.append((
+                    MATERIAL_WEIGHT * self.material_similarity(target_material, name) + COLOR_WEIGHT,
+                    _key(name),
+                    index.matching(name, target_color)[0].color
+                ))
+
+        alternatives = []
+        for score, material, stored_color in heapq.nlargest(limit, candidates, key=lambda c: c[0]):
+            batches = index.matching(material, stored_color)
+            alternatives.append({
+                "material": batches[0].material_name,
+                "color": stored_color,
+                "available_meters": round(sum(index.meters(batch) for batch in batches), 2),
+                "score": round(score, 3),
+            })
+        return alternatives
+
+
+# ─── Process-wide graph, rebuilt on catalog changes ───
+
+def _build_graph(db: Session) -> SimilarityGraph:
+    return SimilarityGraph(
+        db.query(Material.material_name, Material.category, Material.price_per_meter).all()
+    )
+
+
+_graph = ProcessCache("similarity_graph", [Material], _build_graph, _get_ttl)
+
+
+def get_similarity_graph(db: Session) -> SimilarityGraph:
+    return _graph.get(db)
+
+
+def invalidate_similarity_graph() -> None:
+    _graph.invalidate()
@@ -0,0 +1,128 @@
+"""
+Deterministic quantity → meters normalization.
+
+The extraction prompt returns normalized_meters: null when the customer
+orders rolls without saying how long a roll is, and the order bounced back
+with "kitna chahiye?" — although the matching batches' meters_per_roll
+already had the answer.
+
+normalize_quantities() runs after extraction, once the order's inventory
+is loaded:
+
+    meter / m / mtr          : meters = quantity
+    gaj / gaz / yard         : meters = quantity × 0.9144
+    roll / than / thaan / taka: meters = quantity × roll length of the
+                               in-stock batches of that material (and
+                               color, if given)
+
+Roll lengths:
+    one length in stock       → used
+    several lengths           → the single length with enough whole rolls
+                                for the order, if exactly one has them
+    otherwise (or no stock)   → left as null; roll_lengths() lets the
+                                quantity prompt list the sizes on offer
+
+A roll quantity the LLM already converted (roll length in the message)
+is kept.
+"""
+
+from app.services.inventory_index import as_inventory_index
+
+
+YARD_IN_METERS = 0.9144
+
+UNIT_ALIASES = {
+    "meter": ["meter", "meters", "metre", "metres", "m", "mtr", "mtrs", "mt"],
+    "yard": ["yard", "yards", "yd", "yds", "gaj", "gaz", "gaja"],
+    "roll": ["roll", "rolls", "than", "thaan", "thans", "taka", "takka", "bundle"],
+}
+
+UNIT_OF = {alias: unit for unit, aliases in UNIT_ALIASES.items() for alias in aliases}
+
+
+def canonical_unit(unit) -> str | None:
+    return UNIT_OF.get((unit or "").strip().lower().rstrip("."))
+
+
+def roll_lengths(batches, material_name: str, color: str | None = None) -> dict:
+    """{meters_per_roll: whole rolls in stock} for the material (and color)."""
+    index = as_inventory_index(batches)
+
+    if color:
+        candidates = [batch for batch in index.matching(material_name, color) if index.meters(batch) > 0]
+    else:
+        candidates = index.in_stock_for_material(material_name)
+
+    lengths = {}
+    for batch in candidates:
+        length = float(batch.meters_per_roll)
+        if length > 0:
+            lengths[length] = lengths.get(length, 0) + batch.rolls_available
+    return lengths
+
+
+def _roll_length_for(lengths: dict, rolls: float) -> float | None:
+    if len(lengths) == 1:
+        return next(iter(lengths))
+
+    enough = [length for length, available in lengths.items() if available >= rolls]
+    return enough[0] if len(enough) == 1 else None
+
+
+def normalize_quantity(measurement, batches) -> bool:
+    """
+    Fills / corrects measurement.normalized_meters in place.
+    Returns False if it is still unknown (ambiguous or no stock).
+    """
+    unit = canonical_unit(measurement.input_unit)
+    quantity = measurement.input_quantity
+
+    if not quantity or quantity <= 0:
+        return bool(measurement.normalized_meters)
+
+    if unit == "meter":
+        measurement.input_unit = "meter"
+        measurement.normalized_meters = measurement.normalized_meters or quantity
+
+    elif unit == "yard":
+        measurement.input_unit = "yard"
+        measurement.normalized_meters = round(quantity * YARD_IN_METERS, 2)
+
+    elif unit == "roll":
+        measurement.input_unit = "roll"
+        if not measurement.normalized_meters:
+            length = _roll_length_for(
+                roll_lengths(batches, measurement.material_name, measurement.color),
+                quantity
+            )
+            if length:
+                measurement.normalized_meters = round(quantity * length, 2)
+
+    return bool(measurement.normalized_meters)
+
+
+def normalize_quantities(measurements, batches) -> list:
+    """normalize_quantity() for each item; returns the measurements."""
+    index = as_inventory_index(batches)
+    for measurement in measurements:
+        normalize_quantity(measurement, index)
+    return measurements
+
+
+def build_quantity_question(measurement, batches) -> str:
+    """The "kitna chahiye?" prompt — naming the roll sizes when that is the doubt."""
+    color = measurement.color or ""
+
+    if canonical_unit(measurement.input_unit) == "roll":
+        lengths = sorted(roll_lengths(batches, measurement.material_name, measurement.color))
+        if len(lengths) > 1:
+            sizes = " / ".join(f"{length:g}m" for length in lengths)
+            return (
+                f"{color} {measurement.material_name} ke rolls alag size mein hain ({sizes}).\n"
+                f"{measurement.input_quantity:g} roll kaunse size ke chahiye, ya total kitne meter?"
+            )
+
+    return (
+        f"{color} {measurement.material_name} kitna chahiye?\n"
+        "Meter ya roll mein batayein. (Example: *50 meter* ya *2 roll*)"
+    )
@@ -1,62 +1,116 @@
-
-import json
 import os
+import time
 import google.generativeai as genai
 from pathlib import Path
+from typing import BinaryIO
 from app.schemas.measurement_schema import TextileMeasurement
+from app.services.model_router import get_model_name, select_model_tier
+from app.services.audio_preprocessor import preprocess_audio
+from app.services.order_extractor import extract_textile_order
+from app.services.media_cache import (
+    hash_media,
+    prompt_version,
+    get_cached_items,
+    cache_items,
+    transcript_cache
+)
+
+# Stage 1: audio → transcript (the only multimodal call)
+TRANSCRIPTION_PROMPT_PATH = Path("app/prompts/voice_transcription_prompt.txt")
 
-# Reuse existing text prompt as it works for general order extraction info
+# Stage 2: transcript → items, same prompt as text orders
 PROMPT_PATH = Path("app/prompts/textile_order_prompt.txt")
 
 def load_prompt():
     with open(PROMPT_PATH, "r") as file:
         return file.read()
 
-def get_gemini_audio_model():
+def load_transcription_prompt():
+    with open(TRANSCRIPTION_PROMPT_PATH, "r") as file:
+        return file.read()
+
+def get_gemini_audio_model(tier: str = "standard"):
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found")
-    
+
     genai.configure(api_key=api_key)
-    # Gemini 2.5 Flash is multimodal and handles audio natively
-    return genai.GenerativeModel('gemini-2.5-flash')
+    # Flash-tier Gemini models are multimodal and handle audio natively
+    return genai.GenerativeModel(get_model_name(tier))
 
-def extract_order_from_voice(audio_bytes: bytes, mime_type: str) -> list[TextileMeasurement]:
+def transcribe_voice_note(audio: bytes | BinaryIO, mime_type: str, media_hash: str | None = None) -> str:
     """
-    Extracts textile order items from a voice note using Gemini Audio.
+    Transcribes a voice note (Hinglish, Roman script) using Gemini Audio.
+    Re-sent / forwarded notes are served from the transcript cache.
     """
-    model = get_gemini_audio_model()
-    prompt_template = load_prompt()
-    
-    prompt_parts = [
-        "Listen to this customer voice note (Hindi/English/Hinglish) and extract the textile order items.",
-        prompt_template,
-        {
-            "mime_type": mime_type,
-            "data": audio_bytes
-        }
-    ]
-    
+    tier = select_model_tier(None, media_type="audio")
+    prompt_template = load_transcription_prompt()
+
+    media_hash = media_hash or hash_media(audio)
+    cache_key = (media_hash, prompt_version(prompt_template, get_model_name(tier)))
+
+    cached = transcript_cache.get(cache_key)
+    if cached is not None:
+        print(f"Voice transcript cache hit ({media_hash[:12]})")
+        return cached
+
+    # Trim silence / cap duration / re-encode before upload
+    # (VoiceNoteTooLongError propagates to the router for a polite reply)
+    upload_bytes, upload_mime, stats = preprocess_audio(audio, mime_type)
+    print(
+        f"Voice preprocessed: {stats['original_bytes'] // 1024}KB → "
+        f"{stats['output_bytes'] // 1024}KB, "
+        f"{stats['original_seconds']}s → {stats['output_seconds']}s "
+        f"({stats['elapsed_ms']:.0f}ms)"
+    )
+
+    model = get_gemini_audio_model(tier)
+
     try:
-        # Generate content
-        response = model.generate_content(prompt_parts)
-        raw_output = response.text.strip()
-        
-        # Cleanup Markdown formatting
-        if raw_output.startswith("```"):
-            raw_output = raw_output.split("```")[1]
-        if raw_output.startswith("json"):
-            raw_output = raw_output[4:].strip()
-            
-        parsed_json = json.loads(raw_output)
-        
-        items = [
-            TextileMeasurement(**item) 
-            for item in parsed_json.get("items", [])
-        ]
-        
-        return items
-        
+        audio_start = time.perf_counter()
+        response = model.generate_content([
+            prompt_template,
+            {
+                "mime_type": upload_mime,
+                "data": upload_bytes
+            }
+        ])
+        print(f"Gemini Audio transcription took {(time.perf_counter() - audio_start) * 1000:.0f}ms")
+        transcript = response.text.strip().strip('"')
+
     except Exception as e:
-        print(f"Gemini Audio extraction failed: {e}")
-        raise ValueError(f"Failed to process voice order: {str(e)}")
+        print(f"Gemini Audio transcription failed: {e}")
+        raise ValueError(f"Failed to transcribe voice note: {str(e)}")
+
+    transcript_cache.put(cache_key, transcript)
+
+    return transcript
+
+def extract_order_from_voice(audio: bytes | BinaryIO, mime_type: str) -> tuple[list[TextileMeasurement], str]:
+    """
+    Two-stage voice pipeline:
+    1. transcribe the note once (multimodal call, cached by media hash)
+    2. run the regular text extractor on the transcript (cheaper text tier)
+
+    Returns (items, transcript). Accepts bytes or the spooled handle
+    from download_whatsapp_media.
+    """
+    media_hash = hash_media(audio)
+    transcript = transcribe_voice_note(audio, mime_type, media_hash=media_hash)
+
+    if not transcript:
+        return [], ""
+
+    tier = select_model_tier(transcript)
+    version = prompt_version(transcript, load_prompt(), get_model_name(tier))
+
+    cached = get_cached_items(media_hash, version)
+    if cached is not None:
+        print(f"Voice extraction cache hit ({media_hash[:12]})")
+        return cached, transcript
+
+    items = extract_textile_order(transcript, tier=tier)
+
+    cache_items(media_hash, version, items)
+
+    return items, transcript
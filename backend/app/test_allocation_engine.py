@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from app.conftest import inventory_batch
+from app.services.allocation_engine import allocate
+
+
+def _batch(batch_id, day, rolls=0, per_roll=50, loose=0):
+    return inventory_batch(
+        batch_id, rolls=rolls, meters_per_roll=per_roll, loose=loose, created_at=datetime(2024, 1, day)
+    )
+
+
+def _meters(allocation):
+    return {b["batch_id"]: b["allocated_meters"] for b in allocation.fulfilled_batches}
+
+
+def test_fifo_takes_oldest_batch_first():
+    batches = [_batch("new", 5, rolls=4), _batch("old", 1, rolls=4)]
+
+    allocation = allocate(batches, 120, strategy="fifo")
+
+    assert _meters(allocation) == {"old": 120}
+    assert allocation.rolls_opened == 3
+    assert allocation.loose_created == 30
+
+
+def test_min_rolls_uses_loose_meters_and_exact_roll_fit():
+    batches = [
+        _batch("a", 1, rolls=5, per_roll=40),
+        _batch("b", 2, rolls=5, per_roll=60),
+        _batch("c", 3, loose=20),
+    ]
+
+    allocation = allocate(batches, 140, strategy="min_rolls")
+
+    # 20 loose + 2 × 60 → two rolls, no new fragments
+    assert _meters(allocation) == {"b": 120, "c": 20}
+    assert allocation.rolls_opened == 2
+    assert allocation.loose_created == 0
+    assert allocation.optimal
+
+
+def test_short_stock_allocates_everything_and_reports_true_total():
+    batches = [_batch("a", 1, rolls=1), _batch("b", 2, loose=10)]
+
+    allocation = allocate(batches, 500)
+
+    assert allocation.available_meters == 60
+    assert allocation.allocated_meters == 60
+
+
+def test_held_meters_are_not_allocated():
+    batches = [_batch("a", 1, rolls=2), _batch("b", 2, rolls=2)]
+    held = {"a": 100}
+
+    allocation = allocate(batches, 50, meters_of=lambda b: 100 - held.get(b.batch_id, 0), strategy="fifo")
+
+    assert _meters(allocation) == {"b": 50}
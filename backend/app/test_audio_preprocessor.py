@@ -0,0 +1,72 @@
+import struct
+import sys
+
+import pytest
+
+from app.services.audio_preprocessor import VoiceNoteTooLongError, ogg_opus_duration, preprocess_audio
+
+
+PRE_SKIP = 312
+
+
+def _ogg_opus(seconds: float) -> bytes:
+    """Minimal OGG/Opus container: OpusHead page + last page with the granule position."""
+    def page(granule, payload):
+        return b"OggS" + bytes([0, 0]) + struct.pack("<q", granule) + bytes(12) + payload
+
+    head = b"OpusHead" + bytes([1, 1]) + struct.pack("<H", PRE_SKIP) + bytes(6)
+    return page(0, head) + page(0, bytes(64)) + page(int(seconds * 48000) + PRE_SKIP, bytes(64))
+
+
+@pytest.fixture
+def tone(monkeypatch):
+    """Decoder stand-in: from_file returns silence + tone + silence (ms)."""
+    pydub = pytest.importorskip("pydub")
+    from pydub.generators import Sine
+
+    def make(lead_ms, tone_ms, tail_ms):
+        segment = (
+            pydub.AudioSegment.silent(lead_ms, frame_rate=8000)
+            + Sine(440, sample_rate=8000).to_audio_segment(tone_ms)
+            + pydub.AudioSegment.silent(tail_ms, frame_rate=8000)
+        )
+        monkeypatch.setattr(pydub.AudioSegment, "from_file", lambda *args, **kwargs: segment)
+
+    return make
+
+
+def test_over_cap_voice_note_is_rejected(monkeypatch, tone):
+    monkeypatch.setenv("VOICE_MAX_SECONDS", "2")
+    tone(0, 3000, 0)
+
+    with pytest.raises(VoiceNoteTooLongError) as error:
+        preprocess_audio(b"voice note", "audio/ogg; codecs=opus")
+
+    assert error.value.duration_seconds == pytest.approx(3.0)
+    assert error.value.max_seconds == 2
+
+
+def test_silence_is_trimmed_before_the_cap(monkeypatch, tone):
+    monkeypatch.setenv("VOICE_MAX_SECONDS", "2")
+    tone(3000, 1500, 3000)
+
+    _, _, stats = preprocess_audio(b"voice note", "audio/ogg")
+
+    assert stats["original_seconds"] == pytest.approx(7.5)
+    assert stats["output_seconds"] == pytest.approx(1.9, abs=0.05)   # tone + 2 × 200 ms kept
+
+
+def test_ogg_header_enforces_the_cap_without_pydub(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pydub", None)   # import fails → fallback path
+    monkeypatch.setenv("VOICE_MAX_SECONDS", "120")
+
+    assert ogg_opus_duration(_ogg_opus(30)) == pytest.approx(30)
+
+    short = _ogg_opus(30)
+    data, mime_type, stats = preprocess_audio(short, "audio/ogg")
+    assert (data, mime_type) == (short, "audio/ogg")
+    assert stats["output_seconds"] == pytest.approx(30)
+
+    with pytest.raises(VoiceNoteTooLongError) as error:
+        preprocess_audio(_ogg_opus(150), "audio/ogg")
+    assert error.value.duration_seconds == pytest.approx(150)
@@ -0,0 +1,74 @@
+import uuid
+
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.catalog_resolver import CatalogIndex
+
+
+COTTON_ID = uuid.uuid4()
+
+INDEX = CatalogIndex(
+    materials=[(COTTON_ID, "Cotton"), (uuid.uuid4(), "Silk"), (uuid.uuid4(), "Cotton Silk"), (uuid.uuid4(), "Polyester")],
+    colors=["Red", "Sky Blue", "Grey", "Blue"]
+)
+
+
+def test_material_resolution_steps():
+    exact = INDEX.resolve_material("  COTTON ")
+    assert (exact.value, exact.method, exact.material_id) == ("Cotton", "exact", str(COTTON_ID))
+
+    assert INDEX.resolve_material("polyster").method == "alias"
+    assert INDEX.resolve_material("Cotton 60s").value == "Cotton"
+    assert INDEX.resolve_material("pure cotton silk").value == "Cotton Silk"   # longest wins
+
+    fuzzy = INDEX.resolve_material("cotten")
+    assert (fuzzy.value, fuzzy.method) == ("Cotton", "fuzzy")
+
+    assert INDEX.resolve_material("denim") is None
+
+
+def test_colors_never_collapse_to_a_contained_word():
+    assert INDEX.resolve_color("gray").value == "Grey"
+    assert INDEX.resolve_color("sky-blue").value == "Sky Blue"
+    assert INDEX.resolve_color("navy blue") is None     # not "Blue"
+    assert INDEX.resolve_color("red").value == "Red"
+
+
+def test_edited_names_resolve_before_the_inventory_check(db):
+    from types import SimpleNamespace
+
+    from app.models.inventory import InventoryBatch
+    from app.models.material import Material
+    from app.schemas.order_item_schema import OrderItem
+    from app.services.inventory_service import batch_from_db
+    from app.services.order_update_service import apply_customer_decisions
+    from app.workflows.customer_decisions import CustomerDecision
+    from app.workflows.order_item_status import OrderItemStatus
+
+    cotton, silk = Material(material_name="Cotton"), Material(material_name="Silk")
+    db.add_all([cotton, silk])
+    db.flush()
+    db.add(InventoryBatch(
+        material_id=cotton.material_id, color="Red",
+        rolls_available=2, meters_per_roll=50, loose_meters_available=0
+    ))
+    db.commit()
+
+    original = OrderItem(measurement=TextileMeasurement(
+        material_name="Silk", color="Blue", input_quantity=50, input_unit="meter", normalized_meters=50
+    ))
+    session = SimpleNamespace(
+        items=[original],
+        available_batches=[batch_from_db(row) for row in db.query(InventoryBatch).all()]
+    )
+
+    apply_customer_decisions(db, session, {"item_decisions": [{
+        "material": "Silk",
+        "decision": CustomerDecision.EDIT_ITEM,
+        "new_material": "cotten",
+        "new_color": "laal",
+    }]})
+
+    edited = session.items[-1]
+    assert original.status == OrderItemStatus.REPLACED
+    assert (edited.measurement.material_name, edited.measurement.color) == ("Cotton", "Red")
+    assert edited.inventory_status == "FULL_AVAILABLE"
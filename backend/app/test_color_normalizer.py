@@ -0,0 +1,37 @@
+from app.services.color_normalizer import ColorMap
+
+
+def test_dictionary_words_and_fuzzy_spellings():
+    colors = ColorMap()
+
+    assert colors.canonicalize("Laal") == "Red"
+    assert colors.canonicalize("aasmani") == "Sky Blue"
+    assert colors.canonicalize("नीला") == "Blue"
+    assert colors.canonicalize("gehra laal") == "Dark Red"
+    assert colors.canonicalize("neelaa") == "Blue"           # fuzzy
+    assert colors.canonicalize("Maroon") == "Maroon"         # English passes through
+    assert colors.canonicalize("Color-1") == "Color-1"       # unknown stays as given
+
+
+def test_admin_aliases_override_the_dictionary():
+    colors = ColorMap({"Rani": "Rani Pink", "kathai": "Wine"})
+
+    assert colors.canonicalize("rani") == "Rani Pink"
+    assert colors.canonicalize("Kathai") == "Wine"
+
+
+def test_names_near_a_modifier_keep_their_color():
+    colors = ColorMap()
+
+    assert colors.canonicalize("Khaki") == "Khaki"
+    assert colors.canonicalize("Haldi") == "Haldi"
+    assert colors.canonicalize("Haldi Yellow") == "Haldi Yellow"
+    assert colors.canonicalize("halka") == "halka"           # a modifier alone is no color
+    assert colors.canonicalize("halka neela") == "Light Blue"
+
+
+def test_stock_writes_use_exact_matches_only():
+    colors = ColorMap()
+
+    assert colors.canonicalize("neelaa", fuzzy=False) == "neelaa"
+    assert colors.canonicalize("gehra laal", fuzzy=False) == "Dark Red"
@@ -0,0 +1,54 @@
+import io
+import random
+
+from PIL import Image
+
+from app.services.image_preprocessor import preprocess_image
+
+
+def _photo(size, tint=(0, 0, 0), quality=95, exif=None) -> bytes:
+    """Noisy JPEG (so re-encoding has something to save); tint adds colour."""
+    rng = random.Random(7)
+    image = Image.new("RGB", size)
+    pixels = []
+    for _ in range(size[0] * size[1]):
+        value = rng.randrange(0, 160)
+        pixels.append(tuple(value + offset for offset in tint))
+    image.putdata(pixels)
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, **({"exif": exif} if exif else {}))
+    return output.getvalue()
+
+
+def _decode(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data))
+
+
+def test_exif_rotation_is_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6   # orientation: rotate 90° clockwise to display
+
+    data, mime_type, stats = preprocess_image(_photo((300, 200), tint=(0, 90, 0), exif=exif), "image/jpeg")
+
+    assert mime_type == "image/jpeg"
+    assert stats["size"] == (200, 300)
+    assert _decode(data).size == (200, 300)
+
+
+def test_low_saturation_photo_is_sent_as_grayscale():
+    slip, _, slip_stats = preprocess_image(_photo((300, 200), tint=(6, 3, 0)), "image/jpeg")
+    fabric, _, fabric_stats = preprocess_image(_photo((300, 200), tint=(90, 0, 40)), "image/jpeg")
+
+    assert slip_stats["grayscale"] and _decode(slip).mode == "L"
+    assert not fabric_stats["grayscale"] and _decode(fabric).mode == "RGB"
+
+
+def test_original_is_kept_when_reencoding_is_not_smaller(monkeypatch):
+    monkeypatch.setenv("IMAGE_QUALITY", "100")
+    original = _photo((300, 200), quality=20)
+
+    data, mime_type, stats = preprocess_image(original, "image/png")
+
+    assert (data, mime_type) == (original, "image/png")
+    assert stats["output_bytes"] == stats["original_bytes"] == len(original)
+    assert stats["bytes_saved"] == 0
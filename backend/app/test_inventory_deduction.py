@@ -0,0 +1,267 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.crud.inventory import deduct_allocations_bulk, adjust_batch_stock, InventoryConflictError
+from app.models.inventory import InventoryBatch
+from app.models.material import Material
+from app.models.inventory_movement import InventoryMovement
+from app.models.stock_summary import StockSummary
+from app.crud.stock_summary import rebuild_stock_summary, get_stock_meters_by_material
+from app.crud.inventory_journal import (
+    backfill_opening_balances, take_stock_snapshots, get_stock_as_of, find_projection_drift
+)
+
+
+def _add_batch(db, rolls, loose):
+    material = db.query(Material).first()
+    if not material:
+        material = Material(material_name="Cotton")
+        db.add(material)
+        db.flush()
+
+    batch = InventoryBatch(
+        material_id=material.material_id, color="Red",
+        rolls_available=rolls, meters_per_roll=50, loose_meters_available=loose
+    )
+    db.add(batch)
+    db.commit()
+    return batch
+
+
+def test_bulk_deduction_merges_allocations_and_opens_rolls(db):
+    first = _add_batch(db, rolls=4, loose=10)
+    second = _add_batch(db, rolls=2, loose=0)
+
+    deduct_allocations_bulk(db, [
+        {"batch_id": str(first.batch_id), "allocated_meters": 30},
+        {"batch_id": str(first.batch_id), "allocated_meters": 40},   # same batch, other item
+        {"batch_id": str(second.batch_id), "rolls": 1, "loose_meters": 0},
+    ])
+    db.commit()
+
+    # 70m from batch 1: 10 loose + 2 rolls opened (100m) → 40m loose left
+    assert (first.rolls_available, float(first.loose_meters_available)) == (2, 40)
+    assert (second.rolls_available, float(second.loose_meters_available)) == (1, 0)
+
+
+def test_short_batch_fails_without_writing(db):
+    first = _add_batch(db, rolls=4, loose=0)
+    second = _add_batch(db, rolls=1, loose=0)
+
+    with pytest.raises(ValueError):
+        deduct_allocations_bulk(db, [
+            {"batch_id": str(first.batch_id), "allocated_meters": 50},
+            {"batch_id": str(second.batch_id), "allocated_meters": 120},
+        ])
+    db.rollback()
+
+    assert first.rolls_available == 4
+
+
+def test_journal_replays_to_counters_and_point_in_time_stock(db):
+    from datetime import datetime, timedelta, timezone
+
+    batch = _add_batch(db, rolls=4, loose=10)   # predates the journal
+    assert backfill_opening_balances(db) == 1
+    db.commit()
+
+    before_order = datetime.now(timezone.utc) + timedelta(seconds=1)
+    assert take_stock_snapshots(db, as_of=before_order) == 1
+    db.commit()
+
+    later = db.query(InventoryMovement).first().created_at + timedelta(seconds=5)
+    deduct_allocations_bulk(db, [{"batch_id": str(batch.batch_id), "allocated_meters": 70}])
+    db.query(InventoryMovement).filter(InventoryMovement.movement_type != "opening_balance").update(
+        {"created_at": later}, synchronize_session=False
+    )
+    db.commit()
+
+    types = [m.movement_type for m in db.query(InventoryMovement).order_by(InventoryMovement.movement_id)]
+    assert types == ["opening_balance", "roll_opening", "order_deduction"]
+
+    key = str(batch.batch_id)
+    assert get_stock_as_of(db, before_order)[key]["rolls"] == 4
+    now = get_stock_as_of(db, later + timedelta(seconds=1))[key]
+    assert (now["rolls"], now["loose_meters"], now["movements_applied"]) == (2, 40, 2)
+    assert find_projection_drift(db) == []
+
+
+def test_backfill_journals_a_legacy_batch_that_moved_first(db):
+    batch = _add_batch(db, rolls=4, loose=0)   # predates the journal
+    rebuild_stock_summary(db)
+    deduct_allocations_bulk(db, [{"batch_id": str(batch.batch_id), "allocated_meters": 30}])
+    db.commit()
+
+    assert find_projection_drift(db)[0]["journal"]["rolls"] == -1
+
+    assert backfill_opening_balances(db) == 1
+    db.commit()
+
+    assert find_projection_drift(db) == []
+    assert get_stock_as_of(db, None)[str(batch.batch_id)]["rolls"] == 3
+    assert backfill_opening_balances(db) == 0
+
+
+def test_stock_summary_tracks_deductions_incrementally(db):
+    first = _add_batch(db, rolls=4, loose=10)
+    second = _add_batch(db, rolls=2, loose=0)
+    rebuild_stock_summary(db)   # batches were created outside the journal
+    db.commit()
+
+    deduct_allocations_bulk(db, [
+        {"batch_id": str(first.batch_id), "allocated_meters": 70},
+        {"batch_id": str(second.batch_id), "rolls": 1, "loose_meters": 0},
+    ])
+    db.commit()
+
+    summary = db.query(StockSummary).one()
+    incremental = (summary.total_rolls, float(summary.loose_meters), float(summary.total_meters))
+
+    rebuild_stock_summary(db)
+    db.commit()
+    db.expire_all()
+    summary = db.query(StockSummary).one()
+
+    assert incremental == (summary.total_rolls, float(summary.loose_meters), float(summary.total_meters))
+    assert incremental == (3, 40, 190)
+    assert get_stock_meters_by_material(db) == {str(first.material_id): 190}
+
+
+def test_concurrent_approvals_upsert_summary_rows_in_the_same_order(tmp_path):
+    import threading
+    from sqlalchemy import event
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'stock.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    setup = Session()
+    cotton, silk = Material(material_name="Cotton"), Material(material_name="Silk")
+    setup.add_all([cotton, silk])
+    setup.flush()
+
+    # Batch ids fix the journal order: (cotton, silk) for one order, (silk, cotton) for the other
+    batch_ids = [uuid.UUID(digit * 32) for digit in "abcd"]
+    for batch_id, material in zip(batch_ids, [cotton, silk, silk, cotton]):
+        setup.add(InventoryBatch(
+            batch_id=batch_id, material_id=material.material_id, color="Red",
+            rolls_available=4, meters_per_roll=50, loose_meters_available=0
+        ))
+    setup.flush()
+    rebuild_stock_summary(setup)
+    setup.commit()
+    setup.close()
+
+    upserts = {}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO stock_summary"):
+            upserts.setdefault(threading.get_ident(), []).append((parameters[0], parameters[1]))
+
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def approve(order):
+        db = Session()
+        try:
+            barrier.wait()
+            deduct_allocations_bulk(db, [{"batch_id": str(batch_id), "allocated_meters": 50} for batch_id in order])
+            db.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [
+        threading.Thread(target=approve, args=([batch_ids[0], batch_ids[2]],)),
+        threading.Thread(target=approve, args=([batch_ids[1], batch_ids[3]],)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    first, second = upserts.values()
+    assert first == second == sorted(first)
+    assert len(first) == 2
+
+    db = Session()
+    assert {float(row.total_meters) for row in db.query(StockSummary)} == {300}
+    db.close()
+
+
+def test_adjustment_retries_when_an_approval_wins_the_race(db, monkeypatch):
+    from sqlalchemy import update
+
+    batch = _add_batch(db, rolls=4, loose=10)
+    backfill_opening_balances(db)
+    assert batch.version == 1
+
+    execute = db.execute
+    races = []
+
+    def racing_execute(statement, *args, **kwargs):
+        # An approval commits between the adjustment's read and its swap
+        if getattr(statement, "is_update", False) and not races:
+            races.append(True)
+            deduct_allocations_bulk(db, [{"batch_id": str(batch.batch_id), "allocated_meters": 60}])
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", racing_execute)
+    result = adjust_batch_stock(db, batch.batch_id, "add", rolls=1, reason="recount")
+    db.commit()
+
+    assert result["attempts"] == 2
+    # 60m took 10 loose + 1 roll; the recount adds a roll on top
+    assert (batch.rolls_available, float(batch.loose_meters_available), batch.version) == (4, 0, 3)
+    assert find_projection_drift(db) == []
+
+    assert adjust_batch_stock(db, batch.batch_id, "set", meters=0)["loose_meters_available"] == 0
+    with pytest.raises(ValueError):
+        adjust_batch_stock(db, batch.batch_id, "subtract", rolls=9)
+
+    def always_behind(statement, *args, **kwargs):
+        if getattr(statement, "is_update", False):
+            execute(update(InventoryBatch).values(version=InventoryBatch.version + 1))
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", always_behind)
+    with pytest.raises(InventoryConflictError):
+        adjust_batch_stock(db, batch.batch_id, "add", rolls=1)
+
+
+def test_adjustment_retries_instead_of_waiting_on_a_locked_batch(db, monkeypatch):
+    from types import SimpleNamespace
+    from sqlalchemy.exc import OperationalError
+    from app.crud import inventory as inventory_crud
+
+    batch = _add_batch(db, rolls=4, loose=10)
+    backfill_opening_balances(db)
+
+    read = inventory_crud._read_batch_for_adjustment
+    locked_reads = []
+
+    def locked_once(db, batch_id):
+        # An approval holds the row lock: NOWAIT fails with lock_not_available
+        if not locked_reads:
+            locked_reads.append(True)
+            raise OperationalError("SELECT ... FOR UPDATE NOWAIT", {}, SimpleNamespace(pgcode="55P03"))
+        return read(db, batch_id)
+
+    monkeypatch.setattr(inventory_crud, "ADJUST_LOCK_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(inventory_crud, "_read_batch_for_adjustment", locked_once)
+    assert adjust_batch_stock(db, batch.batch_id, "add", rolls=1)["attempts"] == 2
+    db.commit()
+
+    def always_locked(db, batch_id):
+        raise OperationalError("SELECT ... FOR UPDATE NOWAIT", {}, SimpleNamespace(pgcode="55P03"))
+
+    monkeypatch.setattr(inventory_crud, "_read_batch_for_adjustment", always_locked)
+    with pytest.raises(InventoryConflictError):
+        adjust_batch_stock(db, batch.batch_id, "add", rolls=1)
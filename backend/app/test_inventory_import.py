@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+from app.models.inventory import InventoryBatch
+from app.models.material import Material
+from app.models.inventory_movement import InventoryMovement
+from app.models.stock_summary import StockSummary
+from app.services.inventory_import import import_inventory, detect_format
+
+
+@pytest.fixture(autouse=True)
+def cotton(db, monkeypatch):
+    monkeypatch.setenv("INVENTORY_IMPORT_CHUNK_SIZE", "2")
+    db.add(Material(material_name="Cotton"))
+    db.commit()
+
+
+def test_csv_import_inserts_valid_rows_and_reports_bad_ones(db):
+    upload = io.BytesIO(
+        b"Material_Name,Color,Rolls,Meters_Per_Roll,Loose_Meters\n"
+        b"cotton,Red,4,50,\n"
+        b"Cotton,neela,2,40,15\n"
+        b"Silk,Red,1,50,0\n"
+        b"Cotton,Red,x,50,0\n"
+        b"Cotton,,1,50,0\n"
+    )
+
+    report = import_inventory(db, upload, "csv")
+    db.commit()
+
+    assert (report["rows_read"], report["imported"], report["failed"]) == (5, 3, 2)
+    assert [error["line"] for error in report["errors"]] == [4, 5]
+    assert "Silk" in report["errors"][0]["error"]
+
+    assert db.query(InventoryBatch).count() == 3
+    assert db.query(InventoryMovement).filter_by(movement_type="receipt").count() == 3
+    assert sorted(s.color for s in db.query(StockSummary)) == ["Blue", "Red", "Unknown"]
+
+
+def test_ndjson_import_reports_broken_lines(db):
+    upload = io.BytesIO(
+        b'{"material_name": "Cotton", "color": "Red", "rolls": 3, "meters_per_roll": 50}\n'
+        b'\n'
+        b'{"material_name": "Cotton", "rolls": 0, "meters_per_roll": 50}\n'
+        b'not json\n'
+    )
+
+    report = import_inventory(db, upload, "ndjson")
+
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert detect_format("truck.jsonl", None) == "ndjson"
@@ -0,0 +1,58 @@
+from app.conftest import inventory_batch as _batch
+from app.services.inventory_index import InventoryIndex
+
+
+def _maps(index):
+    return (
+        list(index),
+        index.by_id,
+        index.by_material_color,
+        index.colors_by_material,
+        index.materials_by_color,
+        index.batch_meters,
+        index.pair_meters,
+    )
+
+
+def test_lookups_are_case_insensitive_and_skip_empty_batches():
+    index = InventoryIndex([
+        _batch("1", "Cotton", "Red"),
+        _batch("2", "Cotton", "Blue", rolls=0),
+        _batch("3", "Silk", "Red", loose=10),
+    ])
+
+    assert [b.batch_id for b in index.matching("cotton", "RED")] == ["1"]
+    assert index.colors_for("COTTON") == ["Red"]
+    assert index.materials_for("red") == ["Cotton", "Silk"]
+    assert index.meters(index.by_id["3"]) == 60
+
+
+def test_apply_changes_matches_full_rebuild_and_keeps_old_version():
+    old = InventoryIndex([
+        _batch("1", "Cotton", "Red"),
+        _batch("2", "Cotton", "Blue"),
+        _batch("3", "Silk", "Red"),
+    ])
+
+    changed = [_batch("2", "Cotton", "Blue", rolls=0), _batch("4", "Silk", "Green")]
+    new = old.apply_changes(changed, removed_ids=["3"])
+
+    expected = InventoryIndex([_batch("1", "Cotton", "Red"), changed[0], changed[1]])
+    assert _maps(new) == _maps(expected)
+
+    # Previous version is untouched
+    assert old.colors_for("cotton") == ["Red", "Blue"]
+    assert [b.batch_id for b in old.in_stock_for_color("red")] == ["1", "3"]
+    assert [b.batch_id for b in new.in_stock_for_color("red")] == ["1"]
+
+
+def test_batch_records_index_like_schemas():
+    from app.services.inventory_index import BatchRecord
+
+    schemas = [_batch("b1", "Cotton", "Red", rolls=2, loose=5), _batch("b2", "Silk", "Blue", rolls=0)]
+    records = [BatchRecord(**schema.model_dump()) for schema in schemas]
+
+    assert records[0].total_meters == 105
+    assert (records[0].material_key, records[0].color_key) == ("cotton", "red")
+    # colors / materials / meters maps are identical for both types
+    assert _maps(InventoryIndex(records))[3:] == _maps(InventoryIndex(schemas))[3:]
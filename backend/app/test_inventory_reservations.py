@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.inventory import InventoryBatch
+from app.models.inventory_reservation import InventoryReservation
+from app.models.material import Material
+from app.models.order import Order
+from app.models.order_session import OrderSessionDB
+from app.models.order_session_item import OrderSessionItemDB
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.inventory_service import batch_from_db, check_inventory
+from app.services.inventory_reservations import apply_active_holds, hold_session_items, release_order_holds
+from app.services.order_session_manager import update_workflow_state
+from app.crud.reservation import purge_expired_reservations
+from app.workflows.order_item_status import OrderItemStatus
+from app.workflows.order_states import OrderState
+
+
+@pytest.fixture
+def batches(db):
+    material = Material(material_name="Cotton")
+    db.add(material)
+    db.flush()
+    db.add(InventoryBatch(
+        material_id=material.material_id, color="Red",
+        rolls_available=2, meters_per_roll=50, loose_meters_available=0
+    ))
+    db.commit()
+    return [batch_from_db(row) for row in db.query(InventoryBatch).all()]
+
+
+def _session(batch, meters, status=OrderItemStatus.NEGOTIATING):
+    item = SimpleNamespace(
+        item_id=str(uuid.uuid4()),
+        status=status,
+        fulfilled_batches=[{"batch_id": batch.batch_id, "allocated_meters": meters}]
+    )
+    return SimpleNamespace(order_id=str(uuid.uuid4()), items=[item])
+
+
+def _check(db, batches, order_id):
+    item = TextileMeasurement(
+        material_name="cotton", color="red", input_quantity=100, input_unit="meter", normalized_meters=100
+    )
+    return check_inventory(item, apply_active_holds(db, batches, order_id), "red")
+
+
+def test_holds_reduce_availability_for_other_orders_only(db, batches):
+    first = _session(batches[0], 100)
+    hold_session_items(db, first)
+    db.commit()
+
+    assert _check(db, batches, first.order_id)["status"] == "FULL_AVAILABLE"
+    assert _check(db, batches, str(uuid.uuid4()))["status"] == "OUT_OF_STOCK"
+
+    release_order_holds(db, first.order_id)
+    db.commit()
+
+    assert _check(db, batches, str(uuid.uuid4()))["status"] == "FULL_AVAILABLE"
+
+
+def test_cancelled_items_and_expired_holds_are_not_counted(db, batches):
+    cancelled = _session(batches[0], 60, status=OrderItemStatus.CANCELLED)
+    assert hold_session_items(db, cancelled) == 0
+
+    db.add(InventoryReservation(
+        batch_id=uuid.UUID(batches[0].batch_id),
+        order_id=uuid.uuid4(),
+        session_item_id=uuid.uuid4(),
+        meters=60,
+        expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+    ))
+    db.commit()
+
+    result = _check(db, batches, str(uuid.uuid4()))
+    assert result["status"] == "FULL_AVAILABLE"
+    assert result["available_meters"] == 100
+
+
+def test_holds_outlive_the_ttl_while_awaiting_the_owner(db, batches, monkeypatch):
+    # Every hold refreshed with a TTL is already expired
+    monkeypatch.setenv("INVENTORY_RESERVATION_TTL_MINUTES", "-1")
+
+    order_id = uuid.uuid4()
+    db.add(Order(order_id=order_id, customer_phone="919900000001"))
+    db.add(OrderSessionDB(order_id=order_id, customer_phone="919900000001", workflow_state="negotiation"))
+    db.add(OrderSessionItemDB(
+        order_id=order_id, material_name="Cotton", color="Red",
+        input_quantity=100, input_unit="meter", normalized_meters=100,
+        status=OrderItemStatus.ACCEPTED.value,
+        fulfilled_batches=[{"batch_id": batches[0].batch_id, "allocated_meters": 100}]
+    ))
+    db.flush()
+
+    session = SimpleNamespace(order_id=str(order_id), items=[SimpleNamespace(
+        item_id=str(uuid.uuid4()), status=OrderItemStatus.ACCEPTED,
+        fulfilled_batches=[{"batch_id": batches[0].batch_id, "allocated_meters": 100}]
+    )])
+    hold_session_items(db, session)
+    db.commit()
+    assert _check(db, batches, str(uuid.uuid4()))["status"] == "FULL_AVAILABLE"  # expired
+
+    update_workflow_state(db, order_id, OrderState.WAITING_OWNER_CONFIRMATION)
+    db.commit()
+    purge_expired_reservations(db)
+    db.commit()
+
+    # Still held for the owner — another order cannot take the stock
+    assert _check(db, batches, str(uuid.uuid4()))["status"] == "OUT_OF_STOCK"
+
+    update_workflow_state(db, order_id, OrderState.ORDER_REJECTED)
+    db.commit()
+
+    assert db.query(InventoryReservation).count() == 0
+    assert _check(db, batches, str(uuid.uuid4()))["status"] == "FULL_AVAILABLE"
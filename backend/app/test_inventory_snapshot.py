@@ -0,0 +1,119 @@
+import pytest
+
+from app.models.inventory import InventoryBatch
+from app.models.material import Material
+from app.services import inventory_snapshot as snapshot_module
+from app.services.inventory_snapshot import InventorySnapshot
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot(monkeypatch):
+    # Fresh module-level snapshot (session events write to it)
+    monkeypatch.setattr(snapshot_module, "inventory_snapshot", InventorySnapshot())
+
+
+def _add_batch(db, material_name="Cotton", color="red", rolls=2):
+    material = db.query(Material).filter_by(material_name=material_name).first()
+    if not material:
+        material = Material(material_name=material_name)
+        db.add(material)
+        db.flush()
+
+    batch = InventoryBatch(
+        material_id=material.material_id,
+        color=color,
+        rolls_available=rolls,
+        meters_per_roll=50,
+        loose_meters_available=0
+    )
+    db.add(batch)
+    db.commit()
+    return batch
+
+
+def test_committed_batch_changes_refresh_only_those_rows(db):
+    batch = _add_batch(db)
+    _add_batch(db, color="blue")
+
+    assert len(snapshot_module.inventory_snapshot.get_batches(db)) == 2
+    version = snapshot_module.inventory_snapshot.version
+
+    batch.rolls_available = 1
+    db.commit()
+
+    batches = {b.color: b for b in snapshot_module.inventory_snapshot.get_batches(db)}
+    stats = snapshot_module.inventory_snapshot.stats()
+
+    assert batches["red"].rolls_available == 1
+    assert snapshot_module.inventory_snapshot.version == version + 1
+    assert stats["full_loads"] == 1
+    assert stats["incremental_refreshes"] == 1
+
+
+def test_rolled_back_changes_are_ignored(db):
+    batch = _add_batch(db)
+    snapshot_module.inventory_snapshot.get_batches(db)
+
+    batch.rolls_available = 0
+    db.flush()
+    db.rollback()
+
+    assert snapshot_module.inventory_snapshot.stats()["pending_changes"] == 0
+
+
+def test_material_rename_forces_full_reload(db):
+    _add_batch(db)
+    snapshot_module.inventory_snapshot.get_batches(db)
+
+    material = db.query(Material).first()
+    material.material_name = "Organic Cotton"
+    db.commit()
+
+    assert snapshot_module.inventory_snapshot.get_batches(db)[0].material_name == "Organic Cotton"
+    assert snapshot_module.inventory_snapshot.stats()["full_loads"] == 2
+
+
+def test_snapshot_disabled_loads_only_the_items_inventory(db, monkeypatch):
+    from types import SimpleNamespace
+    from app.services.inventory_snapshot import get_inventory_batches_for_items
+
+    monkeypatch.setenv("INVENTORY_SNAPSHOT_ENABLED", "false")
+    _add_batch(db, "Cotton", "Red")
+    _add_batch(db, "Cotton", "Blue")
+    _add_batch(db, "Silk", "red")
+    _add_batch(db, "Silk", "Green")
+    _add_batch(db, "Cotton", "Pink", rolls=0)
+
+    items = [SimpleNamespace(material_name="COTTON", color="red")]
+    batches = get_inventory_batches_for_items(db, items)
+
+    # Same material or same color, in stock only
+    assert sorted((b.material_name, b.color) for b in batches) == [
+        ("Cotton", "Blue"), ("Cotton", "Red"), ("Silk", "red")
+    ]
+    assert [b.color for b in batches.matching("cotton", "RED")] == ["Red"]
+    assert snapshot_module.inventory_snapshot.loaded is False
+
+
+def test_process_cache_rebuilds_after_commit_not_rollback(db):
+    from app.services.cache_invalidation import ProcessCache
+
+    builds = []
+    cache = ProcessCache(
+        "test_material_names", [Material],
+        lambda session: builds.append(1) or sorted(m.material_name for m in session.query(Material)),
+        lambda: 300
+    )
+
+    _add_batch(db)
+    assert cache.get(db) == ["Cotton"]
+    assert cache.get(db) == ["Cotton"] and len(builds) == 1
+
+    db.add(Material(material_name="Silk"))
+    db.flush()
+    db.rollback()
+    assert cache.get(db) == ["Cotton"] and len(builds) == 1
+
+    db.add(Material(material_name="Silk"))
+    db.commit()
+    assert cache.get(db) == ["Cotton", "Silk"] and len(builds) == 2
@@ -0,0 +1,97 @@
+import pytest
+
+from app.services.local_intent_model import (
+    SEED_EXAMPLES,
+    char_wb_ngrams,
+    export_intent_model,
+    score_intents,
+    train_intent_model
+)
+
+sklearn = pytest.importorskip("sklearn")
+
+
+def _seed_model():
+    texts = [text for text, _ in SEED_EXAMPLES]
+    labels = [label for _, label in SEED_EXAMPLES]
+    return train_intent_model(texts, labels)
+
+
+def test_ngrams_match_sklearn_char_wb():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    analyzer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4)).build_analyzer()
+    text = "50m  red cotton bhej do ?"
+    assert char_wb_ngrams(text, 2, 4) == analyzer(text)
+
+
+def test_exported_model_matches_sklearn_probabilities():
+    model = _seed_model()
+    exported = export_intent_model(model)
+
+    for message in ["50 meter blue cotton chahiye", "namaste ji", "rate kya hai", "zzz"]:
+        expected = model.predict_proba([message])[0]
+        scores = score_intents(exported, message)
+        for cls, prob in zip(model.classes_, expected):
+            assert scores[cls] == pytest.approx(prob, abs=1e-6)
+
+
+def test_binary_export_matches_sklearn():
+    model = train_intent_model(["hello", "hi", "50m red cotton", "3 roll silk"],
+                               ["greeting", "greeting", "order", "order"])
+    exported = export_intent_model(model)
+
+    expected = model.predict_proba(["20m cotton"])[0]
+    scores = score_intents(exported, "20m cotton")
+    for cls, prob in zip(model.classes_, expected):
+        assert scores[cls] == pytest.approx(prob, abs=1e-6)
+
+
+def test_shipped_model_loads():
+    import json
+    from app.services.local_intent_model import INTENTS, MODEL_PATH
+
+    with open(MODEL_PATH) as file:
+        model = json.load(file)
+
+    assert set(model["classes"]) <= set(INTENTS)
+    assert set(score_intents(model, "50m red cotton")) == set(model["classes"])
+
+
+def test_general_query_goes_to_llm(monkeypatch):
+    from types import SimpleNamespace
+    from app.services import intent_classifier
+
+    llm_calls = []
+
+    def fake_get_llm(tier="lite"):
+        llm_calls.append(tier)
+        reply = '{"intent": "general_query", "reply": "Cotton ₹120/m hai."}'
+        return SimpleNamespace(invoke=lambda prompt: SimpleNamespace(content=reply))
+
+    monkeypatch.setattr(intent_classifier, "get_llm", fake_get_llm)
+
+    monkeypatch.setattr(intent_classifier, "predict_intent", lambda message: ("greeting", 0.99))
+    assert intent_classifier.classify_message_intent("namaste")["source"] == "local"
+    assert llm_calls == []
+
+    monkeypatch.setattr(intent_classifier, "predict_intent", lambda message: ("general_query", 0.99))
+    result = intent_classifier.classify_message_intent("cotton ka rate kya hai?")
+    assert result["source"] == "llm"
+    assert result["reply"] == "Cotton ₹120/m hai."
+
+
+def test_shipped_model_answers_common_intents_without_llm(monkeypatch):
+    from app.services import intent_classifier, local_intent_model
+
+    def no_llm(tier="lite"):
+        raise AssertionError("LLM called for a common intent")
+
+    monkeypatch.setattr(intent_classifier, "get_llm", no_llm)
+    local_intent_model.reload_intent_model()
+
+    for message, intent in [("25m red cotton bhejo", "order"), ("namaste ji", "greeting"), ("menu", "help")]:
+        result = intent_classifier.classify_message_intent(message)
+        assert (result["intent"], result["source"]) == (intent, "local")
+
+    local_intent_model.reload_intent_model()
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import Future
+
+from app.services.media_batcher import MediaBatcher
+
+
+def _collect():
+    flushed = []
+    done = threading.Event()
+
+    def on_flush(phone, media, captions):
+        flushed.append((phone, [m["id"] for m in media], captions))
+        done.set()
+
+    return flushed, done, on_flush
+
+
+def test_album_images_flush_as_one_batch(monkeypatch):
+    monkeypatch.setenv("MEDIA_BATCH_WINDOW_SECONDS", "0.1")
+    batcher = MediaBatcher()
+    flushed, done, on_flush = _collect()
+
+    batcher.add("91999", {"id": "img1"}, "page 1", on_flush)
+    batcher.add("91999", {"id": "img2"}, None, on_flush)
+    batcher.add("91999", {"id": "img3"}, "page 3", on_flush)
+
+    assert done.wait(2)
+    assert flushed == [("91999", ["img1", "img2", "img3"], ["page 1", "page 3"])]
+    assert batcher.pending("91999") == 0
+
+
+def test_max_images_flushes_immediately(monkeypatch):
+    monkeypatch.setenv("MEDIA_BATCH_WINDOW_SECONDS", "60")
+    monkeypatch.setenv("MEDIA_BATCH_MAX_IMAGES", "2")
+    batcher = MediaBatcher()
+    flushed, done, on_flush = _collect()
+
+    batcher.add("91999", {"id": "img1"}, None, on_flush)
+    batcher.add("91999", {"id": "img2"}, None, on_flush)
+
+    assert done.wait(2)
+    assert flushed[0][1] == ["img1", "img2"]
+
+
+def test_batcher_takes_ownership_of_prefetch(monkeypatch):
+    monkeypatch.setenv("MEDIA_BATCH_WINDOW_SECONDS", "60")
+    batcher = MediaBatcher()
+    future = Future()
+    media_info = {"id": "img1", "prefetch": future}
+
+    batcher.add("91999", media_info, None, lambda *args: None)
+
+    # Webhook must no longer release it; the queued copy keeps it
+    assert "prefetch" not in media_info
+    assert batcher._batches["91999"].media[0]["prefetch"] is future
+    batcher._batches["91999"].timer.cancel()
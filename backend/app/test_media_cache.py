@@ -0,0 +1,49 @@
+import time
+
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.media_cache import (
+    MediaResultCache,
+    cache_items,
+    get_cached_items,
+    hash_media,
+    prompt_version
+)
+
+
+def test_lru_evicts_oldest_entry():
+    cache = MediaResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")          # "a" is now most recent
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_expired_entries_are_misses():
+    cache = MediaResultCache(ttl_seconds=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_prompt_change_changes_key():
+    assert prompt_version("prompt v1", "gemini-2.5-flash") != prompt_version("prompt v2", "gemini-2.5-flash")
+    assert prompt_version("p", "m", None) == prompt_version("p", "m", "")
+
+
+def test_cached_items_are_independent_copies():
+    media_hash = hash_media(b"same fabric photo")
+    item = TextileMeasurement(material_name="cotton", color="red",
+                              input_quantity=50, input_unit="meter", normalized_meters=50)
+    cache_items(media_hash, "v1", [item])
+
+    first = get_cached_items(media_hash, "v1")
+    first[0].color = "blue"
+
+    assert get_cached_items(media_hash, "v1")[0].color == "red"
+    assert get_cached_items(media_hash, "v2") is None
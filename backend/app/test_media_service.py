@@ -0,0 +1,137 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.media_service import (
+    MediaRejectedError,
+    download_whatsapp_media,
+    get_media,
+    prefetch_whatsapp_media,
+    release_prefetched_media
+)
+
+
+def _metadata(mime_type="image/jpeg", file_size=None):
+    response = MagicMock()
+    response.json.return_value = {
+        "url": "https://cdn.example/media",
+        "mime_type": mime_type,
+        "file_size": file_size,
+    }
+    return response
+
+
+def _body(chunks, content_length=None):
+    response = MagicMock()
+    response.headers = {"Content-Length": content_length} if content_length else {}
+    response.iter_content.return_value = iter(chunks)
+    response.__enter__.return_value = response
+    return response
+
+
+@pytest.fixture(autouse=True)
+def media_env(monkeypatch):
+    monkeypatch.setenv("WHATSAPP_TOKEN", "test-token")
+    monkeypatch.setenv("MEDIA_MAX_BYTES", "10")
+
+
+def test_download_streams_into_file_handle():
+    with patch("app.services.media_service.requests.get") as get:
+        get.side_effect = [_metadata(), _body([b"abc", b"def"])]
+        media_file, mime_type = download_whatsapp_media("m1")
+
+    assert mime_type == "image/jpeg"
+    assert media_file.read() == b"abcdef"
+    media_file.close()
+
+
+def test_unsupported_type_rejected_before_body_download():
+    with patch("app.services.media_service.requests.get") as get:
+        get.side_effect = [_metadata(mime_type="application/pdf")]
+
+        with pytest.raises(MediaRejectedError) as error:
+            download_whatsapp_media("m1")
+
+    assert error.value.reason == "unsupported_type"
+    assert get.call_count == 1
+
+
+def test_declared_size_over_cap_rejected_before_body_download():
+    with patch("app.services.media_service.requests.get") as get:
+        get.side_effect = [_metadata(file_size=11)]
+
+        with pytest.raises(MediaRejectedError) as error:
+            download_whatsapp_media("m1")
+
+    assert error.value.reason == "too_large"
+    assert get.call_count == 1
+
+
+def test_stream_aborted_once_cap_exceeded():
+    body = _body([b"123456", b"789012", b"never read"])
+
+    with patch("app.services.media_service.requests.get") as get:
+        get.side_effect = [_metadata(), body]
+
+        with pytest.raises(MediaRejectedError):
+            download_whatsapp_media("m1")
+
+    # Third chunk was never consumed
+    assert next(body.iter_content.return_value) == b"never read"
+
+
+def test_get_media_uses_prefetched_download():
+    media_file = io.BytesIO(b"abc")
+
+    with patch("app.services.media_service.download_whatsapp_media") as download:
+        download.return_value = (media_file, "image/jpeg")
+        future = prefetch_whatsapp_media("m1")
+        result = get_media({"id": "m1", "prefetch": future})
+
+    assert result == (media_file, "image/jpeg")
+    assert download.call_count == 1
+
+
+def test_prefetch_errors_surface_in_handler():
+    with patch("app.services.media_service.download_whatsapp_media") as download:
+        download.side_effect = MediaRejectedError("too_large", "too big")
+        future = prefetch_whatsapp_media("m1")
+
+        with pytest.raises(MediaRejectedError):
+            get_media({"id": "m1", "prefetch": future})
+
+
+def test_release_closes_unconsumed_prefetch():
+    media_file = io.BytesIO(b"abc")
+
+    with patch("app.services.media_service.download_whatsapp_media") as download:
+        download.return_value = (media_file, "image/jpeg")
+        future = prefetch_whatsapp_media("m1")
+        future.result()
+        release_prefetched_media(future)
+
+    assert media_file.closed
+
+
+def test_webhook_retry_of_a_stored_message_skips_the_download(db):
+    import asyncio
+    from app import main
+    from app.models.message import Message
+
+    db.add(Message(message_id="wamid.1", phone_number="919900000001", direction="incoming",
+                   content="[Voice Note]", message_type="audio"))
+    db.commit()
+
+    body = {"entry": [{"changes": [{"value": {"messages": [{
+        "from": "919900000001", "id": "wamid.1", "type": "audio",
+        "audio": {"id": "media-1", "mime_type": "audio/ogg"},
+    }]}}]}]}
+    request = MagicMock()
+    request.json.return_value = asyncio.sleep(0, result=body)
+
+    with patch.object(main, "SessionLocal", return_value=db), \
+         patch.object(main, "prefetch_whatsapp_media") as prefetch:
+        assert asyncio.run(main.receive_message(request)) == {"status": "duplicate"}
+
+    assert prefetch.call_count == 0
@@ -1,4 +1,4 @@
-
+import io
 import pytest
 from unittest.mock import MagicMock, patch
 from app.router.message_router import route_message
@@ -59,14 +59,16 @@ def test_text_message_routing(mock_db, mock_process_order, mock_inventory, mock_
     assert kwargs.get("pre_extracted_items") is None
 
 
-def test_image_message_routing(mock_db, mock_download, mock_image_extract, mock_process_order, mock_inventory, mock_session_check):
+def test_image_message_routing(mock_db, mock_download, mock_image_extract, mock_process_order, mock_inventory, mock_session_check, monkeypatch):
     """Verify image message triggers download and extraction"""
+    monkeypatch.setenv("MEDIA_BATCH_WINDOW_SECONDS", "0")  # no album batching
     phone = "1234567890"
     message = "Caption"
     media_info = {"type": "image", "id": "MEDIA_ID", "mime_type": "image/jpeg"}
     
     # Setup mocks
-    mock_download.return_value = (b"fake_image_bytes", "image/jpeg")
+    media_file = io.BytesIO(b"fake_image_bytes")
+    mock_download.return_value = (media_file, "image/jpeg")
     mock_items = [TextileMeasurement(material_name="Cotton", input_quantity=10, input_unit="m", normalized_meters=10)]
     mock_image_extract.return_value = mock_items
     mock_process_order.return_value = {"responses": [{"response": {"message": "Order processed"}}]}
@@ -75,7 +77,7 @@ def test_image_message_routing(mock_db, mock_download, mock_image_extract, mock_
     
     # Checks
     mock_download.assert_called_with("MEDIA_ID")
-    mock_image_extract.assert_called_with(b"fake_image_bytes", "image/jpeg", caption="Caption")
+    mock_image_extract.assert_called_with(media_file, "image/jpeg", caption="Caption")
     
     # Verify items passed to order processing
     _, kwargs = mock_process_order.call_args
@@ -93,16 +95,17 @@ def test_voice_message_routing(mock_db, mock_download, mock_voice_extract, mock_
     media_info = {"type": "audio", "id": "AUDIO_ID", "mime_type": "audio/ogg"}
     
     # Setup mocks
-    mock_download.return_value = (b"fake_audio_bytes", "audio/ogg")
+    media_file = io.BytesIO(b"fake_audio_bytes")
+    mock_download.return_value = (media_file, "audio/ogg")
     mock_items = [TextileMeasurement(material_name="Silk", input_quantity=5, input_unit="m", normalized_meters=5)]
-    mock_voice_extract.return_value = mock_items
+    mock_voice_extract.return_value = (mock_items, "5 meter silk")
     mock_process_order.return_value = {"responses": [{"response": {"message": "Order processed"}}]}
     
     response = route_message(phone, message, media_info)
     
     # Checks
     mock_download.assert_called_with("AUDIO_ID")
-    mock_voice_extract.assert_called_with(b"fake_audio_bytes", "audio/ogg")
+    mock_voice_extract.assert_called_with(media_file, "audio/ogg")
     
     # Verify items passed to order processing
     _, kwargs = mock_process_order.call_args
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.conftest import inventory_row
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.media_working_set import (
+    get_working_set,
+    refresh_candidate_batches,
+    start_working_set,
+    update_working_set_items
+)
+
+
+def _item(material):
+    return TextileMeasurement(material_name=material, color="red", input_quantity=10, input_unit="meter", normalized_meters=10)
+
+
+def _fake_loader(db, materials):
+    return [inventory_row("b-" + material.title(), material.title(), "red", rolls=2) for material in materials]
+
+
+@pytest.fixture(autouse=True)
+def no_snapshot(monkeypatch):
+    # Exercise the direct DB path (loader patched below)
+    monkeypatch.setenv("INVENTORY_SNAPSHOT_ENABLED", "false")
+
+
+def test_edit_only_loads_new_materials():
+    with patch("app.crud.inventory.get_batches_for_materials", side_effect=_fake_loader) as loader:
+        working_set = start_working_set(None, "order-1", [_item("Cotton")], context="50m laal cotton")
+        update_working_set_items(None, working_set, [_item("Cotton"), _item("Silk")])
+
+    assert loader.call_args_list[0][0][1] == {"cotton"}
+    assert loader.call_args_list[1][0][1] == {"silk"}      # delta only
+    assert set(working_set.shortlist) == {"cotton", "silk"}
+    assert get_working_set("order-1").context == "50m laal cotton"
+
+
+def test_confirm_refreshes_only_shortlisted_materials():
+    with patch("app.crud.inventory.get_batches_for_materials", side_effect=_fake_loader) as loader:
+        working_set = start_working_set(None, "order-2", [_item("Cotton"), _item("unknown")])
+        batches = refresh_candidate_batches(None, working_set)
+
+    assert loader.call_args[0][1] == {"cotton"}
+    assert [batch.batch_id for batch in batches] == ["b-Cotton"]
@@ -0,0 +1,58 @@
+from app.services.model_router import (
+    get_model_name,
+    score_message_complexity,
+    select_model_tier
+)
+
+
+def test_simple_order_uses_lite_tier():
+    assert select_model_tier("50m red cotton") == "lite"
+
+
+def test_multi_item_order_scores_higher():
+    simple = score_message_complexity("50m red cotton")
+    multi = score_message_complexity("50m red cotton, 20m blue silk aur 10m green rayon")
+    assert multi > simple
+
+
+def test_edit_message_moves_up_a_tier():
+    assert select_model_tier("cotton nahi silk chahiye, 50 ki jagah 100 meter") != "lite"
+
+
+def test_media_never_uses_lite_tier():
+    assert select_model_tier(None, media_type="image") == "standard"
+    assert select_model_tier(None, media_type="audio") == "standard"
+
+
+def test_complex_album_goes_to_pro():
+    caption = "ye list dekho, 50m red cotton aur 20m blue silk, green wala cancel karo"
+    assert select_model_tier(caption, media_type="image", media_count=3) == "pro"
+
+
+def test_env_overrides(monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL_LITE", "custom-lite")
+    monkeypatch.setenv("GEMINI_FORCE_TIER", "pro")
+    assert get_model_name("lite") == "custom-lite"
+    assert select_model_tier("50m red cotton") == "pro"
+
+
+def test_short_reply_on_large_order_uses_lite_tier(monkeypatch):
+    from types import SimpleNamespace
+    from app.schemas.measurement_schema import TextileMeasurement
+    from app.services import customer_reply_llm_service
+
+    tiers = []
+
+    def fake_get_llm(tier="lite"):
+        tiers.append(tier)
+        return SimpleNamespace(invoke=lambda prompt: SimpleNamespace(content='{"item_decisions": []}'))
+
+    monkeypatch.setattr(customer_reply_llm_service, "get_llm", fake_get_llm)
+
+    items = [
+        TextileMeasurement(material_name=name, color="Red", input_quantity=10, input_unit="meter", normalized_meters=10)
+        for name in ["Cotton", "Silk", "Rayon", "Linen", "Georgette"]
+    ]
+    customer_reply_llm_service.classify_customer_reply("haan", items)
+
+    assert tiers == ["lite"]
@@ -0,0 +1,34 @@
+from app.conftest import inventory_batch as _batch
+from app.services.inventory_index import InventoryIndex
+from app.services.similarity_graph import SimilarityGraph, color_family
+
+
+CATALOG = [
+    ("Cotton", "Cotton", 150),
+    ("Poplin", "Cotton", 160),
+    ("Silk", "Silk", 900),
+]
+
+
+def test_color_families():
+    assert color_family("Navy") == color_family("sky blue") == "blue"
+    assert color_family("dark maroon") == "red"
+    assert color_family("tartan") is None
+
+
+def test_alternatives_rank_by_material_and_color_closeness():
+    index = InventoryIndex([
+        _batch("b1", "Cotton", "Navy", rolls=0),     # requested, out of stock
+        _batch("b2", "Cotton", "Blue", rolls=2),
+        _batch("b3", "Cotton", "Yellow"),
+        _batch("b4", "Poplin", "Navy"),
+        _batch("b5", "Silk", "Navy"),
+        _batch("b6", "Silk", "Red"),                 # other material, unrelated color
+    ])
+
+    alternatives = SimilarityGraph(CATALOG).alternatives(index, "cotton", "navy", limit=5)
+
+    assert [(a["material"], a["color"]) for a in alternatives] == [
+        ("Poplin", "Navy"), ("Cotton", "Blue"), ("Silk", "Navy"), ("Cotton", "Yellow")
+    ]
+    assert alternatives[1]["available_meters"] == 100
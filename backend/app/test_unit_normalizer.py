@@ -0,0 +1,83 @@
+from app.conftest import inventory_batch
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.inventory_index import InventoryIndex
+from app.services.unit_normalizer import normalize_quantities, build_quantity_question
+
+
+def _batch(batch_id, color, meters_per_roll, rolls):
+    return inventory_batch(batch_id, color=color, meters_per_roll=meters_per_roll, rolls=rolls)
+
+
+INDEX = InventoryIndex([
+    _batch("b1", "Red", 40, 10),
+    _batch("b2", "Blue", 40, 2),
+    _batch("b3", "Blue", 50, 6),
+    _batch("b4", "Green", 40, 3),
+    _batch("b5", "Green", 50, 3),
+])
+
+
+def _item(color, quantity, unit, meters=None):
+    return TextileMeasurement(
+        material_name="cotton", color=color, input_quantity=quantity, input_unit=unit, normalized_meters=meters
+    )
+
+
+def test_rolls_gaj_and_meters_become_meters():
+    items = normalize_quantities([
+        _item("red", 3, "than"),            # one roll length in stock
+        _item("blue", 4, "roll"),           # only the 50m rolls have 4 whole rolls
+        _item("red", 10, "gaj"),
+        _item("red", 25, "mtr"),
+        _item("red", 2, "roll", meters=90),  # roll length given in the message
+    ], INDEX)
+
+    assert [item.normalized_meters for item in items] == [120, 200, 9.14, 25, 90]
+    assert items[0].input_unit == "roll"
+
+
+def test_ambiguous_roll_sizes_stay_unknown_and_are_asked_for():
+    item = _item("green", 2, "roll")
+    normalize_quantities([item], INDEX)
+
+    assert item.normalized_meters is None
+    assert "40m / 50m" in build_quantity_question(item, INDEX)
+
+
+def test_unknown_meters_are_never_accepted_or_summarised_as_meters(monkeypatch):
+    from types import SimpleNamespace
+    from app.schemas.order_item_schema import OrderItem
+    from app.services import order_update_service
+    from app.services.inventory_service import check_inventory
+    from app.services.negotiation_handler_service import build_final_summary
+    from app.workflows.customer_decisions import CustomerDecision
+    from app.workflows.order_item_status import OrderItemStatus
+
+    monkeypatch.setattr(order_update_service, "resolve_measurements", lambda db, items: items)
+
+    # 3 rolls of green: 40m and 50m rolls both have 3 in stock → meters unknown
+    item = OrderItem(measurement=normalize_quantities([_item("green", 3, "roll")], INDEX)[0])
+    session = SimpleNamespace(items=[item], available_batches=INDEX)
+    assert check_inventory(item.measurement, INDEX, "green")["status"] == "QUANTITY_NEEDED"
+
+    # Re-checked by an edit that gives no quantity
+    order_update_service.apply_customer_decisions(None, session, {"item_decisions": [{
+        "material": "cotton", "decision": CustomerDecision.EDIT_ITEM, "new_color": "Green"
+    }]})
+    edited = session.items[-1]
+    assert (edited.inventory_status, edited.status, edited.fulfilled_batches) == (
+        "QUANTITY_NEEDED", OrderItemStatus.NEGOTIATING, []
+    )
+
+    # "Jo available hai bhej do" cannot accept it either
+    order_update_service.apply_customer_decisions(None, session, {"item_decisions": [{
+        "material": "cotton", "decision": CustomerDecision.ACCEPT_AVAILABLE
+    }]})
+    assert edited.status == OrderItemStatus.NEGOTIATING
+    assert not order_update_service.all_items_resolved(session)
+    assert order_update_service.items_missing_quantity(session) == [edited]
+
+    # Even if it ends up accepted, rolls are not shown as meters
+    edited.status = OrderItemStatus.ACCEPTED
+    assert "3 roll (meter pending)" in build_final_summary(session)
+    assert "3.0m" not in build_final_summary(session)
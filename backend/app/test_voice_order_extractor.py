@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock, patch
+
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.media_cache import extraction_cache, transcript_cache
+from app.services.voice_order_extractor import extract_order_from_voice
+
+
+def test_voice_note_transcribed_once_then_parsed_as_text():
+    extraction_cache.clear()
+    transcript_cache.clear()
+
+    model = MagicMock()
+    model.generate_content.return_value.text = "50 meter laal cotton bhejo"
+    items = [TextileMeasurement(material_name="Cotton", color="red", input_quantity=50, input_unit="meter", normalized_meters=50)]
+
+    with patch("app.services.voice_order_extractor.get_gemini_audio_model", return_value=model), \
+         patch("app.services.voice_order_extractor.extract_textile_order", return_value=items) as extract:
+
+        first_items, transcript = extract_order_from_voice(b"forwarded voice note", "audio/ogg")
+        second_items, _ = extract_order_from_voice(b"forwarded voice note", "audio/ogg")
+
+    assert transcript == "50 meter laal cotton bhejo"
+    assert extract.call_args[0][0] == transcript
+    assert first_items[0].material_name == second_items[0].material_name == "Cotton"
+
+    # Forwarded copy: no second audio call, no second text extraction
+    assert model.generate_content.call_count == 1
+    assert extract.call_count == 1
+
+
+def test_voice_note_without_items_is_not_parsed_again():
+    from app.router import message_router
+
+    with patch("app.services.intent_classifier.classify_message_intent", return_value={"intent": "order"}), \
+         patch.object(message_router, "process_customer_order") as process:
+
+        reply = message_router._handle_text_order(None, "919900000001", "haan woh wala", pre_extracted_items=[])
+
+    # Transcript already parsed to no items — no second extraction
+    assert reply == message_router.NO_MEDIA_ITEMS_REPLY
+    assert process.call_count == 0
@@ -0,0 +1,124 @@
+"""
+Benchmark: batch allocation strategies vs the old first-fit.
+
+For random orders against random (material, color) stock — mixed roll
+lengths, some loose fragments, random batch ages — reports per strategy:
+rolls opened, loose meters created (fragmentation), batches touched and
+solve time.
+
+Usage (from backend/):
+    python bench_allocation.py
+    python bench_allocation.py --orders 2000 --batches 3 40
+No DB or API keys needed.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.schemas.inventory_schema import InventoryBatchSchema
+from app.services.allocation_engine import STRATEGIES, allocate
+
+
+ROLL_LENGTHS = [25, 40, 50, 60, 100]
+
+
+def make_stock(rng, batch_range):
+    start = datetime(2024, 1, 1)
+    return [
+        InventoryBatchSchema(
+            batch_id=f"b{i}",
+            material_id="m",
+            material_name="Cotton",
+            color="Red",
+            rolls_available=rng.randint(0, 8),
+            meters_per_roll=rng.choice(ROLL_LENGTHS),
+            loose_meters_available=rng.choice([0, 0, 0, 7.5, 12, 30]),
+            created_at=start + timedelta(days=rng.randint(0, 365))
+        )
+        for i in range(rng.randint(*batch_range))
+    ]
+
+
+def first_fit(batches, required):
+    """Previous check_inventory behaviour, in the same plan terms."""
+    remaining = required
+    rolls_opened = 0
+    loose_created = 0.0
+    touched = 0
+
+    for batch in batches:
+        if remaining <= 0:
+            break
+        total = batch.rolls_available * batch.meters_per_roll + batch.loose_meters_available
+        meters = min(total, remaining)
+        if meters <= 0:
+            continue
+        touched += 1
+        from_rolls = max(meters - batch.loose_meters_available, 0)
+        rolls = -(-from_rolls // batch.meters_per_roll) if from_rolls else 0
+        rolls_opened += rolls
+        loose_created += rolls * batch.meters_per_roll - from_rolls
+        remaining -= meters
+
+    return rolls_opened, loose_created, touched
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--batches", type=int, nargs=2, default=[2, 25], metavar=("MIN", "MAX"))
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cases = []
+    for _ in range(args.orders):
+        stock = make_stock(rng, args.batches)
+        cases.append((stock, rng.choice([10, 35, 50, 80, 120, 175, 250, 400])))
+
+    results = {"first_fit": []}
+    for stock, required in cases:
+        start = time.perf_counter()
+        rolls, loose, touched = first_fit(stock, required)
+        results["first_fit"].append((int(rolls), loose, touched, (time.perf_counter() - start) * 1000))
+
+    not_optimal = {}
+    for strategy in STRATEGIES:
+        results[strategy] = []
+        not_optimal[strategy] = 0
+        for stock, required in cases:
+            allocation = allocate(stock, required, strategy=strategy)
+            results[strategy].append((
+                allocation.rolls_opened,
+                allocation.loose_created,
+                len(allocation.fulfilled_batches),
+                allocation.solve_ms
+            ))
+            not_optimal[strategy] += not allocation.optimal
+
+    print(f"{args.orders} orders, {args.batches[0]}-{args.batches[1]} batches per item\n")
+    print(f"{'strategy':<12}{'rolls opened':>14}{'loose created m':>17}{'batches':>9}{'p50 ms':>9}{'p99 ms':>9}{'budget hit':>12}")
+
+    for strategy in ["first_fit", *STRATEGIES]:
+        rows = results[strategy]
+        solve = sorted(row[3] for row in rows)
+        p99 = solve[int(len(solve) * 0.99) - 1]
+        print(
+            f"{strategy:<12}"
+            f"{sum(r[0] for r in rows):>14}"
+            f"{sum(r[1] for r in rows):>17.0f}"
+            f"{statistics.mean(r[2] for r in rows):>9.2f}"
+            f"{statistics.median(solve):>9.3f}"
+            f"{p99:>9.3f}"
+            f"{not_optimal.get(strategy, 0):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
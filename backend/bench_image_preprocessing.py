@@ -0,0 +1,111 @@
+"""
+Benchmark: bytes saved and latency impact of image preprocessing.
+
+Usage (from backend/):
+    python bench_image_preprocessing.py                 # synthetic phone photos
+    python bench_image_preprocessing.py photos/*.jpg    # real samples
+    python bench_image_preprocessing.py --vision ...    # also time Gemini Vision
+                                                        # on raw vs processed
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from PIL import Image, ImageDraw
+
+from app.services.image_preprocessor import preprocess_image
+
+
+def synthetic_samples():
+    """
+    A 12 MP colour fabric-like photo and a 12 MP handwritten slip.
+    """
+    random.seed(7)
+
+    fabric = Image.new("RGB", (4000, 3000))
+    draw = ImageDraw.Draw(fabric)
+    for y in range(0, 3000, 6):
+        shade = (150 + random.randint(-40, 40), 20 + random.randint(0, 30), 30)
+        draw.rectangle([0, y, 4000, y + 6], fill=shade)
+
+    slip = Image.new("RGB", (4000, 3000), (245, 242, 235))
+    draw = ImageDraw.Draw(slip)
+    for line in range(12):
+        y = 200 + line * 220
+        for x in range(300, 3600, 40):
+            draw.line([x, y + random.randint(-20, 20), x + 30, y + random.randint(-20, 20)],
+                      fill=(30, 30, 60), width=6)
+
+    samples = []
+    for name, image in [("fabric_photo.jpg", fabric), ("handwritten_slip.jpg", slip)]:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=95)
+        samples.append((name, buffer.getvalue(), "image/jpeg"))
+
+    return samples
+
+
+def load_samples(paths):
+    samples = []
+    for path in paths:
+        with open(path, "rb") as file:
+            mime = "image/png" if path.lower().endswith(".png") else "image/jpeg"
+            samples.append((os.path.basename(path), file.read(), mime))
+    return samples
+
+
+def time_vision_call(image_bytes, mime_type):
+    from app.services.image_order_extractor import get_gemini_vision_model, load_prompt
+
+    model = get_gemini_vision_model()
+    start = time.perf_counter()
+    model.generate_content([load_prompt(), {"mime_type": mime_type, "data": image_bytes}])
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--vision", action="store_true",
+                        help="Also time Gemini Vision on raw vs processed bytes")
+    args = parser.parse_args()
+
+    samples = load_samples(args.paths) if args.paths else synthetic_samples()
+
+    print(f"{'image':<28}{'raw KB':>10}{'out KB':>10}{'saved':>8}{'prep ms':>10}{'gray':>6}")
+
+    total_raw = total_out = 0
+    for name, data, mime in samples:
+        processed, out_mime, stats = preprocess_image(data, mime)
+        total_raw += stats["original_bytes"]
+        total_out += stats["output_bytes"]
+        saved = stats["bytes_saved"] / stats["original_bytes"] if stats["original_bytes"] else 0
+
+        print(
+            f"{name[:27]:<28}{stats['original_bytes'] / 1024:>10.0f}"
+            f"{stats['output_bytes'] / 1024:>10.0f}{saved:>8.0%}"
+            f"{stats['elapsed_ms']:>10.1f}{'yes' if stats['grayscale'] else 'no':>6}"
+        )
+
+        if args.vision and os.getenv("GEMINI_API_KEY"):
+            raw_ms = time_vision_call(data, mime)
+            out_ms = time_vision_call(processed, out_mime)
+            print(f"{'':<28}vision raw {raw_ms:.0f}ms → processed {out_ms:.0f}ms "
+                  f"(+{stats['elapsed_ms']:.0f}ms preprocessing)")
+
+    if total_raw:
+        print(f"\nTotal: {total_raw / 1024:.0f}KB → {total_out / 1024:.0f}KB "
+              f"({1 - total_out / total_raw:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Microbenchmark: linear inventory scans vs the InventoryIndex lookups.
+
+Times filter_matching_batches / get_available_colors / find_alternatives
+per call on synthetic inventories of 10k and 100k batches, plus the
+one-off cost of building the index (paid on a snapshot full load) and of
+apply_changes() for a 10-batch incremental refresh.
+
+Usage (from backend/):
+    python bench_inventory_index.py
+    python bench_inventory_index.py --sizes 1000 10000 100000 --calls 200
+No DB or API keys needed.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.schemas.inventory_schema import InventoryBatchSchema
+from app.schemas.measurement_schema import TextileMeasurement
+from app.services.inventory_index import InventoryIndex
+from app.services.inventory_service import filter_matching_batches, get_available_colors
+from app.services.alternative_service import find_alternatives
+
+
+COLORS = ["Red", "Blue", "Green", "Black", "White", "Yellow", "Pink", "Sky Blue", "Maroon", "Grey"]
+
+
+# ─── Previous linear implementations (for comparison) ───
+
+def linear_filter(batches, material_name, color):
+    mat_lower = material_name.lower()
+    color_lower = color.lower()
+    return [
+        b for b in batches
+        if (b.material_name or "").lower() == mat_lower and (b.color or "").lower() == color_lower
+    ]
+
+
+def linear_colors(batches, material_name):
+    mat_lower = material_name.lower()
+    colors = set()
+    for b in batches:
+        if (b.material_name or "").lower() == mat_lower:
+            if (b.rolls_available * b.meters_per_roll) + b.loose_meters_available > 0:
+                colors.add(b.color)
+    return list(colors)
+
+
+def linear_alternatives(batches, material_name, color):
+    alternatives = []
+    for b in batches:
+        bm, bc = (b.material_name or "").lower(), (b.color or "").lower()
+        if bm == material_name.lower() and bc == color.lower():
+            continue
+        meters = b.rolls_available * b.meters_per_roll + b.loose_meters_available
+        if meters <= 0:
+            continue
+        if bm == material_name.lower():
+            alternatives.append({"material": b.material_name, "color": b.color, "priority": 1})
+        elif bc == color.lower():
+            alternatives.append({"material": b.material_name, "color": b.color, "priority": 2})
+    alternatives.sort(key=lambda x: x["priority"])
+    return alternatives[:3]
+
+
+# ─── Synthetic data ───
+
+def make_batches(count, materials):
+    rng = random.Random(42)
+    created = datetime(2024, 1, 1)
+    return [
+        InventoryBatchSchema(
+            batch_id=f"b{i}",
+            material_id=f"m{i % materials}",
+            material_name=f"Material {i % materials}",
+            color=rng.choice(COLORS),
+            rolls_available=rng.choice([0, 0, 1, 2, 5, 10]),
+            meters_per_roll=50,
+            loose_meters_available=rng.choice([0, 0, 12.5]),
+            created_at=created
+        )
+        for i in range(count)
+    ]
+
+
+def make_queries(calls, materials):
+    rng = random.Random(7)
+    return [(f"material {rng.randrange(materials)}", rng.choice(COLORS).lower()) for _ in range(calls)]
+
+
+def per_call_us(fn, queries):
+    start = time.perf_counter()
+    for material, color in queries:
+        fn(material, color)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--calls", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'batches':>8}  {'operation':<22}{'linear µs':>12}{'index µs':>12}{'speedup':>10}")
+
+    for size in args.sizes:
+        materials = max(size // 50, 1)
+        batches = make_batches(size, materials)
+        queries = make_queries(args.calls, materials)
+
+        start = time.perf_counter()
+        index = InventoryIndex(batches)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        session = SimpleNamespace(available_batches=index)
+
+        def item(material, color):
+            return SimpleNamespace(measurement=TextileMeasurement(
+                material_name=material, color=color, input_quantity=1, input_unit="meter", normalized_meters=1
+            ))
+
+        cases = [
+            ("filter_matching", lambda m, c: linear_filter(batches, m, c),
+             lambda m, c: filter_matching_batches(index, m, c)),
+            ("available_colors", lambda m, c: linear_colors(batches, m),
+             lambda m, c: get_available_colors(index, m)),
+            ("find_alternatives", lambda m, c: linear_alternatives(batches, m, c),
+             lambda m, c: find_alternatives(session, item(m, c))),
+        ]
+
+        for name, linear_fn, index_fn in cases:
+            linear_us = per_call_us(linear_fn, queries)
+            index_us = per_call_us(index_fn, queries)
+            print(f"{size:>8}  {name:<22}{linear_us:>12.1f}{index_us:>12.1f}{linear_us / index_us:>9.0f}x")
+
+        changed = [
+            batch.model_copy(update={"rolls_available": batch.rolls_available + 1})
+            for batch in batches[:10]
+        ]
+        start = time.perf_counter()
+        index.apply_changes(changed)
+        apply_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>8}  {'index build (once)':<22}{'':>12}{build_ms * 1000:>12.0f}")
+        print(f"{size:>8}  {'apply 10 changes':<22}{'':>12}{apply_ms * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
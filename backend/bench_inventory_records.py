@@ -0,0 +1,117 @@
+"""
+Microbenchmark: InventoryBatchSchema (Pydantic) vs BatchRecord (slotted
+dataclass) as the in-memory batch type of the order path.
+
+For synthetic inventories of 1k–100k batches it times converting DB-like
+rows (Decimal columns, material relationship) to each type, measures the
+memory the converted list holds (tracemalloc), and times the InventoryIndex
+build and a pass of batch_total_meters over every batch.
+
+Usage (from backend/):
+    python bench_inventory_records.py
+    python bench_inventory_records.py --sizes 1000 10000 100000
+No DB or API keys needed.
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.schemas.inventory_schema import InventoryBatchSchema
+from app.services.inventory_index import InventoryIndex, batch_total_meters
+from app.services.inventory_service import batch_from_db
+
+
+COLORS = ["Red", "Blue", "Green", "Black", "White", "Yellow", "Pink", "Sky Blue", "Maroon", "Grey"]
+
+
+def schema_from_db(batch) -> InventoryBatchSchema:
+    """The previous batch_from_db."""
+    return InventoryBatchSchema(
+        material_name=batch.material.material_name,
+        material_id=str(batch.material_id),
+        color=batch.color,
+        batch_id=str(batch.batch_id),
+        rolls_available=batch.rolls_available,
+        meters_per_roll=batch.meters_per_roll,
+        loose_meters_available=batch.loose_meters_available,
+        created_at=batch.created_at
+    )
+
+
+def make_rows(count):
+    rng = random.Random(42)
+    materials = [
+        SimpleNamespace(material_id=uuid.uuid4(), material_name=f"Material {i}")
+        for i in range(max(count // 50, 1))
+    ]
+    created = datetime(2024, 1, 1)
+
+    rows = []
+    for i in range(count):
+        material = materials[i % len(materials)]
+        rows.append(SimpleNamespace(
+            batch_id=uuid.uuid4(),
+            material_id=material.material_id,
+            material=material,
+            color=rng.choice(COLORS),
+            rolls_available=rng.choice([0, 1, 2, 5, 10]),
+            meters_per_roll=Decimal("50"),
+            loose_meters_available=Decimal(rng.choice(["0", "12.5"])),
+            created_at=created
+        ))
+    return rows
+
+
+def measure(convert, rows):
+    gc.collect()
+    start = time.perf_counter()
+    batches = [convert(row) for row in rows]
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Separate pass: tracemalloc slows allocation down
+    del batches
+    gc.collect()
+    tracemalloc.start()
+    batches = [convert(row) for row in rows]
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    InventoryIndex(batches)
+    index_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for batch in batches:
+        batch_total_meters(batch)
+    meters_ms = (time.perf_counter() - start) * 1000
+
+    return build_ms, memory_mb, index_ms, meters_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'batches':>8}  {'type':<12}{'convert ms':>12}{'memory MB':>12}{'index ms':>12}{'meters ms':>12}")
+
+    for size in args.sizes:
+        rows = make_rows(size)
+        for name, convert in [("pydantic", schema_from_db), ("BatchRecord", batch_from_db)]:
+            build_ms, memory_mb, index_ms, meters_ms = measure(convert, rows)
+            print(f"{size:>8}  {name:<12}{build_ms:>12.1f}{memory_mb:>12.1f}{index_ms:>12.1f}{meters_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
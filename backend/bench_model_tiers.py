@@ -0,0 +1,142 @@
+"""
+Benchmark: latency, accuracy and cost of each Gemini tier for text order extraction.
+
+Runs a small labelled set of customer messages through every tier, then
+reports what the complexity router would have spent by picking per message.
+
+Usage (from backend/):
+    python bench_model_tiers.py
+Requires GEMINI_API_KEY.
+"""
+
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from app.services.llm_service import get_llm
+from app.services.model_router import TIER_ORDER, get_model_name, select_model_tier
+from app.services.order_extractor import load_prompt
+
+# USD per 1M tokens (input, output) — update when pricing changes
+TIER_PRICING = {
+    "lite": (0.10, 0.40),
+    "standard": (0.30, 2.50),
+    "pro": (1.25, 10.00),
+}
+
+# (message, expected items as (material, color, meters))
+CASES = [
+    ("50m red cotton", [("cotton", "red", 50)]),
+    ("20 meter blue silk chahiye", [("silk", "blue", 20)]),
+    ("mujhe 50 meter blue silk chahiye aur 10m green cotton bhi",
+     [("silk", "blue", 50), ("cotton", "green", 10)]),
+    ("3 roll red cotton 5 meter wala aur 20 meter black polyester",
+     [("cotton", "red", 15), ("polyester", "black", 20)]),
+    ("100m white rayon, 40m pink crepe, 25m yellow muslin aur 60m black silk",
+     [("rayon", "white", 100), ("crepe", "pink", 40),
+      ("muslin", "yellow", 25), ("silk", "black", 60)]),
+    ("cotten 30 meter green wala bhejo",
+     [("cotton", "green", 30)]),
+]
+
+
+def _parse_items(raw_output: str):
+    raw_output = raw_output.strip()
+    if raw_output.startswith("```"):
+        raw_output = raw_output.split("```")[1]
+    if raw_output.startswith("json"):
+        raw_output = raw_output[4:].strip()
+
+    parsed = json.loads(raw_output)
+    return {
+        (
+            (item.get("material_name") or "").lower(),
+            (item.get("color") or "").lower(),
+            float(item.get("normalized_meters") or 0),
+        )
+        for item in parsed.get("items", [])
+    }
+
+
+def _expected_items(expected):
+    return {(m, c, float(q)) for m, c, q in expected}
+
+
+def run_case(tier: str, message: str, expected):
+    llm = get_llm(tier)
+    full_prompt = f"{load_prompt()}\n\nCustomer Message:\n{message}"
+
+    start = time.perf_counter()
+    response = llm.invoke(full_prompt)
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", len(full_prompt) // 4)
+    output_tokens = usage.get("output_tokens", len(response.content) // 4)
+
+    price_in, price_out = TIER_PRICING[tier]
+    cost = (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+    try:
+        correct = _parse_items(response.content) == _expected_items(expected)
+    except Exception:
+        correct = False
+
+    return latency_ms, correct, cost
+
+
+def main():
+    if not os.getenv("GEMINI_API_KEY"):
+        print("GEMINI_API_KEY not set. Skipping benchmark.")
+        return
+
+    results = {}
+
+    for tier in TIER_ORDER:
+        print(f"\n▶ Tier '{tier}' ({get_model_name(tier)})")
+        results[tier] = []
+
+        for message, expected in CASES:
+            try:
+                latency_ms, correct, cost = run_case(tier, message, expected)
+            except Exception as e:
+                print(f"  ✗ {message[:40]!r}: {e}")
+                latency_ms, correct, cost = 0.0, False, 0.0
+
+            results[tier].append((latency_ms, correct, cost))
+            mark = "✔" if correct else "✗"
+            print(f"  {mark} {latency_ms:7.0f} ms  ${cost:.6f}  {message[:50]}")
+
+    print("\n========== SUMMARY ==========")
+    print(f"{'tier':<10}{'avg ms':>10}{'accuracy':>10}{'cost/1k msgs':>15}")
+
+    for tier in TIER_ORDER:
+        rows = results[tier]
+        avg_ms = sum(r[0] for r in rows) / len(rows)
+        accuracy = sum(1 for r in rows if r[1]) / len(rows)
+        cost_per_k = sum(r[2] for r in rows) / len(rows) * 1000
+        print(f"{tier:<10}{avg_ms:>10.0f}{accuracy:>10.0%}{cost_per_k:>15.4f}")
+
+    # What the router would have picked per message
+    routed = [
+        results[select_model_tier(message)][i]
+        for i, (message, _) in enumerate(CASES)
+    ]
+    avg_ms = sum(r[0] for r in routed) / len(routed)
+    accuracy = sum(1 for r in routed if r[1]) / len(routed)
+    cost_per_k = sum(r[2] for r in routed) / len(routed) * 1000
+    print(f"{'routed':<10}{avg_ms:>10.0f}{accuracy:>10.0%}{cost_per_k:>15.4f}")
+
+    print("\nRouter picks:")
+    for message, _ in CASES:
+        print(f"  {select_model_tier(message):<9} {message[:60]}")
+
+
+if __name__ == "__main__":
+    main()
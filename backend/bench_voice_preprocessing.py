@@ -0,0 +1,90 @@
+"""
+Benchmark: upload size and voice-order latency before/after audio preprocessing.
+
+Usage (from backend/):
+    python bench_voice_preprocessing.py notes/*.ogg
+    python bench_voice_preprocessing.py --gemini notes/*.ogg   # also time the
+                                                              # Gemini call on
+                                                              # raw vs processed
+Requires ffmpeg for decoding; --gemini requires GEMINI_API_KEY.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.services.audio_preprocessor import VoiceNoteTooLongError, preprocess_audio
+
+
+MIME_BY_EXTENSION = {
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".amr": "audio/amr",
+}
+
+
+def time_gemini_call(audio_bytes, mime_type):
+    from app.services.voice_order_extractor import get_gemini_audio_model, load_prompt
+
+    model = get_gemini_audio_model()
+    start = time.perf_counter()
+    model.generate_content([
+        "Listen to this customer voice note (Hindi/English/Hinglish) and extract the textile order items.",
+        load_prompt(),
+        {"mime_type": mime_type, "data": audio_bytes}
+    ])
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--gemini", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'note':<24}{'raw KB':>8}{'out KB':>8}{'raw s':>8}{'out s':>8}{'prep ms':>9}")
+
+    raw_ms_total = out_ms_total = 0.0
+    timed = 0
+
+    for path in args.paths:
+        with open(path, "rb") as file:
+            data = file.read()
+        mime = MIME_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), "audio/ogg")
+        name = os.path.basename(path)[:23]
+
+        try:
+            processed, out_mime, stats = preprocess_audio(data, mime)
+        except VoiceNoteTooLongError as e:
+            print(f"{name:<24}rejected: {e}")
+            continue
+
+        print(
+            f"{name:<24}{stats['original_bytes'] / 1024:>8.0f}{stats['output_bytes'] / 1024:>8.0f}"
+            f"{stats['original_seconds'] or 0:>8.1f}{stats['output_seconds'] or 0:>8.1f}"
+            f"{stats['elapsed_ms']:>9.0f}"
+        )
+
+        if args.gemini and os.getenv("GEMINI_API_KEY"):
+            raw_ms = time_gemini_call(data, mime)
+            out_ms = time_gemini_call(processed, out_mime) + stats["elapsed_ms"]
+            raw_ms_total += raw_ms
+            out_ms_total += out_ms
+            timed += 1
+            print(f"{'':<24}end-to-end raw {raw_ms:.0f}ms → processed {out_ms:.0f}ms")
+
+    if timed:
+        print(f"\nAverage voice-order latency: {raw_ms_total / timed:.0f}ms → {out_ms_total / timed:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
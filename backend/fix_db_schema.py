@@ -1,19 +1,75 @@
 from app.database import SessionLocal, engine
+from app.models.stock_summary import StockSummary
+from app.models.inventory_movement import InventoryMovement, InventoryStockSnapshot
+from app.crud.stock_summary import rebuild_stock_summary
+from app.crud.inventory_journal import backfill_opening_balances
 from sqlalchemy import text
 
+# (table, column, type) — columns added after the table was first created
+MISSING_COLUMNS = [
+    ("order_items", "color", "VARCHAR"),
+    ("messages", "intent", "VARCHAR"),
+    ("messages", "transcript", "VARCHAR"),
+    ("inventory_batches", "version", "INTEGER NOT NULL DEFAULT 1"),
+]
+
+# (table, column) — NOT NULL constraints relaxed after the table was first created
+NULLABLE_COLUMNS = [
+    ("order_session_items", "normalized_meters"),
+]
+
+# (index name, table, expression) — indexes added after the table was first created
+MISSING_INDEXES = [
+    ("ix_materials_material_name_lower", "materials", "lower(material_name)"),
+    ("ix_inventory_batches_color_lower", "inventory_batches", "lower(color)"),
+]
+
+
 def fix_schema():
     db = SessionLocal()
     try:
-        # Check if column exists
-        result = db.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='order_items' AND column_name='color'"))
-        if result.fetchone():
-            print("Column 'color' already exists in 'order_items'.")
-        else:
-            print("Adding column 'color' to 'order_items'...")
-            db.execute(text("ALTER TABLE order_items ADD COLUMN color VARCHAR"))
+        for table, column, column_type in MISSING_COLUMNS:
+            # Check if column exists
+            result = db.execute(
+                text(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_name=:table AND column_name=:column"
+                ),
+                {"table": table, "column": column}
+            )
+            if result.fetchone():
+                print(f"Column '{column}' already exists in '{table}'.")
+            else:
+                print(f"Adding column '{column}' to '{table}'...")
+                db.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                db.commit()
+                print(f"Column '{column}' added successfully.")
+
+        for table, column in NULLABLE_COLUMNS:
+            db.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL"))
             db.commit()
-            print("Column 'color' added successfully.")
-            
+            print(f"Column '{column}' in '{table}' is nullable.")
+
+        for index, table, expression in MISSING_INDEXES:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({expression})"))
+            db.commit()
+            print(f"Index '{index}' on '{table}' ensured.")
+
+        # stock_summary is maintained incrementally by record_movements;
+        # recompute it from the counters on every run so batches written
+        # around the journal (older seeds, direct inserts) are counted
+        StockSummary.__table__.create(bind=engine, checkfirst=True)
+        rows = rebuild_stock_summary(db)
+        db.commit()
+        print(f"stock_summary reconciled ({rows} material/color rows).")
+
+        # Journal the existing stock before anything moves it
+        InventoryMovement.__table__.create(bind=engine, checkfirst=True)
+        InventoryStockSnapshot.__table__.create(bind=engine, checkfirst=True)
+        balances = backfill_opening_balances(db)
+        db.commit()
+        print(f"Inventory journal: {balances} opening balances recorded.")
+
     except Exception as e:
         print(f"Error: {e}")
         db.rollback()
@@ -1,5 +1,6 @@
 import sys
 import os
+import uuid
 from datetime import datetime, timedelta, timezone
 
 # Ensure 'app' module is found
@@ -11,6 +12,7 @@ from app.models.material import Material
 from app.models.inventory import InventoryBatch
 from app.models.customer import Customer
 from app.models.gst_config import GSTConfig
+from app.crud.inventory import insert_batches_bulk
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
@@ -58,6 +60,7 @@ def seed_data():
         db.flush() # Get IDs
 
         print("🌱 Seeding Inventory Batches...")
+        # Through the journal, so stock_summary and the movements match the counters
         batches = []
         for mat in materials:
             # Create 2 batches for each
@@ -65,22 +68,22 @@ def seed_data():
                 rolls = 10
                 meters_per_roll = 100.0
                 total_m = rolls * meters_per_roll
-                
-                batch = InventoryBatch(
-                    material_id=mat.material_id,
-                    color=f"Color-{i}",
-                    rolls_available=rolls,
-                    meters_per_roll=meters_per_roll,
-                    loose_meters_available=0,
-                    # meters_available removed, original_meters removed as they don't exist in model
-                    # total stock calculation is done on material
-                    created_at=datetime.now(timezone.utc) - timedelta(days=i*2)
-                )
-                db.add(batch)
-                
+
+                batches.append({
+                    "batch_id": uuid.uuid4(),
+                    "material_id": mat.material_id,
+                    "color": f"Color-{i}",
+                    "rolls_available": rolls,
+                    "meters_per_roll": meters_per_roll,
+                    "loose_meters_available": 0,
+                    "created_at": datetime.now(timezone.utc) - timedelta(days=i*2),
+                })
+
                 # Update material total
                 mat.total_stock_meters = float(mat.total_stock_meters) + total_m
 
+        insert_batches_bulk(db, batches, reason="seed data")
+
         print("🌱 Seeding Customers...")
         customers = [
             Customer(phone_number="919876543210", business_name="Alpha Textiles", credit_limit=50000.0),
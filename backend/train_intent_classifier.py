@@ -0,0 +1,163 @@
+"""
+Retrains the local intent classifier from stored WhatsApp messages.
+
+Training data = incoming text messages whose `intent` was labelled by the
+LLM (see message_router._store_intent_label), plus the seed examples.
+Prints an accuracy / coverage / latency report on a held-out split, then
+refits on all data and writes the JSON weight file loaded by the app.
+
+Usage (from backend/):
+    python train_intent_classifier.py
+    python train_intent_classifier.py --threshold 0.9 --no-seed
+    python train_intent_classifier.py --report-only
+    python train_intent_classifier.py --seed-only   # no DB; the shipped default model
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import SessionLocal
+from app.models.message import Message
+from app.services.local_intent_model import (
+    MODEL_PATH,
+    INTENTS,
+    SEED_EXAMPLES,
+    export_intent_model,
+    get_confidence_threshold,
+    normalize_text,
+    save_intent_model,
+    score_intents,
+    train_intent_model,
+)
+
+
+def load_labelled_messages():
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Message.content, Message.intent)
+            .filter(Message.direction == "incoming")
+            .filter(Message.message_type == "text")
+            .filter(Message.intent.in_(INTENTS))
+            .all()
+        )
+        return [(content, intent) for content, intent in rows if content]
+    finally:
+        db.close()
+
+
+def report(model, texts, labels, threshold):
+    """
+    Accuracy overall and for the confident (locally answered) subset,
+    plus single-message latency percentiles of the exported (runtime) model.
+    """
+    from sklearn.metrics import classification_report
+
+    exported = export_intent_model(model)
+
+    latencies = []
+    predictions = []
+    confidences = []
+
+    for text in texts:
+        start = time.perf_counter()
+        probabilities = score_intents(exported, text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        best = max(probabilities, key=probabilities.get)
+        predictions.append(best)
+        confidences.append(probabilities[best])
+
+    correct = [p == y for p, y in zip(predictions, labels)]
+    confident = [i for i, c in enumerate(confidences) if c >= threshold]
+    confident_correct = sum(1 for i in confident if correct[i])
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    print("\n========== INTENT CLASSIFIER REPORT ==========")
+    print(f"Eval samples:          {len(texts)}")
+    print(f"Overall accuracy:      {sum(correct) / len(texts):.1%}")
+    print(f"Threshold:             {threshold}")
+    print(f"Answered locally:      {len(confident) / len(texts):.1%}")
+    if confident:
+        print(f"Local accuracy:        {confident_correct / len(confident):.1%}")
+    print(f"Latency p50 / p99:     {p50:.3f} ms / {p99:.3f} ms")
+    print()
+    print(classification_report(labels, predictions, zero_division=0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the local intent classifier")
+    parser.add_argument("--threshold", type=float, default=get_confidence_threshold(),
+                        help="Confidence needed to answer locally (report only)")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--no-seed", action="store_true",
+                        help="Train on stored messages only")
+    parser.add_argument("--report-only", action="store_true",
+                        help="Evaluate without overwriting the model file")
+    parser.add_argument("--seed-only", action="store_true",
+                        help="Train on the seed examples only (no DB needed)")
+    args = parser.parse_args()
+
+    if args.seed_only and args.no_seed:
+        parser.error("--seed-only and --no-seed exclude each other")
+
+    from sklearn.model_selection import train_test_split
+
+    samples = [] if args.seed_only else load_labelled_messages()
+    print(f"📥 Loaded {len(samples)} labelled messages from DB")
+
+    if not args.no_seed:
+        samples += SEED_EXAMPLES
+
+    # Deduplicate on normalized text (keep latest label)
+    deduped = {normalize_text(text): label for text, label in samples}
+    texts = list(deduped.keys())
+    labels = list(deduped.values())
+
+    counts = Counter(labels)
+    print(f"🏷️  Label counts: {dict(counts)}")
+
+    if len(counts) < 2:
+        print("❌ Need at least two intents to train. Aborting.")
+        return
+
+    # Stratify only when every class can appear in both splits
+    test_count = int(len(texts) * args.test_size)
+    stratify = labels if min(counts.values()) >= 2 and test_count >= len(counts) else None
+    train_x, test_x, train_y, test_y = train_test_split(
+        texts, labels, test_size=args.test_size, random_state=42, stratify=stratify
+    )
+
+    start = time.perf_counter()
+    model = train_intent_model(train_x, train_y)
+    print(f"🧠 Trained on {len(train_x)} samples in {time.perf_counter() - start:.2f}s")
+
+    report(model, test_x, test_y, args.threshold)
+
+    if args.report_only:
+        return
+
+    # Refit on everything for the shipped model
+    final_model = train_intent_model(texts, labels)
+    save_intent_model(final_model, MODEL_PATH, metadata={
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "samples": len(texts),
+        "label_counts": dict(counts),
+    })
+    print(f"💾 Saved model to {MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()